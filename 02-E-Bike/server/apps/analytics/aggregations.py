@@ -0,0 +1,165 @@
+"""
+Server-side sales aggregations.
+Builds MongoDB $match/$group/$facet pipelines so dashboards get revenue totals,
+counts and top-N rankings in a single round-trip instead of loading every Sale.
+"""
+
+from bson import ObjectId
+
+
+def _totals_stage():
+    """$group stage producing count and revenue for the current pipeline"""
+    return {
+        "$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "revenue": {"$sum": "$grand_total"},
+        }
+    }
+
+
+def _first_row(rows):
+    """Unpack a single-row facet result into a totals dict"""
+    row = rows[0] if rows else {}
+    return {
+        "count": row.get("count", 0),
+        "revenue": row.get("revenue", 0) or 0,
+    }
+
+
+def sales_overview(sales, windows=None, top_n=5):
+    """
+    Compute sales metrics for a Sale queryset in one aggregation.
+
+    Args:
+        sales: Sale queryset; its filter becomes the leading $match
+        windows: Optional dict of name -> start datetime (e.g. today, month start)
+        top_n: Number of top dealers and top products to return (0 to skip)
+
+    Returns:
+        dict with:
+            overall: {count, revenue}
+            windows: {name: {count, revenue}}
+            top_dealers: [{dealer_id, count, revenue}]
+            top_products: [{product_id, units}]
+    """
+    windows = windows or {}
+
+    facets = {"overall": [_totals_stage()]}
+
+    for name, start in windows.items():
+        facets[f"window_{name}"] = [
+            {"$match": {"sale_date": {"$gte": start}}},
+            _totals_stage(),
+        ]
+
+    if top_n:
+        facets["top_dealers"] = [
+            {
+                "$group": {
+                    "_id": "$dealer_id",
+                    "count": {"$sum": 1},
+                    "revenue": {"$sum": "$grand_total"},
+                }
+            },
+            {"$sort": {"revenue": -1, "_id": 1}},
+            {"$limit": top_n},
+        ]
+        facets["top_products"] = [
+            {"$unwind": "$items"},
+            {
+                "$group": {
+                    "_id": "$items.product_id",
+                    "units": {"$sum": "$items.quantity"},
+                }
+            },
+            {"$sort": {"units": -1, "_id": 1}},
+            {"$limit": top_n},
+        ]
+
+    result = next(iter(sales.aggregate([{"$facet": facets}])), {})
+
+    return {
+        "overall": _first_row(result.get("overall")),
+        "windows": {
+            name: _first_row(result.get(f"window_{name}")) for name in windows
+        },
+        "top_dealers": [
+            {
+                "dealer_id": row["_id"],
+                "count": row["count"],
+                "revenue": row["revenue"] or 0,
+            }
+            for row in result.get("top_dealers", [])
+        ],
+        "top_products": [
+            {"product_id": row["_id"], "units": row["units"]}
+            for row in result.get("top_products", [])
+        ],
+    }
+
+
+def valid_object_ids(ids):
+    """Filter out ids that are not valid ObjectId strings (legacy/bad data)"""
+    return [i for i in ids if i and ObjectId.is_valid(i)]
+
+
+def rollup_summary(rollups, granularity="day", windows=None):
+    """
+    Summarise a SalesDailyRollup queryset in one aggregation.
+
+    Args:
+        rollups: SalesDailyRollup queryset (already scoped by dealer/date)
+        granularity: "day" or "month" bucket size for the trend series
+        windows: Optional dict of name -> start day (UTC midnight)
+
+    Returns:
+        dict with:
+            overall: {count, revenue}
+            windows: {name: {count, revenue}}
+            trend: [{period, count, revenue}] sorted by period
+            payment_methods: {method: count}
+    """
+    windows = windows or {}
+    date_format = "%Y-%m" if granularity == "month" else "%Y-%m-%d"
+
+    def totals(group_id=None):
+        return {
+            "$group": {
+                "_id": group_id,
+                "count": {"$sum": "$sales_count"},
+                "revenue": {"$sum": "$revenue"},
+            }
+        }
+
+    facets = {
+        "overall": [totals()],
+        "trend": [
+            totals({"$dateToString": {"format": date_format, "date": "$day"}}),
+            {"$sort": {"_id": 1}},
+        ],
+        "payment_methods": [
+            {"$project": {"methods": {"$objectToArray": "$payment_methods"}}},
+            {"$unwind": "$methods"},
+            {"$group": {"_id": "$methods.k", "count": {"$sum": "$methods.v"}}},
+        ],
+    }
+
+    for name, start in windows.items():
+        facets[f"window_{name}"] = [{"$match": {"day": {"$gte": start}}}, totals()]
+
+    result = next(iter(rollups.aggregate([{"$facet": facets}])), {})
+
+    return {
+        "overall": _first_row(result.get("overall")),
+        "windows": {
+            name: _first_row(result.get(f"window_{name}")) for name in windows
+        },
+        "trend": [
+            {"period": row["_id"], "count": row["count"], "revenue": row["revenue"]}
+            for row in result.get("trend", [])
+        ],
+        "payment_methods": {
+            row["_id"]: row["count"] for row in result.get("payment_methods", [])
+        },
+    }
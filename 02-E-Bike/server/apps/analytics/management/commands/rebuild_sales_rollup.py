@@ -0,0 +1,244 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import UpdateOne
+
+from apps.analytics.models import SalesDailyRollup
+from apps.billing.models import Sale
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily sales rollup from the sales collection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dealer",
+            help="Only rebuild rollup rows for this dealer id",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only rebuild days on or after this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rollup rows written per bulk write",
+        )
+
+    def handle(self, *args, **options):
+        match = {}
+        rollup_filter = {}
+
+        if options["dealer"]:
+            match["dealer_id"] = options["dealer"]
+            rollup_filter["dealer_id"] = options["dealer"]
+
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d")
+            except ValueError:
+                raise CommandError("--since must be in YYYY-MM-DD format")
+            match["sale_date"] = {"$gte": since}
+            rollup_filter["day"] = {"$gte": since}
+
+        collection = SalesDailyRollup._get_collection()
+
+        # Rows are corrected in place with $inc (rebuilt - snapshot), so
+        # record_sale increments that land while the rebuild runs are kept.
+        # The rebuild therefore covers exactly the sales whose increment is in
+        # the snapshot: those applied before it was read.
+        cutoff = datetime.utcnow()
+        snapshot = {
+            (row["dealer_id"], row["day"]): row
+            for row in collection.find(rollup_filter, {"_id": 0, "updated_at": 0})
+        }
+
+        self.stdout.write(self.style.HTTP_INFO("📊 Aggregating sales by dealer and day..."))
+
+        # Sales no job has claimed yet are taken over by the rebuild; claimed
+        # sales still waiting for their $inc are left to their job
+        Sale._get_collection().update_many(
+            dict(match, rollup_recorded={"$ne": True}),
+            {
+                "$set": {
+                    "rollup_recorded": True,
+                    "rollup_recorded_at": cutoff,
+                    "rollup_applied_at": cutoff,
+                }
+            },
+        )
+        buckets = self._aggregate(
+            {
+                **match,
+                "rollup_recorded": True,
+                "$or": [
+                    {"rollup_applied_at": {"$lte": cutoff}},
+                    # Flagged before claim/apply times were tracked
+                    {"rollup_recorded_at": {"$exists": False}},
+                ],
+            }
+        )
+
+        operations = []
+        for ident in buckets.keys() | snapshot.keys():
+            correction = self._correction(buckets.get(ident), snapshot.get(ident))
+            if correction:
+                operations.append(
+                    UpdateOne(
+                        {"dealer_id": ident[0], "day": ident[1]},
+                        {"$inc": correction, "$set": {"updated_at": datetime.utcnow()}},
+                        upsert=True,
+                    )
+                )
+
+        batch_size = options["batch_size"]
+        for i in range(0, len(operations), batch_size):
+            collection.bulk_write(operations[i : i + batch_size], ordered=False)
+
+        # Tidy up: zero breakdown entries and days left without sales
+        collection.update_many(
+            rollup_filter,
+            [
+                {
+                    "$set": {
+                        field: {
+                            "$arrayToObject": {
+                                "$filter": {
+                                    "input": {
+                                        "$objectToArray": {"$ifNull": [f"${field}", {}]}
+                                    },
+                                    "cond": {"$ne": ["$$this.v", 0]},
+                                }
+                            }
+                        }
+                        for field in ("payment_methods", "product_units")
+                    }
+                }
+            ],
+        )
+        emptied = collection.delete_many(
+            dict(rollup_filter, sales_count={"$lte": 0})
+        ).deleted_count
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Rollup rebuilt: {len(buckets)} day rows, "
+                f"{len(operations)} corrected, {emptied} removed"
+            )
+        )
+
+    @staticmethod
+    def _correction(rebuilt, current):
+        """$inc document turning current into rebuilt (None if they match)"""
+        rebuilt = rebuilt or {}
+        current = current or {}
+        correction = {}
+
+        for field in ("sales_count", "revenue", "tax", "discount"):
+            delta = rebuilt.get(field, 0) - (current.get(field) or 0)
+            if delta:
+                correction[field] = delta
+
+        for field in ("payment_methods", "product_units"):
+            new = rebuilt.get(field) or {}
+            old = current.get(field) or {}
+            for key in new.keys() | old.keys():
+                delta = new.get(key, 0) - old.get(key, 0)
+                if delta:
+                    correction[f"{field}.{key}"] = delta
+
+        return correction or None
+
+    def _aggregate(self, match):
+        """Build rollup rows keyed by (dealer_id, day) with three server-side passes"""
+        sales = Sale._get_collection()
+        day = {
+            "$dateFromParts": {
+                "year": {"$year": "$sale_date"},
+                "month": {"$month": "$sale_date"},
+                "day": {"$dayOfMonth": "$sale_date"},
+            }
+        }
+        now = datetime.utcnow()
+        buckets = {}
+
+        def bucket(key):
+            ident = (key["dealer_id"], key["day"])
+            if ident not in buckets:
+                buckets[ident] = {
+                    "dealer_id": key["dealer_id"],
+                    "day": key["day"],
+                    "sales_count": 0,
+                    "revenue": 0.0,
+                    "tax": 0.0,
+                    "discount": 0.0,
+                    "payment_methods": {},
+                    "product_units": {},
+                    "updated_at": now,
+                }
+            return buckets[ident]
+
+        # Totals
+        for row in sales.aggregate(
+            [
+                {"$match": match},
+                {
+                    "$group": {
+                        "_id": {"dealer_id": "$dealer_id", "day": day},
+                        "sales_count": {"$sum": 1},
+                        "revenue": {"$sum": "$grand_total"},
+                        "tax": {"$sum": "$tax_amount"},
+                        "discount": {"$sum": "$discount"},
+                    }
+                },
+            ],
+            allowDiskUse=True,
+        ):
+            entry = bucket(row["_id"])
+            entry["sales_count"] = row["sales_count"]
+            entry["revenue"] = row["revenue"] or 0
+            entry["tax"] = row["tax"] or 0
+            entry["discount"] = row["discount"] or 0
+
+        # Payment method counts
+        for row in sales.aggregate(
+            [
+                {"$match": match},
+                {
+                    "$group": {
+                        "_id": {
+                            "dealer_id": "$dealer_id",
+                            "day": day,
+                            "method": {"$ifNull": ["$payment_method", "unknown"]},
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ],
+            allowDiskUse=True,
+        ):
+            bucket(row["_id"])["payment_methods"][row["_id"]["method"]] = row["count"]
+
+        # Product units
+        for row in sales.aggregate(
+            [
+                {"$match": match},
+                {"$unwind": "$items"},
+                {
+                    "$group": {
+                        "_id": {
+                            "dealer_id": "$dealer_id",
+                            "day": day,
+                            "product_id": "$items.product_id",
+                        },
+                        "units": {"$sum": "$items.quantity"},
+                    }
+                },
+            ],
+            allowDiskUse=True,
+        ):
+            product_id = row["_id"]["product_id"]
+            bucket(row["_id"])["product_units"][product_id] = row["units"]
+
+        return buckets
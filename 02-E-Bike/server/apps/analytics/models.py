@@ -1,3 +1,72 @@
-from django.db import models
+from mongoengine import (
+    Document,
+    StringField,
+    FloatField,
+    IntField,
+    DateTimeField,
+    DictField,
+)
+from datetime import datetime
 
-# Create your models here.
+
+class SalesDailyRollup(Document):
+    """
+    Pre-aggregated sales per dealer per day.
+    Maintained incrementally on every sale so trend and dashboard endpoints
+    scan one row per day instead of every invoice.
+    """
+
+    dealer_id = StringField(required=True, max_length=24)
+    day = DateTimeField(required=True)  # UTC midnight
+
+    # Totals
+    sales_count = IntField(default=0)
+    revenue = FloatField(default=0.0)
+    tax = FloatField(default=0.0)
+    discount = FloatField(default=0.0)
+
+    # Breakdowns
+    payment_methods = DictField()  # payment_method -> sales count
+    product_units = DictField()  # product_id -> units sold
+
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "sales_daily_rollup",
+        "indexes": [
+            {"fields": ["dealer_id", "day"], "unique": True},
+            "day",
+        ],
+        "ordering": ["day"],
+    }
+
+    def __str__(self):
+        return f"{self.dealer_id} - {self.day:%Y-%m-%d}"
+
+    @staticmethod
+    def day_for(value):
+        """Truncate a datetime to the UTC day bucket it belongs to"""
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def record_sale(cls, sale):
+        """
+        Fold a committed sale into its (dealer_id, day) bucket.
+        Uses a single upsert with $inc so concurrent sales never lose updates.
+        """
+        increments = {
+            "sales_count": 1,
+            "revenue": sale.grand_total or 0,
+            "tax": sale.tax_amount or 0,
+            "discount": sale.discount or 0,
+            f"payment_methods.{sale.payment_method or 'unknown'}": 1,
+        }
+        for item in sale.items:
+            key = f"product_units.{item.product_id}"
+            increments[key] = increments.get(key, 0) + item.quantity
+
+        cls._get_collection().update_one(
+            {"dealer_id": sale.dealer_id, "day": cls.day_for(sale.sale_date)},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
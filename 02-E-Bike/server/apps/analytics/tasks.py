@@ -0,0 +1,37 @@
+from celery import shared_task
+from bson import ObjectId
+from datetime import datetime
+from .models import SalesDailyRollup
+from apps.billing.models import Sale
+
+
+@shared_task
+def record_sale_rollup(sale_id):
+    """
+    Fold one committed sale into its daily rollup bucket.
+    Idempotent: the sale's rollup_recorded flag is claimed before the $inc, so
+    a retried or duplicated job never counts a sale twice. rollup_applied_at
+    is set once the $inc has landed (rebuild_sales_rollup relies on it).
+    """
+    collection = Sale._get_collection()
+    claimed = collection.update_one(
+        {"_id": ObjectId(sale_id), "rollup_recorded": {"$ne": True}},
+        {"$set": {"rollup_recorded": True, "rollup_recorded_at": datetime.utcnow()}},
+    )
+    if not claimed.modified_count:
+        return f"Sale {sale_id} already in rollup"
+
+    try:
+        SalesDailyRollup.record_sale(Sale.objects.get(id=sale_id))
+        collection.update_one(
+            {"_id": ObjectId(sale_id)},
+            {"$set": {"rollup_applied_at": datetime.utcnow()}},
+        )
+    except Exception:
+        # Let a retry (or rebuild_sales_rollup) pick it up
+        collection.update_one(
+            {"_id": ObjectId(sale_id)}, {"$set": {"rollup_recorded": False}}
+        )
+        raise
+
+    return f"Recorded sale {sale_id} in rollup"
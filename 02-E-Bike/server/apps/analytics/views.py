@@ -12,7 +12,6 @@ from rest_framework.decorators import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from datetime import datetime, timedelta, date
-from collections import defaultdict
 
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
@@ -21,6 +20,10 @@ from apps.orders.models import DealerOrder, CustomerOrder
 from apps.inventory.models import DealerInventory
 from apps.service.models import ServiceRequest
 from apps.products.models import Product
+from apps.products.catalog import ProductResolver
+
+from .aggregations import sales_overview, rollup_summary, valid_object_ids
+from .models import SalesDailyRollup
 
 
 # ============================================
@@ -56,18 +59,18 @@ def get_admin_dashboard(request):
         total_customers = User.objects(role=User.ROLE_CUSTOMER).count()
         total_products = Product.objects.count()
 
-        # Sales metrics
-        all_sales = Sale.objects.all()
-        total_revenue = sum([sale.grand_total for sale in all_sales])
-        total_sales = all_sales.count()
-
-        today_sales = Sale.objects(sale_date__gte=today)
-        today_revenue = sum([sale.grand_total for sale in today_sales])
-        today_sales_count = today_sales.count()
-
-        month_sales = Sale.objects(sale_date__gte=month_start)
-        month_revenue = sum([sale.grand_total for sale in month_sales])
-        month_sales_count = month_sales.count()
+        # Sales metrics, top dealers and top products in one aggregation
+        overview = sales_overview(
+            Sale.objects,
+            windows={"today": today, "month": month_start},
+            top_n=5,
+        )
+        total_revenue = overview["overall"]["revenue"]
+        total_sales = overview["overall"]["count"]
+        today_revenue = overview["windows"]["today"]["revenue"]
+        today_sales_count = overview["windows"]["today"]["count"]
+        month_revenue = overview["windows"]["month"]["revenue"]
+        month_sales_count = overview["windows"]["month"]["count"]
 
         # Orders metrics
         pending_dealer_orders = DealerOrder.objects(
@@ -82,49 +85,46 @@ def get_admin_dashboard(request):
             status=ServiceRequest.STATUS_IN_PROGRESS
         ).count()
 
-        # Top dealers by sales
-        dealer_sales = defaultdict(float)
-        dealer_counts = defaultdict(int)
-        for sale in all_sales:
-            dealer_sales[sale.dealer_id] += sale.grand_total
-            dealer_counts[sale.dealer_id] += 1
+        # Top dealers by sales (resolve names in one query)
+        dealer_ids = valid_object_ids([d["dealer_id"] for d in overview["top_dealers"]])
+        dealers = {
+            str(dealer.id): dealer
+            for dealer in User.objects(id__in=dealer_ids).only(
+                "dealership_name", "first_name", "last_name"
+            )
+        }
 
         top_dealers = []
-        for dealer_id in sorted(dealer_sales, key=dealer_sales.get, reverse=True)[:5]:
-            try:
-                dealer = User.objects.get(id=dealer_id)
-                top_dealers.append(
-                    {
-                        "dealer_id": dealer_id,
-                        "dealer_name": dealer.dealership_name or dealer.get_full_name(),
-                        "total_sales": dealer_counts[dealer_id],
-                        "total_revenue": round(dealer_sales[dealer_id], 2),
-                    }
-                )
-            except:
+        for row in overview["top_dealers"]:
+            dealer = dealers.get(row["dealer_id"])
+            if not dealer:
                 continue
+            top_dealers.append(
+                {
+                    "dealer_id": row["dealer_id"],
+                    "dealer_name": dealer.dealership_name or dealer.get_full_name(),
+                    "total_sales": row["count"],
+                    "total_revenue": round(row["revenue"], 2),
+                }
+            )
 
-        # Top products
-        product_sales = defaultdict(int)
-        for sale in all_sales:
-            for item in sale.items:
-                product_sales[item.product_id] += item.quantity
+        # Top products (resolve names in one query)
+        products = ProductResolver.for_request(request).get_many(
+            [p["product_id"] for p in overview["top_products"]]
+        )
 
         top_products = []
-        for product_id in sorted(product_sales, key=product_sales.get, reverse=True)[
-            :5
-        ]:
-            try:
-                product = Product.objects.get(id=product_id)
-                top_products.append(
-                    {
-                        "product_id": product_id,
-                        "product_name": product.name,
-                        "units_sold": product_sales[product_id],
-                    }
-                )
-            except:
+        for row in overview["top_products"]:
+            product = products.get(row["product_id"])
+            if not product:
                 continue
+            top_products.append(
+                {
+                    "product_id": row["product_id"],
+                    "product_name": product.name,
+                    "units_sold": row["units"],
+                }
+            )
 
         return Response(
             {
@@ -189,74 +189,46 @@ def get_sales_analytics(request):
         period = request.GET.get("period", "30days")
         dealer_id = request.GET.get("dealer_id", "")
 
-        # Filter sales
+        # Filter rollup rows (one per dealer per day)
         if user.role == User.ROLE_ADMIN:
             if dealer_id:
-                sales = Sale.objects(dealer_id=dealer_id)
+                rollups = SalesDailyRollup.objects(dealer_id=dealer_id)
             else:
-                sales = Sale.objects.all()
+                rollups = SalesDailyRollup.objects.all()
         else:  # Dealer
-            sales = Sale.objects(dealer_id=str(user.id))
+            rollups = SalesDailyRollup.objects(dealer_id=str(user.id))
 
-        # Calculate date range
-        today = datetime.now()
+        # Calculate date range (whole UTC days)
+        today = SalesDailyRollup.day_for(datetime.utcnow())
         if period == "7days":
-            start_date = today - timedelta(days=7)
-            sales = sales.filter(sale_date__gte=start_date)
+            rollups = rollups.filter(day__gte=today - timedelta(days=7))
         elif period == "30days":
-            start_date = today - timedelta(days=30)
-            sales = sales.filter(sale_date__gte=start_date)
+            rollups = rollups.filter(day__gte=today - timedelta(days=30))
         elif period == "12months":
-            start_date = today - timedelta(days=365)
-            sales = sales.filter(sale_date__gte=start_date)
-
-        # Calculate trends
-        if period == "12months":
-            # Group by month
-            monthly_data = defaultdict(lambda: {"count": 0, "revenue": 0})
-            for sale in sales:
-                month_key = sale.sale_date.strftime("%Y-%m")
-                monthly_data[month_key]["count"] += 1
-                monthly_data[month_key]["revenue"] += sale.grand_total
-
-            trend_data = [
-                {
-                    "period": month,
-                    "sales": data["count"],
-                    "revenue": round(data["revenue"], 2),
-                }
-                for month, data in sorted(monthly_data.items())
-            ]
-        else:
-            # Group by day
-            daily_data = defaultdict(lambda: {"count": 0, "revenue": 0})
-            for sale in sales:
-                day_key = sale.sale_date.strftime("%Y-%m-%d")
-                daily_data[day_key]["count"] += 1
-                daily_data[day_key]["revenue"] += sale.grand_total
-
-            trend_data = [
-                {
-                    "period": day,
-                    "sales": data["count"],
-                    "revenue": round(data["revenue"], 2),
-                }
-                for day, data in sorted(daily_data.items())
-            ]
+            rollups = rollups.filter(day__gte=today - timedelta(days=365))
 
-        # Payment method breakdown
-        payment_methods = defaultdict(int)
-        for sale in sales:
-            payment_methods[sale.payment_method] += 1
+        # Trend (by month for 12 months, by day otherwise) and payment breakdown
+        summary = rollup_summary(
+            rollups, granularity="month" if period == "12months" else "day"
+        )
+
+        trend_data = [
+            {
+                "period": row["period"],
+                "sales": row["count"],
+                "revenue": round(row["revenue"], 2),
+            }
+            for row in summary["trend"]
+        ]
 
         return Response(
             {
                 "success": True,
                 "period": period,
-                "total_sales": sales.count(),
-                "total_revenue": round(sum([sale.grand_total for sale in sales]), 2),
+                "total_sales": summary["overall"]["count"],
+                "total_revenue": round(summary["overall"]["revenue"], 2),
                 "trend": trend_data,
-                "payment_methods": dict(payment_methods),
+                "payment_methods": summary["payment_methods"],
             },
             status=status.HTTP_200_OK,
         )
@@ -305,30 +277,33 @@ def get_dealer_dashboard(request):
             dealer_id=dealer_id, role=User.ROLE_SERVICEMAN
         ).count()
 
-        # Sales metrics
-        all_sales = Sale.objects(dealer_id=dealer_id)
-        total_revenue = sum([sale.grand_total for sale in all_sales])
-        total_sales = all_sales.count()
-
-        today_sales = Sale.objects(dealer_id=dealer_id, sale_date__gte=today)
-        today_revenue = sum([sale.grand_total for sale in today_sales])
-
-        month_sales = Sale.objects(dealer_id=dealer_id, sale_date__gte=month_start)
-        month_revenue = sum([sale.grand_total for sale in month_sales])
-
-        # Inventory
-        inventory = DealerInventory.objects(dealer_id=dealer_id)
+        # Sales metrics and top products in one aggregation
+        overview = sales_overview(
+            Sale.objects(dealer_id=dealer_id),
+            windows={"today": today, "month": month_start},
+            top_n=5,
+        )
+        total_revenue = overview["overall"]["revenue"]
+        total_sales = overview["overall"]["count"]
+        today_revenue = overview["windows"]["today"]["revenue"]
+        today_sales_count = overview["windows"]["today"]["count"]
+        month_revenue = overview["windows"]["month"]["revenue"]
+        month_sales_count = overview["windows"]["month"]["count"]
+
+        # Inventory (products resolved in one batched query)
+        inventory = list(DealerInventory.objects(dealer_id=dealer_id))
+        products = ProductResolver.for_request(request)
+        products.prefetch(item.product_id for item in inventory)
         total_inventory_value = 0
         low_stock_items = 0
 
         for item in inventory:
-            try:
-                product = Product.objects.get(id=item.product_id)
-                total_inventory_value += item.quantity * product.dealer_price
-                if item.low_stock_alert:
-                    low_stock_items += 1
-            except:
+            product = products.get(item.product_id)
+            if not product:
                 continue
+            total_inventory_value += item.quantity * product.dealer_price
+            if item.low_stock_alert:
+                low_stock_items += 1
 
         # Services
         pending_services = ServiceRequest.objects(
@@ -343,26 +318,22 @@ def get_dealer_dashboard(request):
             dealer_id=dealer_id, delivery_status=Sale.DELIVERY_PENDING
         ).count()
 
-        # Top selling products
-        product_sales = defaultdict(int)
-        for sale in all_sales:
-            for item in sale.items:
-                product_sales[item.product_id] += item.quantity
+        # Top selling products (resolve names in one query)
+        products = products.get_many(
+            [p["product_id"] for p in overview["top_products"]]
+        )
 
         top_products = []
-        for product_id in sorted(product_sales, key=product_sales.get, reverse=True)[
-            :5
-        ]:
-            try:
-                product = Product.objects.get(id=product_id)
-                top_products.append(
-                    {
-                        "product_name": product.name,
-                        "units_sold": product_sales[product_id],
-                    }
-                )
-            except:
+        for row in overview["top_products"]:
+            product = products.get(row["product_id"])
+            if not product:
                 continue
+            top_products.append(
+                {
+                    "product_name": product.name,
+                    "units_sold": row["units"],
+                }
+            )
 
         return Response(
             {
@@ -374,15 +345,15 @@ def get_dealer_dashboard(request):
                 "sales": {
                     "total": total_sales,
                     "total_revenue": round(total_revenue, 2),
-                    "today_sales": today_sales.count(),
+                    "today_sales": today_sales_count,
                     "today_revenue": round(today_revenue, 2),
-                    "month_sales": month_sales.count(),
+                    "month_sales": month_sales_count,
                     "month_revenue": round(month_revenue, 2),
                 },
                 "inventory": {
                     "total_value": round(total_inventory_value, 2),
                     "low_stock_items": low_stock_items,
-                    "total_products": inventory.count(),
+                    "total_products": len(inventory),
                 },
                 "services": {
                     "pending": pending_services,
@@ -424,33 +395,35 @@ def get_inventory_analytics(request):
             )
 
         dealer_id = str(user.id)
-        inventory = DealerInventory.objects(dealer_id=dealer_id)
+        inventory = list(DealerInventory.objects(dealer_id=dealer_id))
 
-        total_items = inventory.count()
+        total_items = len(inventory)
         total_quantity = sum([item.quantity for item in inventory])
-        low_stock_count = inventory.filter(low_stock_alert=True).count()
-        out_of_stock = inventory.filter(quantity=0).count()
+        low_stock_count = len([item for item in inventory if item.low_stock_alert])
+        out_of_stock = len([item for item in inventory if item.quantity == 0])
 
-        # Calculate inventory value
+        # Calculate inventory value (products resolved in one batched query)
         total_value = 0
         product_breakdown = []
 
+        products = ProductResolver.for_request(request)
+        products.prefetch(item.product_id for item in inventory)
+
         for item in inventory:
-            try:
-                product = Product.objects.get(id=item.product_id)
-                item_value = item.quantity * product.dealer_price
-                total_value += item_value
-
-                product_breakdown.append(
-                    {
-                        "product_name": product.name,
-                        "quantity": item.quantity,
-                        "value": round(item_value, 2),
-                        "low_stock": item.low_stock_alert,
-                    }
-                )
-            except:
+            product = products.get(item.product_id)
+            if not product:
                 continue
+            item_value = item.quantity * product.dealer_price
+            total_value += item_value
+
+            product_breakdown.append(
+                {
+                    "product_name": product.name,
+                    "quantity": item.quantity,
+                    "value": round(item_value, 2),
+                    "low_stock": item.low_stock_alert,
+                }
+            )
 
         # Sort by value
         product_breakdown.sort(key=lambda x: x["value"], reverse=True)
@@ -56,6 +56,8 @@ class Attendance(Document):
         "collection": "attendance",
         "indexes": [
             ("user_id", "date"),
+            ("dealer_id", "date"),  # Monthly dealer reports
+            ("date", "logout_time", "login_time"),  # Auto-logout sweep
             "user_id",
             "dealer_id",
             "date",
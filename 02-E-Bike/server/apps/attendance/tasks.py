@@ -1,31 +1,54 @@
 from celery import shared_task
 from .models import Attendance
 from datetime import datetime, date, timedelta
+import time
 from django.conf import settings
 
 
 @shared_task
 def auto_logout_employees():
-    """Auto logout employees after configured hours"""
-    today = date.today()
+    """
+    Auto logout employees after configured hours.
+    One server-side update: every open record for today whose login is older
+    than the cutoff gets logout/hours fields computed in an update pipeline.
+    """
+    started = time.monotonic()
+    today = datetime.combine(date.today(), datetime.min.time())  # DateField storage
     auto_logout_hours = settings.AUTO_LOGOUT_HOURS
+    cutoff = datetime.utcnow() - timedelta(hours=auto_logout_hours)
 
-    # Get all attendance records with login but no logout for today
-    attendances = Attendance.objects(date=today, login_time__ne=None, logout_time=None)
+    # Same rule as Attendance.save(): overtime is anything over 9 hours
+    overtime = (
+        auto_logout_hours - 9
+        if auto_logout_hours > 9
+        else {"$ifNull": ["$overtime_hours", 0.0]}
+    )
 
-    for attendance in attendances:
-        # Check if logged in for more than configured hours
-        time_since_login = datetime.utcnow() - attendance.login_time
-        hours_logged_in = time_since_login.total_seconds() / 3600
+    result = Attendance._get_collection().update_many(
+        {
+            "date": today,
+            "logout_time": None,
+            "login_time": {"$ne": None, "$lte": cutoff},
+        },
+        [
+            {
+                "$set": {
+                    "logout_time": {
+                        "$add": ["$login_time", int(auto_logout_hours * 3600 * 1000)]
+                    },
+                    "auto_logout": True,
+                    "total_hours": float(auto_logout_hours),
+                    "overtime_hours": overtime,
+                    "updated_at": "$$NOW",
+                }
+            }
+        ],
+    )
 
-        if hours_logged_in >= auto_logout_hours:
-            # Auto logout
-            attendance.logout_time = attendance.login_time + timedelta(
-                hours=auto_logout_hours
-            )
-            attendance.auto_logout = True
-            attendance.save()
+    elapsed_ms = (time.monotonic() - started) * 1000
+    print(f"Auto logged out {result.modified_count} records in {elapsed_ms:.0f}ms")
 
-            print(f"Auto logged out user {attendance.user_id}")
-
-    return f"Auto logout completed for {attendances.count()} records"
+    return (
+        f"Auto logout completed for {result.modified_count} records "
+        f"in {elapsed_ms:.0f}ms"
+    )
@@ -675,43 +675,54 @@ def get_attendance_report(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get all staff
+        # Get all staff (one query, names only)
         staff = User.objects(
             dealer_id=str(user.id),
             role__in=[User.ROLE_EMPLOYEE, User.ROLE_SERVICEMAN],
-        )
-
-        report = []
-        for staff_member in staff:
-            attendance_records = Attendance.objects(
-                user_id=str(staff_member.id), date__gte=start_date, date__lt=end_date
-            )
+        ).only("id", "first_name", "last_name", "role")
 
-            total_days = attendance_records.count()
-            present = attendance_records.filter(
-                status=Attendance.STATUS_PRESENT
-            ).count()
-            half_days = attendance_records.filter(
-                status=Attendance.STATUS_HALF_DAY
-            ).count()
-            leaves = attendance_records.filter(status=Attendance.STATUS_LEAVE).count()
-            absents = attendance_records.filter(status=Attendance.STATUS_ABSENT).count()
+        # One aggregation for every staff member's monthly totals
+        def count_status(attendance_status):
+            return {
+                "$sum": {"$cond": [{"$eq": ["$status", attendance_status]}, 1, 0]}
+            }
 
-            total_hours = sum([a.total_hours for a in attendance_records])
-            overtime_hours = sum([a.overtime_hours for a in attendance_records])
+        pipeline = [
+            {
+                "$group": {
+                    "_id": "$user_id",
+                    "total_days": {"$sum": 1},
+                    "present_days": count_status(Attendance.STATUS_PRESENT),
+                    "half_days": count_status(Attendance.STATUS_HALF_DAY),
+                    "leaves": count_status(Attendance.STATUS_LEAVE),
+                    "absents": count_status(Attendance.STATUS_ABSENT),
+                    "total_hours": {"$sum": {"$ifNull": ["$total_hours", 0]}},
+                    "overtime_hours": {"$sum": {"$ifNull": ["$overtime_hours", 0]}},
+                }
+            }
+        ]
+        totals = {
+            row["_id"]: row
+            for row in Attendance.objects(
+                dealer_id=str(user.id), date__gte=start_date, date__lt=end_date
+            ).aggregate(pipeline)
+        }
 
+        report = []
+        for staff_member in staff:
+            row = totals.get(str(staff_member.id), {})
             report.append(
                 {
                     "user_id": str(staff_member.id),
                     "name": staff_member.get_full_name(),
                     "role": staff_member.role,
-                    "total_days": total_days,
-                    "present_days": present,
-                    "half_days": half_days,
-                    "leaves": leaves,
-                    "absents": absents,
-                    "total_hours": round(total_hours, 2),
-                    "overtime_hours": round(overtime_hours, 2),
+                    "total_days": row.get("total_days", 0),
+                    "present_days": row.get("present_days", 0),
+                    "half_days": row.get("half_days", 0),
+                    "leaves": row.get("leaves", 0),
+                    "absents": row.get("absents", 0),
+                    "total_hours": round(row.get("total_hours", 0), 2),
+                    "overtime_hours": round(row.get("overtime_hours", 0), 2),
                 }
             )
 
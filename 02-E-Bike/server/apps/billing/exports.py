@@ -0,0 +1,22 @@
+"""Export columns for sales (see apps.core.export)"""
+
+from apps.core.export import Column
+
+SALE_EXPORT_COLUMNS = [
+    Column("id", "_id"),
+    Column("invoice_number"),
+    Column("sale_date"),
+    Column("dealer_id"),
+    Column("employee_id"),
+    Column("customer_id"),
+    Column("customer_name", "customer.name"),
+    Column("customer_phone", "customer.phone"),
+    Column("items"),
+    Column("subtotal"),
+    Column("discount"),
+    Column("tax_amount"),
+    Column("grand_total"),
+    Column("payment_method"),
+    Column("payment_status"),
+    Column("delivery_status"),
+]
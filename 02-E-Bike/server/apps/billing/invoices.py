@@ -0,0 +1,286 @@
+"""
+Invoice PDF rendering.
+An invoice is rendered from a plain payload built from the Sale (so it can be
+shipped to worker processes) and stored under media/invoices as
+<invoice_number>-<content hash>.pdf. The same content always maps to the same
+file, so repeat downloads are served from disk and edits to a sale produce a
+new file. Styles are built once per process and reused across renders.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from apps.users.models import User
+
+# Bump when the layout changes so every invoice re-renders
+TEMPLATE_VERSION = 1
+
+SALE_FIELDS = (
+    "invoice_number",
+    "dealer_id",
+    "customer",
+    "items",
+    "subtotal",
+    "discount",
+    "tax_amount",
+    "grand_total",
+    "payment_method",
+    "payment_status",
+    "warranty",
+    "sale_date",
+    "invoice_pdf",
+)
+
+
+# ============================================
+# PAYLOAD
+# ============================================
+
+
+def invoice_payload(sale, dealer=None):
+    """Everything printed on the invoice, as JSON-safe primitives"""
+    customer = sale.customer
+    warranty = sale.warranty
+    return {
+        "template": TEMPLATE_VERSION,
+        "invoice_number": sale.invoice_number,
+        "sale_date": sale.sale_date.strftime("%d %b %Y") if sale.sale_date else "",
+        "dealer": {
+            "name": (
+                (dealer.dealership_name or dealer.get_full_name()) if dealer else ""
+            ),
+            "address": ", ".join(
+                part
+                for part in (
+                    getattr(dealer, "address", None),
+                    getattr(dealer, "city", None),
+                    getattr(dealer, "state", None),
+                    getattr(dealer, "pincode", None),
+                )
+                if part
+            ),
+            "phone": getattr(dealer, "phone", None) or "",
+        },
+        "customer": {
+            "name": (customer.name if customer else None) or "Walk-in customer",
+            "phone": (customer.phone if customer else None) or "",
+            "email": (customer.email if customer else None) or "",
+            "address": (customer.address if customer else None) or "",
+        },
+        "items": [
+            {
+                "name": item.product_name,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price,
+                "discount": item.discount or 0,
+                "tax_rate": item.tax_rate or 0,
+                "subtotal": item.subtotal,
+            }
+            for item in sale.items
+        ],
+        "subtotal": sale.subtotal or 0,
+        "discount": sale.discount or 0,
+        "tax_amount": sale.tax_amount or 0,
+        "grand_total": sale.grand_total or 0,
+        "payment_method": sale.payment_method or "",
+        "payment_status": sale.payment_status or "",
+        "warranty_expiry": (
+            warranty.expiry_date.strftime("%d %b %Y")
+            if warranty and warranty.expiry_date
+            else ""
+        ),
+    }
+
+
+def invoice_path(payload):
+    """Absolute cache path for a payload: <invoice_number>-<content hash>.pdf"""
+    digest = hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    return os.path.join(
+        settings.MEDIA_DIRS["INVOICES"], f"{payload['invoice_number']}-{digest}.pdf"
+    )
+
+
+def media_name(path):
+    """Path relative to MEDIA_ROOT, as stored in Sale.invoice_pdf"""
+    return os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+
+
+# ============================================
+# RENDERING (no database access; safe in worker processes)
+# ============================================
+
+
+@lru_cache(maxsize=1)
+def _styles():
+    base = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            "InvoiceTitle", parent=base["Title"], fontName="Helvetica-Bold"
+        ),
+        "heading": ParagraphStyle(
+            "InvoiceHeading", parent=base["Heading4"], spaceAfter=2
+        ),
+        "body": ParagraphStyle("InvoiceBody", parent=base["BodyText"], leading=13),
+        "items": TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d5db")),
+                ("FONTSIZE", (0, 0), (-1, -1), 9),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+            ]
+        ),
+        "totals": TableStyle(
+            [
+                ("ALIGN", (0, 0), (-1, -1), "RIGHT"),
+                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+                ("LINEABOVE", (0, -1), (-1, -1), 0.75, colors.black),
+            ]
+        ),
+    }
+
+
+def _money(value):
+    return f"Rs. {value:,.2f}"
+
+
+def render_to_file(payload, path):
+    """Render the invoice PDF for payload to path (atomic replace)"""
+    styles = _styles()
+    dealer = payload["dealer"]
+    customer = payload["customer"]
+    contact = (dealer["address"], dealer["phone"])
+
+    story = [
+        Paragraph(escape(dealer["name"] or "E-Bike Point"), styles["title"]),
+        Paragraph(
+            escape(" | ".join(part for part in contact if part)), styles["body"]
+        ),
+        Spacer(1, 6 * mm),
+        Paragraph(f"Invoice {payload['invoice_number']}", styles["heading"]),
+        Paragraph(f"Date: {payload['sale_date']}", styles["body"]),
+        Spacer(1, 4 * mm),
+        Paragraph("Bill to", styles["heading"]),
+        Paragraph(
+            "<br/>".join(
+                escape(part)
+                for part in (
+                    customer["name"],
+                    customer["address"],
+                    customer["phone"],
+                    customer["email"],
+                )
+                if part
+            ),
+            styles["body"],
+        ),
+        Spacer(1, 6 * mm),
+    ]
+
+    rows = [["Item", "Qty", "Unit price", "Discount", "Tax %", "Amount"]]
+    for item in payload["items"]:
+        rows.append(
+            [
+                Paragraph(escape(item["name"]), styles["body"]),
+                item["quantity"],
+                _money(item["unit_price"]),
+                _money(item["discount"]),
+                f"{item['tax_rate']:g}",
+                _money(item["subtotal"]),
+            ]
+        )
+    items = Table(
+        rows, colWidths=[70 * mm, 14 * mm, 27 * mm, 24 * mm, 14 * mm, 28 * mm]
+    )
+    items.setStyle(styles["items"])
+    story += [items, Spacer(1, 4 * mm)]
+
+    totals = Table(
+        [
+            ["Subtotal", _money(payload["subtotal"])],
+            ["Discount", f"- {_money(payload['discount'])}"],
+            ["Tax", _money(payload["tax_amount"])],
+            ["Grand total", _money(payload["grand_total"])],
+        ],
+        colWidths=[40 * mm, 35 * mm],
+        hAlign="RIGHT",
+    )
+    totals.setStyle(styles["totals"])
+    story += [totals, Spacer(1, 6 * mm)]
+
+    payment = payload["payment_method"].upper()
+    story.append(
+        Paragraph(f"Payment: {payment} ({payload['payment_status']})", styles["body"])
+    )
+    if payload["warranty_expiry"]:
+        warranty = f"Warranty valid until {payload['warranty_expiry']}"
+        story.append(Paragraph(warranty, styles["body"]))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    SimpleDocTemplate(
+        tmp_path,
+        pagesize=A4,
+        title=f"Invoice {payload['invoice_number']}",
+        leftMargin=15 * mm,
+        rightMargin=15 * mm,
+        topMargin=15 * mm,
+        bottomMargin=15 * mm,
+    ).build(story)
+    os.replace(tmp_path, path)
+    return path
+
+
+def remove_stale(payload, keep):
+    """Delete older renders of the same invoice"""
+    prefix = glob.escape(payload["invoice_number"])
+    pattern = os.path.join(settings.MEDIA_DIRS["INVOICES"], f"{prefix}-*.pdf")
+    for path in glob.glob(pattern):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ============================================
+# SALE-LEVEL API
+# ============================================
+
+
+def ensure_invoice(sale, dealer=None):
+    """
+    Return the invoice PDF path for sale, rendering it only if the cached file
+    for the sale's current content does not exist yet.
+    """
+    if dealer is None:
+        dealer = User.objects(id=sale.dealer_id).first()
+
+    payload = invoice_payload(sale, dealer)
+    path = invoice_path(payload)
+
+    if not os.path.exists(path):
+        render_to_file(payload, path)
+        remove_stale(payload, keep=path)
+
+    name = media_name(path)
+    if sale.invoice_pdf != name:
+        sale.invoice_pdf = name
+        sale._get_collection().update_one(
+            {"_id": sale.pk}, {"$set": {"invoice_pdf": name}}
+        )
+    return path
@@ -0,0 +1,139 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import UpdateOne
+
+from apps.billing.invoices import (
+    SALE_FIELDS,
+    invoice_path,
+    invoice_payload,
+    media_name,
+    remove_stale,
+    render_to_file,
+)
+from apps.billing.models import Sale
+from apps.users.models import User
+
+
+def _init_worker():
+    """Set up Django in spawned workers (settings are needed for media paths)"""
+    import django
+
+    django.setup()
+
+
+def _render(job):
+    """Worker entry point: render one payload (no database access)"""
+    payload, path = job
+    render_to_file(payload, path)
+    remove_stale(payload, keep=path)
+    return path
+
+
+class Command(BaseCommand):
+    help = "Render invoice PDFs for existing sales across all CPU cores"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dealer",
+            help="Only render invoices for this dealer id",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only render sales on or after this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render even if the cached PDF is current",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Sales loaded and rendered per batch",
+        )
+
+    def handle(self, *args, **options):
+        sales = Sale.objects.only(*SALE_FIELDS).order_by("id").no_cache()
+        if options["dealer"]:
+            sales = sales.filter(dealer_id=options["dealer"])
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d")
+            except ValueError:
+                raise CommandError("--since must be in YYYY-MM-DD format")
+            sales = sales.filter(sale_date__gte=since)
+
+        self.stdout.write(
+            self.style.HTTP_INFO(
+                f"🧾 Rendering invoices with {options['workers']} workers..."
+            )
+        )
+
+        dealers = {}
+        rendered = 0
+        cached = 0
+        batch = []
+
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=_init_worker
+        ) as pool:
+            for sale in sales:
+                batch.append(sale)
+                if len(batch) >= options["batch_size"]:
+                    done, hits = self._render_batch(batch, dealers, pool, options)
+                    rendered += done
+                    cached += hits
+                    batch = []
+            if batch:
+                done, hits = self._render_batch(batch, dealers, pool, options)
+                rendered += done
+                cached += hits
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {rendered} invoices rendered, {cached} already up to date"
+            )
+        )
+
+    def _render_batch(self, sales, dealers, pool, options):
+        """Render one batch in the pool and record the file names on the sales"""
+        missing = {sale.dealer_id for sale in sales} - set(dealers)
+        valid = [
+            ObjectId(dealer_id) for dealer_id in missing if ObjectId.is_valid(dealer_id)
+        ]
+        for dealer in User.objects(id__in=valid):
+            dealers[str(dealer.id)] = dealer
+
+        jobs = []
+        updates = []
+        cached = 0
+        for sale in sales:
+            payload = invoice_payload(sale, dealers.get(sale.dealer_id))
+            path = invoice_path(payload)
+            if options["force"] or not os.path.exists(path):
+                jobs.append((payload, path))
+            else:
+                cached += 1
+            name = media_name(path)
+            if sale.invoice_pdf != name:
+                updates.append(
+                    UpdateOne({"_id": sale.pk}, {"$set": {"invoice_pdf": name}})
+                )
+
+        rendered = sum(1 for _ in pool.map(_render, jobs, chunksize=16))
+
+        if updates:
+            Sale._get_collection().bulk_write(updates, ordered=False)
+
+        return rendered, cached
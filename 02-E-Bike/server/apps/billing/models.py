@@ -128,6 +128,11 @@ class Sale(Document):
         choices=DELIVERY_STATUS_CHOICES, default=DELIVERY_PENDING
     )
 
+    # Set once the sale has been folded into SalesDailyRollup
+    rollup_recorded = BooleanField(default=False)
+    rollup_recorded_at = DateTimeField()  # When the flag was claimed
+    rollup_applied_at = DateTimeField()  # When its increment reached the rollup
+
     # Timestamps
     sale_date = DateTimeField(default=datetime.utcnow)
     created_at = DateTimeField(default=datetime.utcnow)
@@ -135,6 +140,11 @@ class Sale(Document):
     meta = {
         "collection": "sales",
         "indexes": [
+            # Keyset pagination (sale_date, _id) per listing scope
+            ("-sale_date", "-id"),
+            ("dealer_id", "-sale_date", "-id"),
+            ("employee_id", "-sale_date", "-id"),
+            ("customer_id", "-sale_date", "-id"),
             "invoice_number",
             "dealer_id",
             "employee_id",
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.projection import FieldMap, raw_id
 from .models import Sale, SaleItem, CustomerDetails, PaymentDetails, WarrantyInfo
 
 
@@ -59,6 +60,10 @@ class SaleSerializer(serializers.Serializer):
         return str(obj.id)
 
 
+# Raw-document read path for sale lists (same output as SaleSerializer)
+SALE_LIST_MAP = FieldMap(Sale, SaleSerializer, computed={"id": raw_id})
+
+
 class CreateSaleSerializer(serializers.Serializer):
     customer_id = serializers.CharField(required=False, allow_null=True)
     customer = CustomerDetailsSerializer(required=False)
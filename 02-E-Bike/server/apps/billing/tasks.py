@@ -0,0 +1,15 @@
+from celery import shared_task
+from .models import Sale
+from .invoices import SALE_FIELDS, ensure_invoice
+
+
+@shared_task
+def render_invoice_pdf(sale_id):
+    """Render (or reuse) the invoice PDF for a sale"""
+    try:
+        sale = Sale.objects.only(*SALE_FIELDS).get(id=sale_id)
+    except Sale.DoesNotExist:
+        return f"Sale {sale_id} not found"
+
+    path = ensure_invoice(sale)
+    return f"Invoice for {sale.invoice_number} ready at {path}"
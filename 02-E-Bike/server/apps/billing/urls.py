@@ -12,7 +12,13 @@ urlpatterns = [
     # COMMON ENDPOINTS (View Sales)
     # ============================================
     path("sales/", views.list_sales, name="list-sales"),
+    path("sales/export/", views.export_sales, name="export-sales"),
     path("sales/<str:sale_id>/", views.get_sale, name="get-sale"),
+    path(
+        "sales/<str:sale_id>/invoice/",
+        views.download_invoice,
+        name="download-invoice",
+    ),
     # ============================================
     # DEALER/EMPLOYEE ENDPOINTS (Update)
     # ============================================
@@ -24,11 +24,28 @@ from .models import (
     WarrantyInfo,
     StockMovement,
 )
-from .serializers import SaleSerializer, CreateSaleSerializer
+from .serializers import SALE_LIST_MAP, SaleSerializer, CreateSaleSerializer
+from .invoices import SALE_FIELDS, ensure_invoice
+from .exports import SALE_EXPORT_COLUMNS
+from .tasks import render_invoice_pdf
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
-from apps.products.models import Product
+from apps.products.catalog import ProductResolver
 from apps.inventory.models import DealerInventory, InventoryTransaction
+from apps.inventory.unit_of_work import StockUnitOfWork
+from apps.analytics.models import SalesDailyRollup
+from apps.analytics.tasks import record_sale_rollup
+from apps.core.jobs import enqueue
+from apps.core.export import export_options, export_response
+from apps.core.pagination import KeysetPagination
+from apps.core.projection import FieldSelectionError, field_selection
+from apps.core.serving import CACHE_PRIVATE, serve_file
+from apps.analytics.aggregations import rollup_summary
+from apps.inventory.stream import publish_sale
+
+
+# Product fields needed to price a sale line
+SALE_PRODUCT_FIELDS = ("name", "is_available", "base_price", "tax_rate")
 
 
 class SalePagination(PageNumberPagination):
@@ -111,66 +128,24 @@ def create_sale(request):
         tax_amount = 0
         sale_items = []
 
-        for item_data in data["items"]:
-            try:
-                product = Product.objects.get(id=item_data["product_id"])
-
-                if not product.is_available:
-                    return Response(
-                        {
-                            "success": False,
-                            "message": f"Product '{product.name}' is not available",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                # Check dealer inventory
-                inventory = DealerInventory.objects(
-                    dealer_id=dealer_id, product_id=str(product.id)
-                ).first()
-
-                if not inventory:
-                    return Response(
-                        {
-                            "success": False,
-                            "message": f"Product '{product.name}' not in inventory",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                if inventory.available_quantity < item_data["quantity"]:
-                    return Response(
-                        {
-                            "success": False,
-                            "message": f"Insufficient stock for '{product.name}'. Available: {inventory.available_quantity}",
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                # Calculate amounts
-                unit_price = product.base_price  # Customer price
-                item_discount = item_data.get("discount", 0.0)
-                discounted_price = unit_price - item_discount
-                item_subtotal = discounted_price * item_data["quantity"]
-                tax_rate = item_data.get("tax_rate", product.tax_rate)
-                item_tax = item_subtotal * (tax_rate / 100)
-
-                subtotal += item_subtotal
-                tax_amount += item_tax
-
-                sale_items.append(
-                    SaleItem(
-                        product_id=str(product.id),
-                        product_name=product.name,
-                        quantity=item_data["quantity"],
-                        unit_price=unit_price,
-                        discount=item_discount,
-                        tax_rate=tax_rate,
-                        subtotal=item_subtotal + item_tax,
-                    )
-                )
+        inventories = {}  # product_id -> DealerInventory checked above
 
-            except Product.DoesNotExist:
+        # Resolve all products, then their dealer inventory lines, in one
+        # query each
+        products = ProductResolver.for_request(request, fields=SALE_PRODUCT_FIELDS)
+        found = products.get_many(
+            item_data["product_id"] for item_data in data["items"]
+        )
+        line_inventories = {
+            inventory.product_id: inventory
+            for inventory in DealerInventory.objects(
+                dealer_id=dealer_id, product_id__in=list(found)
+            )
+        }
+
+        for item_data in data["items"]:
+            product = products.get(item_data["product_id"])
+            if not product:
                 return Response(
                     {
                         "success": False,
@@ -179,6 +154,61 @@ def create_sale(request):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
+            if not product.is_available:
+                return Response(
+                    {
+                        "success": False,
+                        "message": f"Product '{product.name}' is not available",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Check dealer inventory
+            inventory = line_inventories.get(str(product.id))
+
+            if not inventory:
+                return Response(
+                    {
+                        "success": False,
+                        "message": f"Product '{product.name}' not in inventory",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            inventories[str(product.id)] = inventory
+
+            if inventory.available_quantity < item_data["quantity"]:
+                return Response(
+                    {
+                        "success": False,
+                        "message": f"Insufficient stock for '{product.name}'. Available: {inventory.available_quantity}",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Calculate amounts
+            unit_price = product.base_price  # Customer price
+            item_discount = item_data.get("discount", 0.0)
+            discounted_price = unit_price - item_discount
+            item_subtotal = discounted_price * item_data["quantity"]
+            tax_rate = item_data.get("tax_rate", product.tax_rate)
+            item_tax = item_subtotal * (tax_rate / 100)
+
+            subtotal += item_subtotal
+            tax_amount += item_tax
+
+            sale_items.append(
+                SaleItem(
+                    product_id=str(product.id),
+                    product_name=product.name,
+                    quantity=item_data["quantity"],
+                    unit_price=unit_price,
+                    discount=item_discount,
+                    tax_rate=tax_rate,
+                    subtotal=item_subtotal + item_tax,
+                )
+            )
+
         # Calculate grand total
         total_discount = data.get("discount", 0.0)
         grand_total = subtotal + tax_amount - total_discount
@@ -235,45 +265,67 @@ def create_sale(request):
             warranty=warranty_info,
             delivery_status=Sale.DELIVERY_PENDING,
         )
-        sale.save()
 
-        # Deduct from inventory and record transactions
-        for item in sale.items:
-            inventory = DealerInventory.objects(
-                dealer_id=dealer_id, product_id=item.product_id
-            ).first()
-
-            quantity_before = inventory.quantity
-            inventory.deduct_stock(item.quantity)
-
-            # Record inventory transaction
-            InventoryTransaction(
-                dealer_id=dealer_id,
-                product_id=item.product_id,
-                product_name=item.product_name,
-                transaction_type="sale",
-                quantity_change=-item.quantity,
-                quantity_before=quantity_before,
-                quantity_after=inventory.quantity,
-                order_id=str(sale.id),
-                performed_by=employee_id,
-                performed_by_name=user.get_full_name(),
-                notes=f"Sold via invoice {sale.invoice_number}",
-            ).save()
-
-            # Record stock movement
-            StockMovement(
-                product_id=item.product_id,
-                dealer_id=dealer_id,
-                movement_type=StockMovement.MOVEMENT_SALE,
-                quantity=-item.quantity,
-                reference_id=str(sale.id),
-                reference_type="sale",
-                performed_by=employee_id,
-                previous_stock=quantity_before,
-                new_stock=inventory.quantity,
-                notes=f"Sale to customer - Invoice {sale.invoice_number}",
-            ).save()
+        # Deduct stock, insert the sale and write the ledger in one unit of work
+        # (bulk writes, transactional on replica sets). Reuses the inventory
+        # rows loaded during validation.
+        def ledger_rows(item):
+            def build(quantity_before, quantity_after):
+                return [
+                    InventoryTransaction(
+                        dealer_id=dealer_id,
+                        product_id=item.product_id,
+                        product_name=item.product_name,
+                        transaction_type="sale",
+                        quantity_change=-item.quantity,
+                        quantity_before=quantity_before,
+                        quantity_after=quantity_after,
+                        order_id=str(sale.id),
+                        performed_by=employee_id,
+                        performed_by_name=user.get_full_name(),
+                        notes=f"Sold via invoice {sale.invoice_number}",
+                    ),
+                    StockMovement(
+                        product_id=item.product_id,
+                        dealer_id=dealer_id,
+                        movement_type=StockMovement.MOVEMENT_SALE,
+                        quantity=-item.quantity,
+                        reference_id=str(sale.id),
+                        reference_type="sale",
+                        performed_by=employee_id,
+                        previous_stock=quantity_before,
+                        new_stock=quantity_after,
+                        notes=f"Sale to customer - Invoice {sale.invoice_number}",
+                    ),
+                ]
+
+            return build
+
+        unit = StockUnitOfWork()
+        unit.add(sale)
+        for item in sale_items:
+            unit.deduct(
+                inventories[item.product_id], item.quantity, ledger=ledger_rows(item)
+            )
+
+        if not unit.commit():
+            # A concurrent sale took the stock after validation
+            return Response(
+                {
+                    "success": False,
+                    "message": f"Insufficient stock for '{unit.failed.product_name}'. Available: {unit.failed.available_quantity}",
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # Fold into the daily sales rollup off the request thread
+        enqueue(record_sale_rollup, str(sale.id))
+
+        # Invoice PDF is rendered by a worker
+        enqueue(render_invoice_pdf, str(sale.id))
+
+        # Live dealer dashboards (stock deltas were published on commit)
+        publish_sale(sale)
 
         response_serializer = SaleSerializer(sale)
         return Response(
@@ -301,6 +353,52 @@ def create_sale(request):
 # ============================================
 
 
+def _sales_for_user(request, user):
+    """
+    Sales visible to user, or None if the role has no access.
+    - Admin: All sales
+    - Dealer: Sales at their dealership
+    - Employee: Sales made by them (?view_all=true for the dealership)
+    - Customer: Their own purchases
+    """
+    if user.role == User.ROLE_ADMIN:
+        return Sale.objects.all()
+    if user.role == User.ROLE_DEALER:
+        return Sale.objects(dealer_id=str(user.id))
+    if user.role == User.ROLE_EMPLOYEE:
+        # Employee can see their own sales or all dealership sales
+        view_all = request.GET.get("view_all", "false").lower() == "true"
+        if view_all and user.dealer_id:
+            return Sale.objects(dealer_id=user.dealer_id)
+        return Sale.objects(employee_id=str(user.id))
+    if user.role == User.ROLE_CUSTOMER:
+        return Sale.objects(customer_id=str(user.id))
+    return None
+
+
+def _filter_sales(sales, params):
+    """Apply payment_status, delivery_status and start/end_date filters"""
+    # Filter by payment status
+    payment_status = params.get("payment_status", "")
+    if payment_status:
+        sales = sales.filter(payment_status=payment_status)
+
+    # Filter by delivery status
+    delivery_status = params.get("delivery_status", "")
+    if delivery_status:
+        sales = sales.filter(delivery_status=delivery_status)
+
+    # Filter by date range
+    start_date = params.get("start_date", "")
+    end_date = params.get("end_date", "")
+    if start_date:
+        sales = sales.filter(sale_date__gte=datetime.fromisoformat(start_date))
+    if end_date:
+        sales = sales.filter(sale_date__lte=datetime.fromisoformat(end_date))
+
+    return sales
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -313,68 +411,137 @@ def list_sales(request):
     - Customer: Their own purchases
 
     GET /api/billing/sales/
+    Query params: fields, expand (sparse fieldsets, e.g.
+    ?fields=invoice_number,customer.name,grand_total,sale_date)
     """
     try:
         user = request.user
+        field_map = SALE_LIST_MAP.select(*field_selection(request))
 
         # Filter based on role
-        if user.role == User.ROLE_ADMIN:
-            sales = Sale.objects.all()
-        elif user.role == User.ROLE_DEALER:
-            sales = Sale.objects(dealer_id=str(user.id))
-        elif user.role == User.ROLE_EMPLOYEE:
-            # Employee can see their own sales or all dealership sales
-            view_all = request.GET.get("view_all", "false").lower() == "true"
-            if view_all and user.dealer_id:
-                sales = Sale.objects(dealer_id=user.dealer_id)
-            else:
-                sales = Sale.objects(employee_id=str(user.id))
-        elif user.role == User.ROLE_CUSTOMER:
-            sales = Sale.objects(customer_id=str(user.id))
-        else:
+        sales = _sales_for_user(request, user)
+        if sales is None:
             return Response(
                 {"success": False, "message": "Access denied"},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Filter by payment status
-        payment_status = request.GET.get("payment_status", "")
-        if payment_status:
-            sales = sales.filter(payment_status=payment_status)
+        sales = _filter_sales(sales, request.GET)
+        # Raw projected documents, mapped straight to response dicts
+        sales = field_map.project(sales.order_by("-sale_date"), "sale_date")
 
-        # Filter by delivery status
-        delivery_status = request.GET.get("delivery_status", "")
-        if delivery_status:
-            sales = sales.filter(delivery_status=delivery_status)
+        # Pagination (?cursor= for keyset paging)
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination("sale_date")
+        else:
+            paginator = SalePagination()
+        paginated_sales = paginator.paginate_queryset(sales, request)
 
-        # Filter by date range
-        start_date = request.GET.get("start_date", "")
-        end_date = request.GET.get("end_date", "")
-        if start_date:
-            sales = sales.filter(sale_date__gte=datetime.fromisoformat(start_date))
-        if end_date:
-            sales = sales.filter(sale_date__lte=datetime.fromisoformat(end_date))
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_sales)
+        )
 
-        sales = sales.order_by("-sale_date")
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to retrieve sales",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
-        # Pagination
-        paginator = SalePagination()
-        paginated_sales = paginator.paginate_queryset(sales, request)
 
-        serializer = SaleSerializer(paginated_sales, many=True)
-        return paginator.get_paginated_response(serializer.data)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def export_sales(request):
+    """
+    Stream sales as CSV or NDJSON (same role scoping and filters as list_sales).
+
+    GET /api/billing/sales/export/
+    Query params: file_format (csv|ndjson), gzip (true|false), view_all,
+    payment_status, delivery_status, start_date, end_date
+    """
+    try:
+        user = request.user
+
+        sales = _sales_for_user(request, user)
+        if sales is None:
+            return Response(
+                {"success": False, "message": "Access denied"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        fmt, gzip = export_options(request)
+        if fmt is None:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Invalid file_format. Use csv or ndjson",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        sales = _filter_sales(sales, request.GET).order_by("-sale_date")
+        return export_response(sales, SALE_EXPORT_COLUMNS, "sales", fmt, gzip)
 
     except Exception as e:
         return Response(
             {
                 "success": False,
-                "message": "Failed to retrieve sales",
+                "message": "Failed to export sales",
                 "error": str(e),
             },
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+def _sale_access_error(user, sale):
+    """Return a 403 Response if user may not view sale, else None"""
+    if user.role == User.ROLE_ADMIN:
+        return None  # Admin can view any sale
+    if user.role == User.ROLE_DEALER:
+        if sale.dealer_id != str(user.id):
+            return Response(
+                {
+                    "success": False,
+                    "message": "You can only view sales at your dealership",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return None
+    if user.role == User.ROLE_EMPLOYEE:
+        if sale.dealer_id != user.dealer_id:
+            return Response(
+                {
+                    "success": False,
+                    "message": "You can only view sales at your dealership",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return None
+    if user.role == User.ROLE_CUSTOMER:
+        if sale.customer_id != str(user.id):
+            return Response(
+                {
+                    "success": False,
+                    "message": "You can only view your own purchases",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return None
+    return Response(
+        {"success": False, "message": "Access denied"},
+        status=status.HTTP_403_FORBIDDEN,
+    )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -389,40 +556,9 @@ def get_sale(request, sale_id):
         sale = Sale.objects.get(id=sale_id)
 
         # Check permissions
-        if user.role == User.ROLE_ADMIN:
-            pass  # Admin can view any sale
-        elif user.role == User.ROLE_DEALER:
-            if sale.dealer_id != str(user.id):
-                return Response(
-                    {
-                        "success": False,
-                        "message": "You can only view sales at your dealership",
-                    },
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-        elif user.role == User.ROLE_EMPLOYEE:
-            if sale.dealer_id != user.dealer_id:
-                return Response(
-                    {
-                        "success": False,
-                        "message": "You can only view sales at your dealership",
-                    },
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-        elif user.role == User.ROLE_CUSTOMER:
-            if sale.customer_id != str(user.id):
-                return Response(
-                    {
-                        "success": False,
-                        "message": "You can only view your own purchases",
-                    },
-                    status=status.HTTP_403_FORBIDDEN,
-                )
-        else:
-            return Response(
-                {"success": False, "message": "Access denied"},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        denied = _sale_access_error(user, sale)
+        if denied:
+            return denied
 
         serializer = SaleSerializer(sale)
         return Response(
@@ -446,6 +582,53 @@ def get_sale(request, sale_id):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def download_invoice(request, sale_id):
+    """
+    Download the invoice PDF for a sale.
+    Served from the on-disk cache; rendered on demand if the background job
+    has not produced it yet.
+
+    GET /api/billing/sales/<sale_id>/invoice/
+    """
+    try:
+        user = request.user
+        sale = Sale.objects.only("customer_id", "employee_id", *SALE_FIELDS).get(
+            id=sale_id
+        )
+
+        denied = _sale_access_error(user, sale)
+        if denied:
+            return denied
+
+        path = ensure_invoice(sale)
+        return serve_file(
+            request,
+            path,
+            content_type="application/pdf",
+            filename=f"{sale.invoice_number}.pdf",
+            as_attachment=True,
+            cache_control=CACHE_PRIVATE,
+        )
+
+    except Sale.DoesNotExist:
+        return Response(
+            {"success": False, "message": "Sale not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to generate invoice",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -610,26 +793,24 @@ def get_sales_dashboard(request):
         # Filter sales
         if user.role == User.ROLE_ADMIN:
             sales = Sale.objects.all()
+            rollups = SalesDailyRollup.objects.all()
         else:  # Dealer
             sales = Sale.objects(dealer_id=str(user.id))
+            rollups = SalesDailyRollup.objects(dealer_id=str(user.id))
 
-        # Calculate metrics
-        total_sales = sales.count()
-        total_revenue = sum([sale.grand_total for sale in sales])
-
-        # Today's sales
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_sales = sales.filter(sale_date__gte=today_start)
-        today_count = today_sales.count()
-        today_revenue = sum([sale.grand_total for sale in today_sales])
-
-        # This month's sales
-        month_start = datetime.now().replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
+        # Totals, today and this month come from the daily rollup (UTC days)
+        today_start = SalesDailyRollup.day_for(datetime.utcnow())
+        month_start = today_start.replace(day=1)
+        summary = rollup_summary(
+            rollups, windows={"today": today_start, "month": month_start}
         )
-        month_sales = sales.filter(sale_date__gte=month_start)
-        month_count = month_sales.count()
-        month_revenue = sum([sale.grand_total for sale in month_sales])
+
+        total_sales = summary["overall"]["count"]
+        total_revenue = summary["overall"]["revenue"]
+        today_count = summary["windows"]["today"]["count"]
+        today_revenue = summary["windows"]["today"]["revenue"]
+        month_count = summary["windows"]["month"]["count"]
+        month_revenue = summary["windows"]["month"]["revenue"]
 
         # Pending deliveries
         pending_deliveries = sales.filter(delivery_status=Sale.DELIVERY_PENDING).count()
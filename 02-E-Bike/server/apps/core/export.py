@@ -0,0 +1,171 @@
+"""
+Streaming exports.
+Rows are read from a projected server-side cursor (as_pymongo, no_cache,
+batch_size) and encoded as CSV or NDJSON chunk by chunk, optionally gzipped,
+so memory stays flat no matter how many rows are exported. Used by the export
+endpoints (StreamingHttpResponse) and the export_data command (files).
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from bson import ObjectId
+from django.http import StreamingHttpResponse
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+CURSOR_BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024  # Bytes buffered before a chunk is emitted
+
+
+class Column:
+    """
+    One export column.
+    path is a dotted key into the raw document ("customer.name"). Lists of
+    embedded documents (e.g. items) are written as JSON in CSV output.
+    """
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path or name
+
+    @property
+    def field(self):
+        """Top-level field to project"""
+        return "id" if self.path == "_id" else self.path.split(".")[0]
+
+    def value(self, doc):
+        value = doc
+        for key in self.path.split("."):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+
+def _plain(value):
+    """Convert BSON values to JSON/CSV-friendly primitives"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def stream_documents(queryset, columns):
+    """Iterate raw, projected documents through a server-side cursor"""
+    fields = list(dict.fromkeys(column.field for column in columns))
+    return (
+        queryset.only(*fields)
+        .as_pymongo()
+        .no_cache()
+        .batch_size(CURSOR_BATCH_SIZE)
+    )
+
+
+def _buffered(lines):
+    """Join small strings into ~CHUNK_SIZE byte chunks"""
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def csv_lines(documents, columns):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def line(values):
+        writer.writerow(values)
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate(0)
+        return text
+
+    yield line([column.name for column in columns])
+    for doc in documents:
+        row = []
+        for column in columns:
+            value = _plain(column.value(doc))
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            row.append("" if value is None else value)
+        yield line(row)
+
+
+def ndjson_lines(documents, columns):
+    for doc in documents:
+        yield (
+            json.dumps(
+                {column.name: _plain(column.value(doc)) for column in columns}
+            )
+            + "\n"
+        )
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(queryset, columns, fmt=FORMAT_CSV, gzip=False):
+    """Byte chunks of the whole export"""
+    documents = stream_documents(queryset, columns)
+    lines = (
+        csv_lines(documents, columns)
+        if fmt == FORMAT_CSV
+        else ndjson_lines(documents, columns)
+    )
+    chunks = _buffered(lines)
+    return gzipped(chunks) if gzip else chunks
+
+
+def export_response(queryset, columns, filename, fmt=FORMAT_CSV, gzip=False):
+    """StreamingHttpResponse downloading the export as filename.<fmt>[.gz]"""
+    filename = f"{filename}.{fmt}"
+    content_type = CONTENT_TYPES[fmt]
+    if gzip:
+        filename += ".gz"
+        content_type = "application/gzip"
+
+    response = StreamingHttpResponse(
+        export_chunks(queryset, columns, fmt, gzip), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_options(request):
+    """
+    (format, gzip) from ?file_format=csv|ndjson&gzip=true; format is None if
+    invalid. ("format" itself is reserved by DRF content negotiation.)
+    """
+    fmt = request.GET.get("file_format", FORMAT_CSV).lower()
+    gzip = request.GET.get("gzip", "false").lower() in ("1", "true", "yes")
+    return (fmt if fmt in FORMATS else None), gzip
@@ -0,0 +1,43 @@
+"""
+Background job helpers.
+enqueue() hands a task to the Celery broker and, if the broker cannot be
+reached, runs it inline so request handlers never fail because Redis is down.
+checkpointed_batches() streams a collection in resumable batches.
+"""
+
+
+def enqueue(task, *args, **kwargs):
+    """Queue task.delay(*args, **kwargs), falling back to running it inline"""
+    try:
+        return task.delay(*args, **kwargs)
+    except Exception as e:
+        print(f"Broker unavailable for {task.name}, running inline: {e}")
+        return task.apply(args=args, kwargs=kwargs)
+
+
+def checkpointed_batches(collection, query, projection, checkpoint, batch_size):
+    """
+    Yield lists of raw documents matching query in _id order.
+    Starts after checkpoint.last_id and advances the checkpoint once the
+    caller asks for the next batch, so memory stays bounded by batch_size and
+    an interrupted run repeats at most one batch.
+    """
+    if checkpoint.last_id is not None:
+        query = {"$and": [query, {"_id": {"$gt": checkpoint.last_id}}]}
+
+    cursor = (
+        collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+    )
+    batch = []
+    try:
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                checkpoint.advance(batch[-1]["_id"], len(batch))
+                batch = []
+        if batch:
+            yield batch
+            checkpoint.advance(batch[-1]["_id"], len(batch))
+    finally:
+        cursor.close()
@@ -0,0 +1,80 @@
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.billing.exports import SALE_EXPORT_COLUMNS
+from apps.billing.models import Sale
+from apps.core.export import FORMAT_CSV, FORMATS, export_chunks
+from apps.inventory.exports import INVENTORY_TRANSACTION_EXPORT_COLUMNS
+from apps.inventory.models import InventoryTransaction
+from apps.orders.exports import (
+    CUSTOMER_ORDER_EXPORT_COLUMNS,
+    DEALER_ORDER_EXPORT_COLUMNS,
+)
+from apps.orders.models import CustomerOrder, DealerOrder
+
+# resource -> (document, columns, date field)
+RESOURCES = {
+    "sales": (Sale, SALE_EXPORT_COLUMNS, "sale_date"),
+    "dealer-orders": (DealerOrder, DEALER_ORDER_EXPORT_COLUMNS, "created_at"),
+    "customer-orders": (CustomerOrder, CUSTOMER_ORDER_EXPORT_COLUMNS, "created_at"),
+    "inventory-ledger": (
+        InventoryTransaction,
+        INVENTORY_TRANSACTION_EXPORT_COLUMNS,
+        "timestamp",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Stream sales, orders or the inventory ledger to a CSV/NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=sorted(RESOURCES))
+        parser.add_argument("--format", choices=FORMATS, default=FORMAT_CSV)
+        parser.add_argument(
+            "--gzip", action="store_true", help="Gzip the output"
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="Output file (default: stdout)",
+        )
+        parser.add_argument("--dealer", help="Only rows for this dealer id")
+        parser.add_argument("--since", help="Rows on or after YYYY-MM-DD")
+        parser.add_argument("--until", help="Rows before YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        document, columns, date_field = RESOURCES[options["resource"]]
+        queryset = document.objects.order_by(date_field)
+
+        if options["dealer"]:
+            queryset = queryset.filter(dealer_id=options["dealer"])
+
+        for option, operator in (("since", "gte"), ("until", "lt")):
+            if options[option]:
+                try:
+                    value = datetime.strptime(options[option], "%Y-%m-%d")
+                except ValueError:
+                    raise CommandError(f"--{option} must be in YYYY-MM-DD format")
+                queryset = queryset.filter(**{f"{date_field}__{operator}": value})
+
+        chunks = export_chunks(queryset, columns, options["format"], options["gzip"])
+
+        if options["output"]:
+            written = 0
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    written += len(chunk)
+            self.stderr.write(
+                self.style.SUCCESS(
+                    f"✓ Exported {options['resource']} to {options['output']} "
+                    f"({written / 1024:.0f} KB)"
+                )
+            )
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
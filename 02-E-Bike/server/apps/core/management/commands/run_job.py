@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.celery import app
+
+
+class Command(BaseCommand):
+    help = "Run a scheduled Celery job in this process (no broker or worker needed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "job",
+            nargs="?",
+            help="Beat schedule entry (e.g. auto-logout-employees) or task name",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List scheduled jobs",
+        )
+
+    def handle(self, *args, **options):
+        schedule = settings.CELERY_BEAT_SCHEDULE
+
+        if options["list"] or not options["job"]:
+            self.stdout.write(self.style.HTTP_INFO("⏰ Scheduled jobs:"))
+            for name, entry in schedule.items():
+                self.stdout.write(f"  {name:32} {entry['task']}")
+            return
+
+        job = options["job"]
+        task_name = schedule[job]["task"] if job in schedule else job
+
+        app.loader.import_default_modules()
+        if task_name not in app.tasks:
+            raise CommandError(f"Unknown job '{job}'. Use --list to see jobs.")
+
+        self.stdout.write(self.style.HTTP_INFO(f"🔄 Running {task_name}..."))
+        started = time.monotonic()
+        result = app.tasks[task_name].apply(throw=True)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ {result.result} ({elapsed:.2f}s)")
+        )
@@ -0,0 +1,223 @@
+"""
+Content-addressed media store.
+Uploads are hashed while they are streamed to disk and stored once under
+media/blobs/<aa>/<sha256>.<ext>, so the same photo uploaded for several
+products takes the space of one file and its URL never changes content (safe
+for immutable cache headers). MediaBlob.refcount tracks how many Product
+images, profile pictures and service photos reference each blob; unreferenced
+blobs are removed by collect_garbage() after a grace period.
+"""
+
+import glob
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from .models import MediaBlob
+
+BLOB_PREFIX = "/media/blobs/"
+
+
+def _references():
+    """(collection, field) pairs that hold media URLs"""
+    from apps.products.models import Product
+    from apps.service.models import ServiceRequest
+    from apps.users.models import User
+
+    return [
+        (Product._get_collection(), "images.url"),
+        (User._get_collection(), "profile_picture"),
+        (ServiceRequest._get_collection(), "service_photos"),
+    ]
+
+
+# ============================================
+# STORING
+# ============================================
+
+
+def store(uploaded_file):
+    """
+    Stream an UploadedFile into the store and return its media URL.
+    Identical content returns the URL of the existing blob, whatever the
+    extension of the new upload (a blob has exactly one path).
+    """
+    ext = os.path.splitext(uploaded_file.name)[1].lower()
+    tmp_dir = os.path.join(settings.MEDIA_DIRS["BLOBS"], "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}{ext}")
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, "wb") as destination:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            destination.write(chunk)
+            size += len(chunk)
+    digest = digest.hexdigest()
+
+    now = datetime.utcnow()
+    blob = MediaBlob._get_collection().find_one_and_update(
+        {"_id": digest},
+        {
+            "$set": {"uploaded_at": now},
+            "$setOnInsert": {
+                "path": f"blobs/{digest[:2]}/{digest}{ext}",
+                "size": size,
+                "refcount": 0,
+                "unreferenced_since": now,
+            },
+        },
+        projection={"path": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    relative = blob["path"]
+    path = os.path.join(settings.MEDIA_ROOT, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(tmp_path)  # Already stored
+    else:
+        os.replace(tmp_path, path)
+
+    return f"{settings.MEDIA_URL}{relative}"
+
+
+def digest_of(url):
+    """Blob digest for a store URL, or None for any other URL"""
+    if not url or not url.startswith(BLOB_PREFIX):
+        return None
+    name = os.path.basename(url)
+    return os.path.splitext(name)[0]
+
+
+def is_blob(url):
+    return digest_of(url) is not None
+
+
+def touched(document, field):
+    """True if document is new or field changed since it was loaded"""
+    return document._created or any(
+        name.split(".")[0] == field for name in document._get_changed_fields()
+    )
+
+
+def stored(document, field):
+    """Value of field as currently saved in MongoDB (None for new documents)"""
+    if document._created or document.pk is None:
+        return None
+    db_field = document._fields[field].db_field
+    saved = type(document)._get_collection().find_one(
+        {"_id": document.pk}, {db_field: 1}
+    )
+    return (saved or {}).get(db_field)
+
+
+# ============================================
+# REFERENCE COUNTING
+# ============================================
+
+
+def _count(url):
+    return sum(
+        collection.count_documents({field: url})
+        for collection, field in _references()
+    )
+
+
+def _set_refcount(digest, refcount):
+    MediaBlob._get_collection().update_one(
+        {"_id": digest},
+        [
+            {
+                "$set": {
+                    "refcount": refcount,
+                    # Start the grace period when the last reference goes
+                    "unreferenced_since": (
+                        {"$ifNull": ["$unreferenced_since", "$$NOW"]}
+                        if refcount == 0
+                        else None
+                    ),
+                }
+            }
+        ],
+    )
+
+
+def recount(urls):
+    """
+    Recompute the refcount of every store URL in urls from the referencing
+    collections. Call after a write that adds or drops references, passing
+    both the old and the new URLs.
+    """
+    counted = set()
+    for url in urls:
+        digest = digest_of(url)
+        if digest and digest not in counted:
+            counted.add(digest)
+            _set_refcount(digest, _count(url))
+    return len(counted)
+
+
+def recount_all():
+    """Recompute every blob's refcount (repairs drift from missed writes)"""
+    total = 0
+    for blob in MediaBlob._get_collection().find({}, {"path": 1}):
+        _set_refcount(blob["_id"], _count(f"{settings.MEDIA_URL}{blob['path']}"))
+        total += 1
+    return total
+
+
+# ============================================
+# GARBAGE COLLECTION
+# ============================================
+
+
+def _remove_files(blob):
+    path = os.path.join(settings.MEDIA_ROOT, blob["path"])
+    # Resized derivatives are named after the blob digest
+    pattern = os.path.join(
+        settings.MEDIA_DIRS["PRODUCT_VARIANTS"], f"{glob.escape(blob['_id'])}-*"
+    )
+    for file_path in [path, *glob.glob(pattern)]:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+
+def collect_garbage(grace=None):
+    """
+    Delete blobs that have had no references for longer than grace (and were
+    not re-uploaded in that time). Returns (blobs removed, bytes freed).
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.MEDIA_GC_GRACE_HOURS)
+    cutoff = datetime.utcnow() - grace
+    collection = MediaBlob._get_collection()
+    query = {
+        "refcount": 0,
+        "unreferenced_since": {"$lt": cutoff},
+        "uploaded_at": {"$lt": cutoff},
+    }
+
+    removed = 0
+    freed = 0
+    for blob in collection.find(query, {"path": 1, "size": 1}):
+        refcount = _count(f"{settings.MEDIA_URL}{blob['path']}")
+        if refcount:
+            # Referenced after all (a write skipped recount)
+            _set_refcount(blob["_id"], refcount)
+            continue
+        # Conditional delete: skips blobs re-uploaded since the scan
+        if collection.delete_one({"_id": blob["_id"], **query}).deleted_count:
+            _remove_files(blob)
+            removed += 1
+            freed += blob.get("size") or 0
+
+    return removed, freed
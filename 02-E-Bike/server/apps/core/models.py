@@ -0,0 +1,127 @@
+from mongoengine import (
+    Document,
+    StringField,
+    IntField,
+    DateTimeField,
+    BooleanField,
+    ObjectIdField,
+)
+from pymongo import ReturnDocument
+from datetime import datetime
+
+
+class CacheVersion(Document):
+    """
+    Named version counters used to invalidate process-local caches.
+    Writers bump the counter; every worker compares it with the version its
+    cache was built from and drops the cache when they differ.
+    """
+
+    name = StringField(primary_key=True)
+    version = IntField(default=0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "cache_versions",
+    }
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def current(cls, name):
+        """Return the current version for name (0 if never bumped)"""
+        doc = cls._get_collection().find_one({"_id": name}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    @classmethod
+    def bump(cls, name):
+        """Atomically increment and return the version for name"""
+        doc = cls._get_collection().find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
+
+
+class JobCheckpoint(Document):
+    """
+    Progress of a batched background job run.
+    Jobs walk their collection in _id order and record the last _id handled,
+    so an interrupted run resumes where it stopped instead of starting over.
+    """
+
+    name = StringField(primary_key=True)  # e.g. "warranty_reminders:2024-05-01"
+    last_id = ObjectIdField()
+    processed = IntField(default=0)
+    completed = BooleanField(default=False)
+    started_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "job_checkpoints",
+        "indexes": [
+            {"fields": ["updated_at"], "expireAfterSeconds": 30 * 24 * 3600},
+        ],
+    }
+
+    def __str__(self):
+        return f"{self.name} ({self.processed} processed)"
+
+    @classmethod
+    def resume(cls, name):
+        """Return the checkpoint for name, creating it on the first run"""
+        now = datetime.utcnow()
+        cls._get_collection().update_one(
+            {"_id": name},
+            {"$setOnInsert": {"processed": 0, "completed": False, "started_at": now}},
+            upsert=True,
+        )
+        return cls.objects.get(name=name)
+
+    def advance(self, last_id, count):
+        """Record that count more documents up to last_id are done"""
+        self.last_id = last_id
+        self.processed += count
+        self._get_collection().update_one(
+            {"_id": self.name},
+            {
+                "$set": {"last_id": last_id, "updated_at": datetime.utcnow()},
+                "$inc": {"processed": count},
+            },
+        )
+
+    def complete(self):
+        self.completed = True
+        self._get_collection().update_one(
+            {"_id": self.name},
+            {"$set": {"completed": True, "updated_at": datetime.utcnow()}},
+        )
+
+
+class MediaBlob(Document):
+    """
+    An uploaded file stored once under the sha256 of its content.
+    refcount is the number of Product images, profile pictures and service
+    photos pointing at the blob's URL; blobs that stay at zero past the grace
+    period are removed by the media garbage collector.
+    """
+
+    digest = StringField(primary_key=True)  # sha256 hex
+    path = StringField(required=True)  # Relative to MEDIA_ROOT
+    size = IntField(default=0)
+    refcount = IntField(default=0)
+    unreferenced_since = DateTimeField()
+    uploaded_at = DateTimeField(default=datetime.utcnow)  # Last (re-)upload
+
+    meta = {
+        "collection": "media_blobs",
+        "indexes": [
+            ("refcount", "unreferenced_since"),
+        ],
+    }
+
+    def __str__(self):
+        return f"{self.path} ({self.refcount} refs)"
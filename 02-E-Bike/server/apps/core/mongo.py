@@ -0,0 +1,30 @@
+"""
+MongoDB helpers shared by the apps.
+"""
+
+from django.conf import settings
+from mongoengine.connection import get_connection
+from pymongo.topology_description import TOPOLOGY_TYPE
+
+_TRANSACTIONAL_TOPOLOGIES = (
+    TOPOLOGY_TYPE.ReplicaSetWithPrimary,
+    TOPOLOGY_TYPE.Sharded,
+)
+
+
+def supports_transactions():
+    """True when connected to a replica set or sharded cluster"""
+    if not getattr(settings, "MONGODB_TRANSACTIONS", True):
+        return False
+    client = get_connection()
+    return client.topology_description.topology_type in _TRANSACTIONAL_TOPOLOGIES
+
+
+def run_in_transaction(callback):
+    """
+    Run callback(session) inside a transaction (retried on transient errors)
+    and return its result. Raises if transactions are unavailable; check
+    supports_transactions() first.
+    """
+    with get_connection().start_session() as session:
+        return session.with_transaction(callback)
@@ -0,0 +1,170 @@
+"""
+Keyset (cursor) pagination for MongoEngine querysets.
+Pages are ordered newest first on (<field>, _id) and continue from the last
+row seen instead of skipping, so page N costs the same as page 1. Tokens are
+opaque; the total count is only computed when asked for.
+
+Opt-in per request: ?cursor= (empty for the first page) or
+?pagination=cursor. Views keep PageNumberPagination as the default and swap
+in KeysetPagination, which has the same paginate_queryset /
+get_paginated_response interface. Pages may hold Documents or raw
+as_pymongo() dicts.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from mongoengine.queryset.visitor import Q
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """
+    Usage:
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination("sale_date")
+        else:
+            paginator = SalePagination()
+        page = paginator.paginate_queryset(sales, request)
+        ...
+        return paginator.get_paginated_response(serializer.data)
+
+    Query params: cursor, page_size, count (exact|estimated)
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, field, page_size=20, max_page_size=100):
+        self.field = field
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    @classmethod
+    def requested(cls, request):
+        return (
+            cls.cursor_query_param in request.GET
+            or request.GET.get("pagination") == "cursor"
+        )
+
+    # ------------------------------------------------------------------
+    # Tokens
+    # ------------------------------------------------------------------
+
+    def _encode(self, obj, direction):
+        if isinstance(obj, dict):
+            # Raw document from an as_pymongo() queryset
+            value, pk = obj.get(self.field), obj["_id"]
+        else:
+            value, pk = getattr(obj, self.field), obj.pk
+        if isinstance(value, datetime):
+            value = {"$date": value.isoformat()}
+        payload = json.dumps({"v": value, "id": str(pk), "d": direction})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode(self, token):
+        """(value, ObjectId, direction), or None for a malformed token"""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value = payload["v"]
+            if isinstance(value, dict):
+                value = datetime.fromisoformat(value["$date"])
+            if payload["d"] not in ("next", "prev"):
+                raise ValueError(payload["d"])
+            return value, ObjectId(payload["id"]), payload["d"]
+        except (ValueError, KeyError, TypeError, InvalidId):
+            return None
+
+    # ------------------------------------------------------------------
+    # Paging
+    # ------------------------------------------------------------------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        token = request.GET.get(self.cursor_query_param, "")
+
+        self.count = self._count(queryset, request.GET.get("count", ""))
+
+        field = self.field
+        cursor = self._decode(token) if token else None
+        if cursor:
+            value, pk, direction = cursor
+            if direction == "next":
+                # Rows after the cursor in (field, _id) descending order
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+                )
+        else:
+            # No (or a malformed) cursor: first page
+            token, direction = "", "next"
+
+        if direction == "next":
+            rows = list(queryset.order_by(f"-{field}", "-id").limit(size + 1))
+            has_more = len(rows) > size
+            rows = rows[:size]
+            self.has_next, self.has_previous = has_more, bool(token)
+        else:
+            rows = list(queryset.order_by(field, "id").limit(size + 1))
+            has_more = len(rows) > size
+            rows = list(reversed(rows[:size]))
+            self.has_next, self.has_previous = True, has_more
+
+        self.page = rows
+        return rows
+
+    def _count(self, queryset, mode):
+        if mode == "exact":
+            return queryset.count()
+        if mode == "estimated":
+            # Collection-wide estimate from metadata (ignores filters)
+            return queryset._document._get_collection().estimated_document_count()
+        return None
+
+    def _link(self, obj, direction):
+        url = self.request.build_absolute_uri()
+        if obj is None:
+            return None
+        return replace_query_param(
+            url, self.cursor_query_param, self._encode(obj, direction)
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], "next")
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self._link(self.page[0], "prev")
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
@@ -0,0 +1,290 @@
+"""
+Projected read path for list endpoints.
+A FieldMap is compiled once per resource from its DRF serializer and its
+MongoEngine document: for every response key it records the raw BSON key, a
+plain converter and the model default. List views then query with
+only(*field_map.fields).as_pymongo() (or read cached SON) and build response
+dicts straight from the raw documents, with no Document instantiation and no
+per-field serializer dispatch. The output matches Serializer(...).data.
+
+    SALE_LIST_MAP = FieldMap(Sale, SaleSerializer, computed={"id": raw_id})
+    sales = SALE_LIST_MAP.project(sales.order_by("-sale_date"))
+    data = SALE_LIST_MAP.dump_many(page)
+
+Sparse fieldsets: field_map.select(*field_selection(request)) narrows both the
+Mongo projection and the response to ?fields= / ?expand= (see select()).
+"""
+
+import copy
+
+from mongoengine.base import BaseDocument
+from mongoengine.fields import EmbeddedDocumentField, ListField
+from rest_framework import serializers
+
+# Converters equivalent to to_representation() for plain values
+_FAST_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.FloatField: float,
+    serializers.IntegerField: int,
+    serializers.BooleanField: bool,
+}
+
+
+def raw_id(doc):
+    """computed= helper for the usual get_id() method field"""
+    return str(doc["_id"])
+
+
+def _embedded_type(field):
+    """Embedded document class behind a document field, if any"""
+    if isinstance(field, ListField):
+        field = field.field
+    if isinstance(field, EmbeddedDocumentField):
+        return field.document_type
+    return None
+
+
+def _default_factory(field):
+    """
+    Callable returning the model default for a missing key, as stored in
+    MongoDB (evaluated per document, like the Document would)
+    """
+    if field.default is None:
+        return None
+
+    def default():
+        value = field.default() if callable(field.default) else field.default
+        if isinstance(value, BaseDocument):
+            return value.to_mongo().to_dict()
+        return value
+
+    return default
+
+
+def _converter(serializer_field):
+    fast = _FAST_CONVERTERS.get(type(serializer_field))
+    if fast is not None:
+        return fast
+    if isinstance(serializer_field, serializers.DictField):
+        return dict
+    if isinstance(serializer_field, serializers.ListField):
+        child = _converter(serializer_field.child)
+        return lambda values: [
+            None if value is None else child(value) for value in values
+        ]
+    return serializer_field.to_representation
+
+
+class FieldSelectionError(ValueError):
+    """Unknown name in ?fields= / ?expand="""
+
+
+def field_selection(request):
+    """
+    (fields, expand) from ?fields=invoice_number,customer.name&expand=items.
+    Each is a tuple of names, or None when the parameter is absent.
+    """
+
+    def names(param):
+        if param not in request.GET:
+            return None
+        parts = (name.strip() for name in request.GET[param].split(","))
+        return tuple(dict.fromkeys(name for name in parts if name))
+
+    return names("fields"), names("expand")
+
+
+class _Column:
+    """One response key: a document field (optionally embedded) or computed"""
+
+    def __init__(
+        self,
+        name,
+        source=None,
+        raw_key=None,
+        convert=None,
+        default=None,
+        nested=None,
+        many=False,
+        compute=None,
+        depends=(),
+    ):
+        self.name = name
+        self.source = source
+        self.raw_key = raw_key
+        self.convert = convert
+        self.default = default
+        self.nested = nested  # FieldMap of an embedded document
+        self.many = many
+        self.compute = compute
+        self.depends = depends
+        self.partial = False  # nested is a sub-selection
+
+    def narrowed(self, nested):
+        column = copy.copy(self)
+        column.nested = nested
+        column.partial = True
+        column.convert = nested.dump_many if self.many else nested.dump
+        return column
+
+
+class FieldMap:
+    """
+    Precompiled raw-document -> response-dict mapping for one serializer.
+    computed maps method fields to fn(raw_doc), or to (fn, [fields it reads])
+    so sparse selections still project what the function needs.
+    """
+
+    def __init__(self, document, serializer_class, computed=None):
+        self.document = document
+        self._columns = {}
+        self._selections = {}
+        computed = computed or {}
+        model_fields = document._fields
+
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                compute, depends = computed[name], ()
+                if isinstance(compute, tuple):
+                    compute, depends = compute
+                self._columns[name] = _Column(
+                    name, compute=compute, depends=tuple(depends)
+                )
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                raise ValueError(f"{serializer_class.__name__}.{name} needs computed=")
+
+            source = field.source or name
+            model_field = model_fields.get(source)
+            if model_field is None:
+                raise ValueError(f"{document.__name__} has no field {source!r}")
+
+            nested = None
+            many = isinstance(field, serializers.ListSerializer)
+            if many:
+                nested = FieldMap(_embedded_type(model_field), type(field.child))
+                convert = nested.dump_many
+            elif isinstance(field, serializers.Serializer):
+                nested = FieldMap(_embedded_type(model_field), type(field))
+                convert = nested.dump
+            else:
+                convert = _converter(field)
+
+            self._columns[name] = _Column(
+                name,
+                source=source,
+                raw_key="_id" if source == "id" else model_field.db_field,
+                convert=convert,
+                default=_default_factory(model_field),
+                nested=nested,
+                many=many,
+            )
+
+        self._compile()
+
+    def _compile(self):
+        self._steps = []  # (key, raw key, converter, default) or (key, fn)
+        projected = set()
+        for column in self._columns.values():
+            if column.compute is not None:
+                self._steps.append((column.name, column.compute))
+                projected.update(column.depends)
+                continue
+            self._steps.append(
+                (column.name, column.raw_key, column.convert, column.default)
+            )
+            if column.partial:
+                projected.update(
+                    f"{column.source}.{sub}" for sub in column.nested.fields
+                )
+            else:
+                projected.add(column.source)
+        self.fields = sorted(projected)
+
+    # ------------------------------------------------------------------
+    # Sparse fieldsets
+    # ------------------------------------------------------------------
+
+    def select(self, fields=None, expand=None):
+        """
+        Derived map for a field_selection():
+        - fields: keys to return; "customer.name" selects sub-fields of an
+          embedded document (or of each entry of a list, e.g. items.quantity)
+        - expand: embedded fields to return in full
+        - fields omitted: every plain field, embedded ones only if expanded
+        "id" is always kept. Raises FieldSelectionError for unknown names.
+        """
+        if fields is None and expand is None:
+            return self
+        key = (fields, expand)
+        if key in self._selections:
+            return self._selections[key]
+
+        whole = set(expand or ())
+        parts = {}
+        if fields is None:
+            whole.update(
+                name
+                for name, column in self._columns.items()
+                if column.nested is None
+            )
+        else:
+            for name in fields:
+                head, _, rest = name.partition(".")
+                if rest:
+                    parts.setdefault(head, []).append(rest)
+                else:
+                    whole.add(head)
+
+        unknown = sorted((whole | set(parts)) - set(self._columns))
+        if unknown:
+            raise FieldSelectionError(f"Unknown field(s): {', '.join(unknown)}")
+
+        columns = {}
+        for name, column in self._columns.items():
+            if name == "id" or name in whole:
+                columns[name] = column
+            elif name in parts:
+                if column.nested is None:
+                    raise FieldSelectionError(f"{name} has no sub-fields")
+                columns[name] = column.narrowed(
+                    column.nested.select(tuple(parts[name]))
+                )
+
+        derived = copy.copy(self)
+        derived._columns = columns
+        derived._selections = {}
+        derived._compile()
+        if len(self._selections) < 256:
+            self._selections[key] = derived
+        return derived
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def project(self, queryset, *extra_fields):
+        """queryset narrowed to the mapped fields, returning raw documents"""
+        return queryset.only(*self.fields, *extra_fields).as_pymongo()
+
+    def dump(self, doc):
+        if doc is None:
+            return None
+        data = {}
+        for step in self._steps:
+            if len(step) == 2:
+                data[step[0]] = step[1](doc)
+                continue
+            key, raw_key, convert, default = step
+            value = doc.get(raw_key)
+            if value is None and default is not None and raw_key not in doc:
+                value = default()
+            data[key] = None if value is None else convert(value)
+        return data
+
+    def dump_many(self, docs):
+        dump = self.dump
+        return [dump(doc) for doc in docs]
@@ -0,0 +1,30 @@
+"""
+Optional shared Redis client for caches.
+get_redis() returns None when REDIS_CACHE_URL is unset or the redis package is
+missing, so callers fall back to process-local behaviour.
+"""
+
+from django.conf import settings
+
+_client = None
+_initialised = False
+
+
+def get_redis():
+    """Return the shared Redis client or None"""
+    global _client, _initialised
+
+    if not _initialised:
+        _initialised = True
+        url = getattr(settings, "REDIS_CACHE_URL", "")
+        if url:
+            try:
+                import redis
+
+                _client = redis.Redis.from_url(
+                    url, socket_timeout=0.2, socket_connect_timeout=0.2
+                )
+            except ImportError:
+                _client = None
+
+    return _client
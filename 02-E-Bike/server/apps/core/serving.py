@@ -0,0 +1,198 @@
+"""
+Media file serving.
+serve_file() answers conditional requests (If-None-Match / If-Modified-Since)
+with 304 and then, depending on MEDIA_SERVE_MODE:
+- "nginx":  returns an empty response with X-Accel-Redirect so nginx sends
+            the file from its internal MEDIA_ACCEL_PREFIX location
+- "apache": returns X-Sendfile with the absolute path (mod_xsendfile)
+- "django": streams a FileResponse with single-range support; under gunicorn
+            the open file is handed to sendfile(), so no bytes pass through
+            Python
+Access checks stay in the calling view; only the byte transfer is handed off.
+"""
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+MODE_DJANGO = "django"
+MODE_NGINX = "nginx"
+MODE_APACHE = "apache"
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_DEFAULT = "public, max-age=3600"
+CACHE_PRIVATE = "private, no-cache"
+
+# Immutable URLs: content-addressed blobs and their resized derivatives
+IMMUTABLE_PREFIXES = ("blobs/", "products/variants/")
+
+# Only reachable through views that check access (e.g. download_invoice)
+PRIVATE_PREFIXES = ("invoices/",)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _FileRange:
+    """Read-limited view of an open file, for one byte range"""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets gunicorn sendfile() the range from the current offset
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def _etag(stat):
+    return quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags or "*" in tags
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(mtime) <= since
+
+
+def _byte_range(request, etag, size):
+    """(start, end) for a satisfiable single range, None for the full file,
+    or False if the range cannot be satisfied"""
+    header = request.headers.get("Range")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        return None  # File changed since the client's partial copy
+
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # Multiple or malformed ranges: send the whole file
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)  # Suffix range: last N bytes
+        end = size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _headers(response, etag, stat, cache_control):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def serve_file(
+    request,
+    path,
+    content_type=None,
+    filename=None,
+    as_attachment=False,
+    cache_control=CACHE_DEFAULT,
+):
+    """Response sending the file at path (which must be under MEDIA_ROOT)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404("File not found")
+
+    etag = _etag(stat)
+    if _not_modified(request, etag, stat.st_mtime):
+        return _headers(HttpResponseNotModified(), etag, stat, cache_control)
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    mode = settings.MEDIA_SERVE_MODE
+
+    if mode in (MODE_NGINX, MODE_APACHE):
+        response = HttpResponse(content_type=content_type)
+        if mode == MODE_NGINX:
+            relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + relative
+        else:
+            response["X-Sendfile"] = path
+        if filename or as_attachment:
+            disposition = "attachment" if as_attachment else "inline"
+            name = filename or os.path.basename(path)
+            response["Content-Disposition"] = f'{disposition}; filename="{name}"'
+        # The proxy handles Range requests itself
+        return _headers(response, etag, stat, cache_control)
+
+    byte_range = _byte_range(request, etag, stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return _headers(response, etag, stat, cache_control)
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(
+            file,
+            as_attachment=as_attachment,
+            filename=filename or "",
+            content_type=content_type,
+        )
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            _FileRange(file, start, end - start + 1),
+            as_attachment=as_attachment,
+            filename=filename or "",
+            content_type=content_type,
+            status=206,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    return _headers(response, etag, stat, cache_control)
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Public media under MEDIA_URL (product images, videos, derivatives).
+    Private files such as invoices are only served by their own views.
+
+    GET /media/<path>
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    # Check the resolved path, so "./invoices/" or "products/../invoices/"
+    # cannot reach private files
+    relative = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, "/")
+    if relative.startswith(PRIVATE_PREFIXES) or not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    immutable = relative.startswith(IMMUTABLE_PREFIXES)
+    return serve_file(
+        request,
+        full_path,
+        cache_control=CACHE_IMMUTABLE if immutable else CACHE_DEFAULT,
+    )
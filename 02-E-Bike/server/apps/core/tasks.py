@@ -0,0 +1,13 @@
+from celery import shared_task
+from .media import collect_garbage, recount_all
+
+
+@shared_task
+def collect_media_garbage():
+    """Repair refcounts, then remove blobs unreferenced past the grace period"""
+    counted = recount_all()
+    removed, freed = collect_garbage()
+    return (
+        f"Recounted {counted} media blobs, removed {removed} "
+        f"({freed / (1024 * 1024):.1f} MB freed)"
+    )
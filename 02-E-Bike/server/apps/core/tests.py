@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .serving import serve_media
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        root = self.media_root.name
+        for directory in ("invoices", "products"):
+            os.makedirs(os.path.join(root, directory))
+        with open(os.path.join(root, "invoices", "INV-1.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4 invoice")
+        with open(os.path.join(root, "products", "bike.jpg"), "wb") as f:
+            f.write(b"jpeg")
+
+        settings_override = override_settings(
+            MEDIA_ROOT=root, MEDIA_SERVE_MODE="django"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.factory = RequestFactory()
+
+    def serve(self, path):
+        return serve_media(self.factory.get(f"/media/{path}"), path)
+
+    def test_serves_public_media(self):
+        response = self.serve("products/bike.jpg")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"jpeg")
+        response.close()
+
+    def test_invoices_are_private(self):
+        with self.assertRaises(Http404):
+            self.serve("invoices/INV-1.pdf")
+
+    def test_dot_segments_cannot_reach_invoices(self):
+        for path in ("./invoices/INV-1.pdf", "products/../invoices/INV-1.pdf"):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self.serve(path)
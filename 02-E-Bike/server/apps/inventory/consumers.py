@@ -0,0 +1,104 @@
+"""
+WebSocket consumer for the live dealer stream.
+
+Connect: ws://<host>/ws/dealer/stream/?token=<access token>
+
+Dealers and their staff are subscribed to their own dealer automatically.
+Admins choose dealers with {"type": "subscribe", "dealer_id": "..."} and
+{"type": "unsubscribe", "dealer_id": "..."}. Events are described in
+apps.inventory.stream.
+"""
+
+from bson import ObjectId
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.users.models import User
+
+from .stream import dealer_group
+
+ADMIN_ROLES = (User.ROLE_ADMIN, User.ROLE_SUPER_ADMIN)
+MAX_SUBSCRIPTIONS = 50  # Dealer groups one admin socket may follow
+
+
+def own_dealer_id(user):
+    """Dealer a non-admin user belongs to (dealers are their own dealer)"""
+    if user.role == User.ROLE_DEALER:
+        return str(user.id)
+    return user.dealer_id or None
+
+
+class DealerStreamConsumer(AsyncJsonWebsocketConsumer):
+    """Forwards dealer.<id> group events to the client"""
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.is_admin = user.role in ADMIN_ROLES
+        self.own_dealer_id = None if self.is_admin else own_dealer_id(user)
+        if not self.is_admin and not self.own_dealer_id:
+            await self.close(code=4403)
+            return
+
+        self.user = user
+        self.dealer_ids = set()
+        await self.accept()
+
+        if not self.is_admin:
+            await self.subscribe(self.own_dealer_id)
+
+    async def disconnect(self, code):
+        for dealer_id in getattr(self, "dealer_ids", set()):
+            await self.channel_layer.group_discard(
+                dealer_group(dealer_id), self.channel_name
+            )
+
+    async def subscribe(self, dealer_id):
+        if dealer_id not in self.dealer_ids:
+            await self.channel_layer.group_add(
+                dealer_group(dealer_id), self.channel_name
+            )
+            self.dealer_ids.add(dealer_id)
+        await self.send_json({"type": "subscribed", "dealer_id": dealer_id})
+
+    async def send_error(self, message, dealer_id=None):
+        await self.send_json(
+            {"type": "error", "message": message, "dealer_id": dealer_id}
+        )
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict):
+            await self.send_error("Invalid message")
+            return
+        message_type = content.get("type")
+        dealer_id = content.get("dealer_id")
+
+        if message_type == "ping":
+            await self.send_json({"type": "pong"})
+        elif message_type in ("subscribe", "unsubscribe"):
+            # Only well-formed ids reach group names
+            if not isinstance(dealer_id, str) or not ObjectId.is_valid(dealer_id):
+                await self.send_error("Invalid dealer_id")
+            # Dealers and their staff can only ever see their own dealer
+            elif not self.is_admin and dealer_id != self.own_dealer_id:
+                await self.send_error("Access denied", dealer_id)
+            elif (
+                message_type == "subscribe"
+                and dealer_id not in self.dealer_ids
+                and len(self.dealer_ids) >= MAX_SUBSCRIPTIONS
+            ):
+                await self.send_error(
+                    f"At most {MAX_SUBSCRIPTIONS} dealers per connection", dealer_id
+                )
+            elif message_type == "subscribe":
+                await self.subscribe(dealer_id)
+            else:
+                await self.channel_layer.group_discard(
+                    dealer_group(dealer_id), self.channel_name
+                )
+                self.dealer_ids.discard(dealer_id)
+                await self.send_json({"type": "unsubscribed", "dealer_id": dealer_id})
+
+    async def dealer_event(self, event):
+        await self.send_json(event["event"])
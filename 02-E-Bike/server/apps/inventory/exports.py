@@ -0,0 +1,19 @@
+"""Export columns for the inventory ledger (see apps.core.export)"""
+
+from apps.core.export import Column
+
+INVENTORY_TRANSACTION_EXPORT_COLUMNS = [
+    Column("id", "_id"),
+    Column("timestamp"),
+    Column("dealer_id"),
+    Column("product_id"),
+    Column("product_name"),
+    Column("transaction_type"),
+    Column("quantity_change"),
+    Column("quantity_before"),
+    Column("quantity_after"),
+    Column("order_id"),
+    Column("performed_by"),
+    Column("performed_by_name"),
+    Column("notes"),
+]
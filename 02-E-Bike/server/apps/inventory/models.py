@@ -1,4 +1,5 @@
 from mongoengine import Document, StringField, IntField, DateTimeField, BooleanField
+from pymongo import ReturnDocument
 from datetime import datetime
 
 
@@ -36,6 +37,10 @@ class DealerInventory(Document):
             "dealer_id",
             "product_id",
             "low_stock_alert",
+            # Keyset pagination for the admin listing (created_at never
+            # changes, unlike updated_at, so rows cannot jump the cursor)
+            ("-created_at", "-id"),
+            ("dealer_id", "-created_at", "-id"),
         ],
         "ordering": ["-updated_at"],
     }
@@ -53,41 +58,131 @@ class DealerInventory(Document):
         else:
             self.low_stock_alert = False
 
-        return super(DealerInventory, self).save(*args, **kwargs)
+        result = super(DealerInventory, self).save(*args, **kwargs)
+        self._publish_stock()
+        return result
 
     @property
     def available_quantity(self):
         """Get available quantity (total - reserved)"""
         return max(0, self.quantity - self.reserved_quantity)
 
+    # ------------------------------------------------------------------
+    # Atomic stock operations
+    # Each is a single guarded find_one_and_update using an update pipeline,
+    # so concurrent terminals can't oversell and low_stock_alert is
+    # recomputed in the same write. On success the instance is refreshed
+    # from the returned document.
+    # ------------------------------------------------------------------
+
+    _QUANTITY = {"$ifNull": ["$quantity", 0]}
+    _RESERVED = {"$ifNull": ["$reserved_quantity", 0]}
+    _AVAILABLE = {"$max": [0, {"$subtract": [_QUANTITY, _RESERVED]}]}
+
+    @classmethod
+    def stock_update_pipeline(cls, changes):
+        """Update pipeline applying changes and recomputing low_stock_alert"""
+        return [
+            {"$set": dict(changes, updated_at=datetime.utcnow())},
+            {
+                "$set": {
+                    "low_stock_alert": {
+                        "$lte": [
+                            cls._AVAILABLE,
+                            {"$ifNull": ["$low_stock_threshold", 5]},
+                        ]
+                    }
+                }
+            },
+        ]
+
+    @classmethod
+    def deduction(cls, quantity):
+        """(guard, changes) for deducting sold stock"""
+        return (
+            {"quantity": {"$gte": quantity}},
+            {
+                "quantity": {"$subtract": [cls._QUANTITY, quantity]},
+                "reserved_quantity": {
+                    "$max": [0, {"$subtract": [cls._RESERVED, quantity]}]
+                },
+                "last_sold": datetime.utcnow(),
+            },
+        )
+
+    def refresh_stock(self, doc):
+        """Copy stock fields from a raw document onto this instance"""
+        for field in (
+            "quantity",
+            "reserved_quantity",
+            "low_stock_alert",
+            "last_restocked",
+            "last_sold",
+            "updated_at",
+        ):
+            setattr(self, field, doc.get(field))
+        self._clear_changed_fields()
+
+    def _apply_stock_update(self, guard, changes):
+        """Run a guarded pipeline update; return False if the guard failed"""
+        pipeline = self.stock_update_pipeline(changes)
+        doc = self._get_collection().find_one_and_update(
+            dict(guard, _id=self.pk),
+            pipeline,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return False
+
+        self.refresh_stock(doc)
+        self._publish_stock()
+        return True
+
+    def _publish_stock(self):
+        from .stream import publish_stock
+
+        publish_stock([self])
+
     def reserve_stock(self, quantity):
         """Reserve stock for an order"""
-        if self.available_quantity >= quantity:
-            self.reserved_quantity += quantity
-            self.save()
-            return True
-        return False
+        return self._apply_stock_update(
+            {"$expr": {"$gte": [self._AVAILABLE, quantity]}},
+            {"reserved_quantity": {"$add": [self._RESERVED, quantity]}},
+        )
 
     def release_stock(self, quantity):
         """Release reserved stock"""
-        self.reserved_quantity = max(0, self.reserved_quantity - quantity)
-        self.save()
+        return self._apply_stock_update(
+            {},
+            {
+                "reserved_quantity": {
+                    "$max": [0, {"$subtract": [self._RESERVED, quantity]}]
+                }
+            },
+        )
 
     def deduct_stock(self, quantity):
         """Deduct stock after sale"""
-        if self.quantity >= quantity:
-            self.quantity -= quantity
-            self.reserved_quantity = max(0, self.reserved_quantity - quantity)
-            self.last_sold = datetime.utcnow()
-            self.save()
-            return True
-        return False
+        return self._apply_stock_update(*self.deduction(quantity))
 
     def add_stock(self, quantity):
         """Add stock (restocking)"""
-        self.quantity += quantity
-        self.last_restocked = datetime.utcnow()
-        self.save()
+        return self._apply_stock_update(
+            {},
+            {
+                "quantity": {"$add": [self._QUANTITY, quantity]},
+                "last_restocked": datetime.utcnow(),
+            },
+        )
+
+    def adjust_stock(self, quantity_change):
+        """Apply a signed manual adjustment without letting quantity go negative"""
+        guard = {}
+        if quantity_change < 0:
+            guard = {"quantity": {"$gte": -quantity_change}}
+        return self._apply_stock_update(
+            guard, {"quantity": {"$add": [self._QUANTITY, quantity_change]}}
+        )
 
 
 class InventoryTransaction(Document):
@@ -126,6 +221,8 @@ class InventoryTransaction(Document):
             "dealer_id",
             "product_id",
             "-timestamp",
+            # Keyset pagination per inventory item
+            ("dealer_id", "product_id", "-timestamp", "-id"),
         ],
         "ordering": ["-timestamp"],
     }
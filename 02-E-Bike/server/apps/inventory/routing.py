@@ -0,0 +1,6 @@
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path("ws/dealer/stream/", consumers.DealerStreamConsumer.as_asgi()),
+]
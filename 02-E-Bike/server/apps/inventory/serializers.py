@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.projection import FieldMap, raw_id
 from .models import DealerInventory, InventoryTransaction
 
 
@@ -28,6 +29,24 @@ class DealerInventorySerializer(serializers.Serializer):
         return obj.available_quantity
 
 
+def _raw_available_quantity(doc):
+    return max(0, doc.get("quantity", 0) - doc.get("reserved_quantity", 0))
+
+
+# Raw-document read paths for inventory lists (?fields= / ?expand=)
+DEALER_INVENTORY_LIST_MAP = FieldMap(
+    DealerInventory,
+    DealerInventorySerializer,
+    computed={
+        "id": raw_id,
+        "available_quantity": (
+            _raw_available_quantity,
+            ["quantity", "reserved_quantity"],
+        ),
+    },
+)
+
+
 class InventoryAdjustmentSerializer(serializers.Serializer):
     """Serializer for manual inventory adjustment"""
 
@@ -64,3 +83,8 @@ class InventoryTransactionSerializer(serializers.Serializer):
 
     def get_id(self, obj):
         return str(obj.id)
+
+
+INVENTORY_TRANSACTION_LIST_MAP = FieldMap(
+    InventoryTransaction, InventoryTransactionSerializer, computed={"id": raw_id}
+)
@@ -0,0 +1,92 @@
+"""
+Live per-dealer event stream.
+Stock changes, sales and order approvals are published as small delta events
+to the dealer.<id> channel group. DealerStreamConsumer forwards them to
+subscribed dashboards, which apply them locally and only reload in full after
+a reconnect.
+
+Event shape sent to clients:
+    {"type": "stock", "dealer_id": "...", "items": [{product_id, quantity, ...}]}
+    {"type": "sale", "dealer_id": "...", "sale": {...}}
+    {"type": "order_approved", "dealer_id": "...", "order": {...}}
+"""
+
+from collections import OrderedDict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+
+def dealer_group(dealer_id):
+    return f"dealer.{dealer_id}"
+
+
+def publish(dealer_id, event):
+    """Send one event to a dealer's group; never raises"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not dealer_id:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            dealer_group(dealer_id),
+            {"type": "dealer.event", "event": dict(event, dealer_id=dealer_id)},
+        )
+    except Exception as e:
+        print(f"Failed to publish {event.get('type')} for dealer {dealer_id}: {e}")
+
+
+def stock_delta(inventory):
+    """Current stock of one DealerInventory row"""
+    return {
+        "inventory_id": str(inventory.id),
+        "product_id": inventory.product_id,
+        "quantity": inventory.quantity,
+        "reserved_quantity": inventory.reserved_quantity,
+        "available_quantity": inventory.available_quantity,
+        "low_stock_alert": inventory.low_stock_alert,
+    }
+
+
+def publish_stock(inventories):
+    """Publish the stock of the given rows, one event per dealer"""
+    by_dealer = OrderedDict()
+    for inventory in inventories:
+        by_dealer.setdefault(inventory.dealer_id, []).append(stock_delta(inventory))
+    for dealer_id, items in by_dealer.items():
+        publish(dealer_id, {"type": "stock", "items": items})
+
+
+def publish_sale(sale):
+    publish(
+        sale.dealer_id,
+        {
+            "type": "sale",
+            "sale": {
+                "id": str(sale.id),
+                "invoice_number": sale.invoice_number,
+                "grand_total": sale.grand_total,
+                "payment_method": sale.payment_method,
+                "items_count": sum(item.quantity for item in sale.items),
+                "sale_date": sale.sale_date.isoformat() if sale.sale_date else None,
+            },
+        },
+    )
+
+
+def publish_order_approved(order):
+    publish(
+        order.dealer_id,
+        {
+            "type": "order_approved",
+            "order": {
+                "id": str(order.id),
+                "order_number": order.order_number,
+                "status": order.status,
+                "expected_delivery": (
+                    order.expected_delivery.isoformat()
+                    if order.expected_delivery
+                    else None
+                ),
+            },
+        },
+    )
@@ -0,0 +1,180 @@
+"""
+Unit of work for stock-changing operations.
+Collects inventory deductions, the documents they belong to (e.g. a Sale) and
+their ledger rows, then flushes everything in a handful of bulk round-trips:
+inside a MongoDB transaction on replica sets, or with atomic per-row updates
+and compensation on standalone servers.
+"""
+
+from collections import OrderedDict
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from apps.core.mongo import run_in_transaction, supports_transactions
+
+from .models import DealerInventory
+from .stream import publish_stock
+
+
+class InsufficientStock(Exception):
+    """Raised inside a flush when a guarded deduction matched nothing"""
+
+    def __init__(self, inventory):
+        super().__init__(f"Insufficient stock for {inventory.product_name}")
+        self.inventory = inventory
+
+
+class StockUnitOfWork:
+    """
+    Usage:
+        uow = StockUnitOfWork()
+        uow.add(sale)
+        for item in sale.items:
+            uow.deduct(inventory, item.quantity, ledger=build_rows)
+        if not uow.commit():
+            uow.failed  # DealerInventory that ran out of stock
+
+    ledger is called as ledger(quantity_before, quantity_after) once the new
+    stock level is known and returns the documents to insert for that line.
+    """
+
+    def __init__(self):
+        self._inventories = OrderedDict()  # inventory pk -> DealerInventory
+        self._totals = OrderedDict()  # inventory pk -> total quantity
+        self._lines = []  # (inventory pk, quantity, ledger)
+        self._documents = []
+        self.failed = None
+
+    def add(self, document):
+        """Insert document as part of this unit (an id is assigned now)"""
+        if document.pk is None:
+            document.pk = ObjectId()
+        self._documents.append(document)
+
+    def deduct(self, inventory, quantity, ledger=None):
+        """Queue a stock deduction; lines on the same inventory are coalesced"""
+        self._inventories[inventory.pk] = inventory
+        self._totals[inventory.pk] = self._totals.get(inventory.pk, 0) + quantity
+        self._lines.append((inventory.pk, quantity, ledger))
+
+    def commit(self):
+        """Flush the unit; returns False (and sets self.failed) on a stock shortfall"""
+        try:
+            if supports_transactions():
+                run_in_transaction(self._flush_transactional)
+                # Bulk writes bypass DealerInventory's own publishing
+                publish_stock(self._inventories.values())
+            else:
+                self._flush_compensating()
+        except InsufficientStock as e:
+            self.failed = e.inventory
+            self.failed.reload()
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Flush strategies
+    # ------------------------------------------------------------------
+
+    def _flush_transactional(self, session):
+        collection = DealerInventory._get_collection()
+
+        operations = []
+        for pk, total in self._totals.items():
+            guard, changes = DealerInventory.deduction(total)
+            operations.append(
+                UpdateOne(
+                    dict(guard, _id=pk),
+                    DealerInventory.stock_update_pipeline(changes),
+                )
+            )
+
+        if operations:
+            result = collection.bulk_write(operations, session=session)
+            if result.matched_count != len(operations):
+                # Aborts the transaction; find the row that ran short
+                short = collection.find_one(
+                    {
+                        "$or": [
+                            {"_id": pk, "quantity": {"$lt": total}}
+                            for pk, total in self._totals.items()
+                        ]
+                    },
+                    {"_id": 1},
+                )
+                pk = short["_id"] if short else next(iter(self._totals))
+                raise InsufficientStock(self._inventories[pk])
+
+            for doc in collection.find(
+                {"_id": {"$in": list(self._totals)}}, session=session
+            ):
+                self._inventories[doc["_id"]].refresh_stock(doc)
+
+        self._insert_all(self._documents + self._ledger_rows(), session=session)
+
+    def _flush_compensating(self):
+        deducted = []
+        try:
+            for pk, total in self._totals.items():
+                inventory = self._inventories[pk]
+                if not inventory.deduct_stock(total):
+                    raise InsufficientStock(inventory)
+                deducted.append((inventory, total))
+
+            rows = self._ledger_rows()
+            self._insert_all(self._documents)
+            try:
+                self._insert_all(rows)
+            except Exception:
+                self._delete_all(self._documents)
+                raise
+        except Exception:
+            for inventory, total in deducted:
+                inventory.adjust_stock(total)
+            raise
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _ledger_rows(self):
+        """Build ledger documents with exact before/after per line"""
+        # Walk lines in order from the pre-deduction level of each inventory
+        levels = {
+            pk: self._inventories[pk].quantity + total
+            for pk, total in self._totals.items()
+        }
+        rows = []
+        for pk, quantity, ledger in self._lines:
+            before = levels[pk]
+            after = before - quantity
+            levels[pk] = after
+            if ledger:
+                rows.extend(ledger(before, after))
+        return rows
+
+    @staticmethod
+    def _group(documents):
+        """Validate documents and group their SON by collection"""
+        grouped = OrderedDict()
+        for document in documents:
+            if document.pk is None:
+                document.pk = ObjectId()
+            document.validate()
+            collection = document._get_collection()
+            grouped.setdefault(collection.name, (collection, []))[1].append(
+                document.to_mongo()
+            )
+        return list(grouped.values())
+
+    def _insert_all(self, documents, session=None):
+        for collection, docs in self._group(documents):
+            collection.insert_many(docs, session=session)
+        for document in documents:
+            document._created = False
+            document._clear_changed_fields()
+
+    def _delete_all(self, documents):
+        for collection, docs in self._group(documents):
+            collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
@@ -9,6 +9,11 @@ urlpatterns = [
     # ============================================
     path("", views.get_dealer_inventory, name="dealer-inventory"),
     path("low-stock/", views.get_low_stock_items, name="low-stock"),
+    path(
+        "ledger/export/",
+        views.export_inventory_transactions,
+        name="export-inventory-transactions",
+    ),
     path("<str:inventory_id>/", views.get_inventory_item, name="inventory-item"),
     path(
         "<str:inventory_id>/transactions/",
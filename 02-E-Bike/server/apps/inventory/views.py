@@ -12,16 +12,22 @@ from rest_framework.decorators import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from datetime import datetime
 
 from .models import DealerInventory, InventoryTransaction
+from .exports import INVENTORY_TRANSACTION_EXPORT_COLUMNS
 from .serializers import (
+    DEALER_INVENTORY_LIST_MAP,
+    INVENTORY_TRANSACTION_LIST_MAP,
     DealerInventorySerializer,
     InventoryAdjustmentSerializer,
-    InventoryTransactionSerializer,
 )
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
 from apps.products.models import Product
+from apps.core.export import export_options, export_response
+from apps.core.pagination import KeysetPagination
+from apps.core.projection import FieldSelectionError, field_selection
 
 
 class InventoryPagination(PageNumberPagination):
@@ -45,9 +51,11 @@ def get_dealer_inventory(request):
     - Employee: View their dealer's inventory
 
     GET /api/inventory/
+    Query params: low_stock, fields (sparse fieldset)
     """
     try:
         user = request.user
+        field_map = DEALER_INVENTORY_LIST_MAP.select(*field_selection(request))
 
         # Get dealer_id based on role
         if user.role == User.ROLE_DEALER:
@@ -79,15 +87,21 @@ def get_dealer_inventory(request):
         if low_stock_only:
             inventory = inventory.filter(low_stock_alert=True)
 
-        inventory = inventory.order_by("-updated_at")
+        inventory = field_map.project(inventory.order_by("-updated_at"))
 
         # Pagination
         paginator = InventoryPagination()
         paginated_inventory = paginator.paginate_queryset(inventory, request)
 
-        serializer = DealerInventorySerializer(paginated_inventory, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_inventory)
+        )
 
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {
@@ -278,23 +292,19 @@ def adjust_inventory(request, inventory_id):
         transaction_type = data.get("transaction_type", "adjustment")
         notes = data.get("notes", "")
 
-        # Record quantity before
-        quantity_before = inventory_item.quantity
-
-        # Apply change
-        new_quantity = quantity_before + quantity_change
-
-        if new_quantity < 0:
+        # Apply change atomically (refuses to go below zero)
+        if not inventory_item.adjust_stock(quantity_change):
+            inventory_item.reload()
             return Response(
                 {
                     "success": False,
-                    "message": f"Insufficient stock. Current: {quantity_before}",
+                    "message": f"Insufficient stock. Current: {inventory_item.quantity}",
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        inventory_item.quantity = new_quantity
-        inventory_item.save()
+        new_quantity = inventory_item.quantity
+        quantity_before = new_quantity - quantity_change
 
         # Record transaction
         transaction = InventoryTransaction(
@@ -345,9 +355,11 @@ def get_inventory_transactions(request, inventory_id):
     Get transaction history for inventory item.
 
     GET /api/inventory/<inventory_id>/transactions/
+    Query params: cursor, fields (sparse fieldset)
     """
     try:
         user = request.user
+        field_map = INVENTORY_TRANSACTION_LIST_MAP.select(*field_selection(request))
         inventory_item = DealerInventory.objects.get(id=inventory_id)
 
         # Check permissions
@@ -381,13 +393,20 @@ def get_inventory_transactions(request, inventory_id):
         transactions = InventoryTransaction.objects(
             dealer_id=inventory_item.dealer_id, product_id=inventory_item.product_id
         ).order_by("-timestamp")
+        transactions = field_map.project(transactions, "timestamp")
+
+        # Opt-in keyset paging (?cursor=); otherwise the full history
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination("timestamp", page_size=50, max_page_size=200)
+            page = paginator.paginate_queryset(transactions, request)
+            return paginator.get_paginated_response(field_map.dump_many(page))
 
-        serializer = InventoryTransactionSerializer(transactions, many=True)
+        data = field_map.dump_many(transactions)
         return Response(
             {
                 "success": True,
-                "count": len(serializer.data),
-                "transactions": serializer.data,
+                "count": len(data),
+                "transactions": data,
             },
             status=status.HTTP_200_OK,
         )
@@ -408,6 +427,86 @@ def get_inventory_transactions(request, inventory_id):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def export_inventory_transactions(request):
+    """
+    Stream the inventory ledger as CSV or NDJSON.
+    - Admin: All dealers (optionally ?dealer_id=)
+    - Dealer: Their own ledger
+    - Employee: Their dealer's ledger
+
+    GET /api/inventory/ledger/export/
+    Query params: file_format (csv|ndjson), gzip (true|false), dealer_id,
+    product_id, transaction_type, start_date, end_date
+    """
+    try:
+        user = request.user
+
+        if user.role == User.ROLE_ADMIN:
+            transactions = InventoryTransaction.objects.all()
+            dealer_id = request.GET.get("dealer_id", "")
+            if dealer_id:
+                transactions = transactions.filter(dealer_id=dealer_id)
+        elif user.role == User.ROLE_DEALER:
+            transactions = InventoryTransaction.objects(dealer_id=str(user.id))
+        elif user.role == User.ROLE_EMPLOYEE and user.dealer_id:
+            transactions = InventoryTransaction.objects(dealer_id=user.dealer_id)
+        else:
+            return Response(
+                {"success": False, "message": "Access denied"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        fmt, gzip = export_options(request)
+        if fmt is None:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Invalid file_format. Use csv or ndjson",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        product_id = request.GET.get("product_id", "")
+        if product_id:
+            transactions = transactions.filter(product_id=product_id)
+
+        transaction_type = request.GET.get("transaction_type", "")
+        if transaction_type:
+            transactions = transactions.filter(transaction_type=transaction_type)
+
+        start_date = request.GET.get("start_date", "")
+        end_date = request.GET.get("end_date", "")
+        if start_date:
+            transactions = transactions.filter(
+                timestamp__gte=datetime.fromisoformat(start_date)
+            )
+        if end_date:
+            transactions = transactions.filter(
+                timestamp__lte=datetime.fromisoformat(end_date)
+            )
+
+        return export_response(
+            transactions.order_by("-timestamp"),
+            INVENTORY_TRANSACTION_EXPORT_COLUMNS,
+            "inventory-ledger",
+            fmt,
+            gzip,
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to export inventory ledger",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 # ============================================
 # ADMIN ENDPOINTS (View All Inventories)
 # ============================================
@@ -421,8 +520,11 @@ def get_all_dealer_inventories(request):
     Get all dealer inventories (Admin only).
 
     GET /api/inventory/all/
+    Query params: low_stock, dealer_id, cursor, fields (sparse fieldset)
     """
     try:
+        field_map = DEALER_INVENTORY_LIST_MAP.select(*field_selection(request))
+
         # Check if user is Admin
         if request.user.role != User.ROLE_ADMIN:
             return Response(
@@ -446,15 +548,28 @@ def get_all_dealer_inventories(request):
         if dealer_id:
             inventories = inventories.filter(dealer_id=dealer_id)
 
-        inventories = inventories.order_by("-updated_at")
-
-        # Pagination
-        paginator = InventoryPagination()
+        # Pagination (?cursor= for keyset paging on the immutable created_at)
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination(
+                "created_at", page_size=50, max_page_size=200
+            )
+            inventories = field_map.project(
+                inventories.order_by("-created_at"), "created_at"
+            )
+        else:
+            paginator = InventoryPagination()
+            inventories = field_map.project(inventories.order_by("-updated_at"))
         paginated_inventories = paginator.paginate_queryset(inventories, request)
 
-        serializer = DealerInventorySerializer(paginated_inventories, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_inventories)
+        )
 
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {
@@ -0,0 +1,48 @@
+"""
+WebSocket consumer for notifications.
+
+Connect: ws://<host>/ws/notifications/?token=<access token>
+
+Server -> client messages:
+    {"type": "unread_count", "unread_count": 3}        (on connect)
+    {"type": "notification", "notification": {...}}    (on create)
+"""
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from . import counters
+from .push import groups_for_user
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """Per-user push channel for new notifications"""
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.groups_joined = groups_for_user(user)
+        for group in self.groups_joined:
+            await self.channel_layer.group_add(group, self.channel_name)
+
+        await self.accept()
+
+        unread_count = await database_sync_to_async(counters.get_unread)(user)
+        await self.send_json({"type": "unread_count", "unread_count": unread_count})
+
+    async def disconnect(self, code):
+        for group in getattr(self, "groups_joined", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Keep-alive for proxies that drop idle connections
+        if content.get("type") == "ping":
+            await self.send_json({"type": "pong"})
+
+    async def notification_created(self, event):
+        await self.send_json(
+            {"type": "notification", "notification": event["notification"]}
+        )
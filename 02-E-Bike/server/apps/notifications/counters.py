@@ -0,0 +1,213 @@
+"""
+Per-user unread notification counters.
+Counters are fanned out when a notification is created, decremented when it is
+read, and released (decremented for everyone who had not read it) when it is
+deactivated or expires. Reads are a single key lookup: Redis when configured,
+otherwise the notification_unread_counters collection.
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from apps.core.redis import get_redis
+from apps.users.models import User
+
+from .models import Notification, NotificationRead, UnreadCounter
+
+REDIS_PREFIX = "notif:unread:"
+REDIS_TTL = 60  # seconds
+BATCH_SIZE = 1000
+
+
+def recipient_ids(notification):
+    """Yield ids of active users a notification is addressed to"""
+    users = User.objects(is_active=True)
+
+    if notification.recipient_type == Notification.RECIPIENT_ROLE:
+        users = users.filter(role__in=notification.recipient_roles)
+    elif notification.recipient_type == Notification.RECIPIENT_SPECIFIC:
+        users = users.filter(
+            id__in=[i for i in notification.recipient_ids if ObjectId.is_valid(i)]
+        )
+    elif notification.recipient_type == Notification.RECIPIENT_DEALER_EMPLOYEES:
+        users = users.filter(dealer_id=notification.dealer_id)
+    elif notification.recipient_type != Notification.RECIPIENT_ALL:
+        return
+
+    for user_id in users.scalar("id"):
+        yield str(user_id)
+
+
+def _batches(ids):
+    batch = []
+    for user_id in ids:
+        batch.append(user_id)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _apply_delta(user_ids, delta):
+    """Add delta to each user's counter (never below zero) and drop Redis copies"""
+    now = datetime.utcnow()
+    collection = UnreadCounter._get_collection()
+
+    if delta > 0:
+        # No upsert: users without a counter get a full rebuild on first read
+        operations = [
+            UpdateOne(
+                {"_id": user_id},
+                {"$inc": {"unread": delta}, "$set": {"updated_at": now}},
+            )
+            for user_id in user_ids
+        ]
+    else:
+        operations = [
+            UpdateOne(
+                {"_id": user_id},
+                [
+                    {
+                        "$set": {
+                            "unread": {"$max": [0, {"$add": ["$unread", delta]}]},
+                            "updated_at": now,
+                        }
+                    }
+                ],
+            )
+            for user_id in user_ids
+        ]
+
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+        _forget(user_ids)
+
+
+def _forget(user_ids):
+    client = get_redis()
+    if client is None or not user_ids:
+        return
+    try:
+        client.delete(*[REDIS_PREFIX + user_id for user_id in user_ids])
+    except Exception:
+        pass
+
+
+def increment(user_ids):
+    """Add one unread notification for each of user_ids"""
+    for batch in _batches(str(user_id) for user_id in user_ids):
+        _apply_delta(batch, 1)
+
+
+def _readers(notification):
+    return set(
+        NotificationRead._get_collection().distinct(
+            "user_id", {"notification_id": str(notification.id)}
+        )
+    )
+
+
+def fan_out(notification):
+    """
+    Increment counters for every recipient of a new notification, except
+    those who already read it (reads before delivery are not decremented)
+    """
+    readers = _readers(notification)
+    total = 0
+    unread = (
+        user_id for user_id in recipient_ids(notification) if user_id not in readers
+    )
+    for batch in _batches(unread):
+        _apply_delta(batch, 1)
+        total += len(batch)
+    return total
+
+
+def release(notification):
+    """
+    Decrement counters for recipients who never read a notification that is
+    being deactivated or has expired. Runs at most once per notification.
+    """
+    previous = Notification._get_collection().find_one_and_update(
+        {"_id": notification.pk, "counters_released": {"$ne": True}},
+        {"$set": {"counters_released": True}},
+        projection={"pending_delivery": 1},
+    )
+    if previous is None or previous.get("pending_delivery"):
+        # Already released, or never fanned out (delivery is now skipped)
+        return 0
+
+    readers = _readers(notification)
+    total = 0
+    unread = (
+        user_id for user_id in recipient_ids(notification) if user_id not in readers
+    )
+    for batch in _batches(unread):
+        _apply_delta(batch, -1)
+        total += len(batch)
+    return total
+
+
+def mark_read(user_id, count=1):
+    """Decrement a user's counter after count new reads"""
+    if count:
+        _apply_delta([str(user_id)], -count)
+
+
+def reset(user_id):
+    """Set a user's counter to zero (after mark-all-as-read)"""
+    UnreadCounter._get_collection().update_one(
+        {"_id": str(user_id)},
+        {"$set": {"unread": 0, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    _forget([str(user_id)])
+
+
+def compute(user):
+    """Count a user's unread notifications from source data"""
+    return (
+        Notification.objects.for_user(user)
+        .filter(id__nin=NotificationRead.read_ids(user.id))
+        .count()
+    )
+
+
+def rebuild(user):
+    """Recompute and store a user's counter from source data"""
+    unread = compute(user)
+    UnreadCounter._get_collection().update_one(
+        {"_id": str(user.id)},
+        {"$set": {"unread": unread, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    _forget([str(user.id)])
+    return unread
+
+
+def get_unread(user):
+    """Single key lookup; users without a counter yet get one built lazily"""
+    user_id = str(user.id)
+    client = get_redis()
+
+    if client is not None:
+        try:
+            cached = client.get(REDIS_PREFIX + user_id)
+            if cached is not None:
+                return int(cached)
+        except Exception:
+            client = None
+
+    doc = UnreadCounter._get_collection().find_one({"_id": user_id}, {"unread": 1})
+    unread = doc["unread"] if doc else rebuild(user)
+
+    if client is not None:
+        try:
+            client.set(REDIS_PREFIX + user_id, unread, ex=REDIS_TTL)
+        except Exception:
+            pass
+
+    return unread
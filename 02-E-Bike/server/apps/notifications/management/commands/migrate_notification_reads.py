@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from apps.notifications.models import Notification, NotificationRead
+
+
+class Command(BaseCommand):
+    help = "Copy embedded read_by receipts into the notification_reads collection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear-embedded",
+            action="store_true",
+            help="Remove read_by from notifications after copying",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Read rows written per bulk write",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.HTTP_INFO("📬 Migrating notification read receipts..."))
+
+        reads = NotificationRead._get_collection()
+        notifications = Notification._get_collection().find(
+            {"read_by.0": {"$exists": True}},
+            {"read_by": 1, "expires_at": 1},
+        )
+
+        operations = []
+        migrated = 0
+        for notification in notifications:
+            for receipt in notification.get("read_by", []):
+                operations.append(
+                    UpdateOne(
+                        {
+                            "user_id": receipt["user_id"],
+                            "notification_id": str(notification["_id"]),
+                        },
+                        {
+                            "$setOnInsert": {
+                                "read_at": receipt.get("read_at"),
+                                "expires_at": notification.get("expires_at"),
+                            }
+                        },
+                        upsert=True,
+                    )
+                )
+                if len(operations) >= options["batch_size"]:
+                    migrated += reads.bulk_write(operations, ordered=False).upserted_count
+                    operations = []
+
+        if operations:
+            migrated += reads.bulk_write(operations, ordered=False).upserted_count
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {migrated} read receipts migrated"))
+
+        if options["clear_embedded"]:
+            result = Notification._get_collection().update_many(
+                {"read_by.0": {"$exists": True}}, {"$set": {"read_by": []}}
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✓ Cleared read_by on {result.modified_count} notifications"
+                )
+            )
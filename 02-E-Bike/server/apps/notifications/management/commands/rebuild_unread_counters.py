@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications import counters
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user unread notification counters from source data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Only rebuild the counter for this user id",
+        )
+
+    def handle(self, *args, **options):
+        if options["user"]:
+            users = User.objects(id=options["user"])
+            if not users.count():
+                raise CommandError(f"User {options['user']} not found")
+        else:
+            users = User.objects(is_active=True)
+
+        self.stdout.write(self.style.HTTP_INFO("🔔 Rebuilding unread counters..."))
+
+        rebuilt = 0
+        drifted = 0
+        for user in users.only("id", "role", "dealer_id").no_cache():
+            before = counters.UnreadCounter.objects(user_id=str(user.id)).first()
+            unread = counters.rebuild(user)
+            if before is None or before.unread != unread:
+                drifted += 1
+            rebuilt += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {rebuilt} counters rebuilt ({drifted} were missing or wrong)"
+            )
+        )
@@ -2,12 +2,16 @@ from mongoengine import (
     Document,
     StringField,
     BooleanField,
+    IntField,
     DateTimeField,
     ListField,
     EmbeddedDocument,
     EmbeddedDocumentField,
+    QuerySet,
+    Q,
 )
 from datetime import datetime
+from pymongo import UpdateOne
 
 
 class ReadReceipt(EmbeddedDocument):
@@ -17,6 +21,30 @@ class ReadReceipt(EmbeddedDocument):
     read_at = DateTimeField(default=datetime.utcnow)
 
 
+class NotificationQuerySet(QuerySet):
+    """Queryset with recipient targeting expressed as indexed predicates"""
+
+    def for_user(self, user, now=None):
+        """Active, unexpired notifications addressed to user"""
+        targets = (
+            Q(recipient_type=Notification.RECIPIENT_ALL)
+            | Q(recipient_type=Notification.RECIPIENT_ROLE, recipient_roles=user.role)
+            | Q(
+                recipient_type=Notification.RECIPIENT_SPECIFIC,
+                recipient_ids=str(user.id),
+            )
+        )
+        if user.dealer_id:
+            targets |= Q(
+                recipient_type=Notification.RECIPIENT_DEALER_EMPLOYEES,
+                dealer_id=user.dealer_id,
+            )
+
+        return self.filter(
+            targets, is_active=True, expires_at__gte=now or datetime.utcnow()
+        )
+
+
 class Notification(Document):
     """Notification model"""
 
@@ -76,21 +104,108 @@ class Notification(Document):
 
     # Delivery tracking
     sent_at = DateTimeField(default=datetime.utcnow)
+    # Legacy embedded receipts; read state now lives in NotificationRead
     read_by = ListField(EmbeddedDocumentField(ReadReceipt))
 
     # Status
     is_active = BooleanField(default=True)
     expires_at = DateTimeField()
+    pending_delivery = BooleanField(default=False)  # Fan-out/push job not run yet
+    counters_released = BooleanField(default=False)  # Unread counters decremented
 
     meta = {
         "collection": "notifications",
+        "queryset_class": NotificationQuerySet,
         "indexes": [
             "sent_by",
-            "recipient_type",
             "-sent_at",
+            # One index per targeting clause of NotificationQuerySet.for_user,
+            # each ending in sent_at so the feed is a merge of index scans
+            ("recipient_type", "-sent_at"),
+            ("recipient_type", "recipient_roles", "-sent_at"),
+            ("recipient_type", "recipient_ids", "-sent_at"),
+            ("recipient_type", "dealer_id", "-sent_at"),
+            ("counters_released", "expires_at"),
         ],
         "ordering": ["-sent_at"],
     }
 
     def __str__(self):
         return f"Notification: {self.title}"
+
+
+class NotificationRead(Document):
+    """
+    Per-user read state, kept out of the notification document so that feeds
+    and unread counts only touch the reader's own rows.
+    Rows expire a day after their notification (TTL index on expires_at), which
+    leaves time for unread counters to be released first.
+    """
+
+    user_id = StringField(required=True, max_length=24)
+    notification_id = StringField(required=True, max_length=24)
+    read_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField()
+
+    meta = {
+        "collection": "notification_reads",
+        "indexes": [
+            {"fields": ["user_id", "notification_id"], "unique": True},
+            {"fields": ["notification_id"]},
+            {"fields": ["expires_at"], "expireAfterSeconds": 86400},
+        ],
+    }
+
+    def __str__(self):
+        return f"{self.user_id} read {self.notification_id}"
+
+    @classmethod
+    def read_ids(cls, user_id):
+        """Ids of notifications user_id has read (still unexpired)"""
+        return [
+            row["notification_id"]
+            for row in cls._get_collection().find(
+                {"user_id": str(user_id)}, {"notification_id": 1, "_id": 0}
+            )
+        ]
+
+    @classmethod
+    def mark(cls, user_id, notifications):
+        """Record reads for notifications (idempotent); returns rows created"""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": str(user_id), "notification_id": str(notification.id)},
+                {
+                    "$setOnInsert": {
+                        "read_at": now,
+                        "expires_at": notification.expires_at,
+                    }
+                },
+                upsert=True,
+            )
+            for notification in notifications
+        ]
+        if not operations:
+            return 0
+        result = cls._get_collection().bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+
+class UnreadCounter(Document):
+    """
+    Materialized unread notification count per user.
+    Maintained by apps.notifications.counters; rebuilt by the
+    rebuild_unread_counters command.
+    """
+
+    user_id = StringField(primary_key=True)
+    unread = IntField(default=0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "notification_unread_counters",
+    }
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
@@ -0,0 +1,61 @@
+"""
+Push delivery of notifications over the channel layer.
+Every connected NotificationConsumer joins the groups below; a new
+notification is sent to the group(s) matching its recipient type, so clients
+no longer poll /my/ and /unread-count/.
+"""
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .models import Notification
+from .serializers import NotificationSerializer
+
+GROUP_ALL = "notifications.all"
+
+
+def user_group(user_id):
+    return f"notifications.user.{user_id}"
+
+
+def role_group(role):
+    return f"notifications.role.{role}"
+
+
+def dealer_group(dealer_id):
+    return f"notifications.dealer.{dealer_id}"
+
+
+def groups_for_user(user):
+    """Groups a connected user listens on"""
+    groups = [GROUP_ALL, user_group(user.id), role_group(user.role)]
+    if user.dealer_id:
+        groups.append(dealer_group(user.dealer_id))
+    return groups
+
+
+def groups_for_notification(notification):
+    """Groups a notification must be delivered to"""
+    if notification.recipient_type == Notification.RECIPIENT_ALL:
+        return [GROUP_ALL]
+    if notification.recipient_type == Notification.RECIPIENT_ROLE:
+        return [role_group(role) for role in notification.recipient_roles]
+    if notification.recipient_type == Notification.RECIPIENT_SPECIFIC:
+        return [user_group(user_id) for user_id in notification.recipient_ids]
+    if notification.recipient_type == Notification.RECIPIENT_DEALER_EMPLOYEES:
+        return [dealer_group(notification.dealer_id)] if notification.dealer_id else []
+    return []
+
+
+def push_notification(notification):
+    """Send a saved notification to every connected recipient"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    message = {
+        "type": "notification.created",
+        "notification": NotificationSerializer(notification).data,
+    }
+    for group in groups_for_notification(notification):
+        async_to_sync(channel_layer.group_send)(group, message)
@@ -0,0 +1,45 @@
+from celery import shared_task
+from .models import Notification
+from . import counters
+from .push import push_notification
+from datetime import datetime
+
+
+@shared_task
+def release_expired_notifications():
+    """Release unread counters held by expired notifications"""
+    expired = Notification.objects(
+        counters_released__ne=True, expires_at__lt=datetime.utcnow()
+    ).only("id", "recipient_type", "recipient_roles", "recipient_ids", "dealer_id")
+
+    released = 0
+    for notification in expired:
+        counters.release(notification)
+        released += 1
+
+    print(f"Released counters for {released} expired notifications")
+    return f"Released counters for {released} notifications"
+
+
+@shared_task
+def deliver_notification(notification_id):
+    """
+    Fan out unread counters and push a new notification to connected clients.
+    Idempotent: only the run that clears pending_delivery does the work.
+    """
+    notification = Notification.objects(
+        id=notification_id, pending_delivery=True, counters_released__ne=True
+    ).modify(set__pending_delivery=False, new=True)
+
+    if notification is None:
+        return f"Notification {notification_id} already delivered"
+
+    recipients = counters.fan_out(notification)
+
+    try:
+        push_notification(notification)
+    except Exception as e:
+        # Clients still see it on their next fetch
+        print(f"Failed to push notification {notification_id}: {e}")
+
+    return f"Delivered notification {notification_id} to {recipients} recipients"
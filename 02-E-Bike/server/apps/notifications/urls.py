@@ -11,5 +11,10 @@ urlpatterns = [
     path("unread-count/", views.get_unread_count, name="unread-count"),
     # Actions
     path("<str:notification_id>/read/", views.mark_as_read, name="mark-as-read"),
+    path(
+        "<str:notification_id>/deactivate/",
+        views.deactivate_notification,
+        name="deactivate-notification",
+    ),
     path("read-all/", views.mark_all_as_read, name="mark-all-as-read"),
 ]
@@ -14,10 +14,13 @@ from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from datetime import datetime, timedelta
 
-from .models import Notification, ReadReceipt
+from .models import Notification, NotificationRead
+from . import counters
+from .tasks import deliver_notification
 from .serializers import NotificationSerializer
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
+from apps.core.jobs import enqueue
 
 
 class NotificationPagination(PageNumberPagination):
@@ -106,8 +109,12 @@ def create_notification(request):
         expires_in_days = request.data.get("expires_in_days", 30)
         notification.expires_at = datetime.utcnow() + timedelta(days=expires_in_days)
 
+        notification.pending_delivery = True
         notification.save()
 
+        # Unread counters and WebSocket push run off the request thread
+        enqueue(deliver_notification, str(notification.id))
+
         serializer = NotificationSerializer(notification)
         return Response(
             {
@@ -149,62 +156,27 @@ def get_my_notifications(request):
         user_id = str(user.id)
         unread_only = request.GET.get("unread_only", "false").lower() == "true"
 
-        # Get active notifications
-        current_time = datetime.utcnow()
+        # Notifications targeted to this user (index-bounded query)
+        notifications = Notification.objects.for_user(user)
+        read_ids = set(NotificationRead.read_ids(user_id))
 
-        # Build query for notifications targeted to this user
-        notifications = Notification.objects(
-            is_active=True, expires_at__gte=current_time
-        )
+        if unread_only:
+            notifications = notifications.filter(id__nin=list(read_ids))
 
-        # Filter by recipient
-        user_notifications = []
-        for notif in notifications:
-            is_recipient = False
-
-            if notif.recipient_type == Notification.RECIPIENT_ALL:
-                is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_ROLE:
-                if user.role in notif.recipient_roles:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_SPECIFIC:
-                if user_id in notif.recipient_ids:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_DEALER_EMPLOYEES:
-                if user.dealer_id == notif.dealer_id:
-                    is_recipient = True
-
-            if is_recipient:
-                # Check if unread
-                read_by_ids = [r.user_id for r in notif.read_by]
-                is_read = user_id in read_by_ids
-
-                if unread_only and is_read:
-                    continue
-
-                user_notifications.append(
-                    {
-                        "notification": notif,
-                        "is_read": is_read,
-                    }
-                )
-
-        # Sort by sent_at (newest first)
-        user_notifications.sort(key=lambda x: x["notification"].sent_at, reverse=True)
+        notifications = notifications.exclude("read_by").order_by("-sent_at")
 
         # Pagination
         paginator = NotificationPagination()
+        page = paginator.paginate_queryset(notifications, request)
 
         # Prepare response data
         notifications_data = []
-        for item in user_notifications:
-            notif_dict = NotificationSerializer(item["notification"]).data
-            notif_dict["is_read"] = item["is_read"]
+        for notif in page:
+            notif_dict = NotificationSerializer(notif).data
+            notif_dict["is_read"] = str(notif.id) in read_ids
             notifications_data.append(notif_dict)
 
-        # Manual pagination
-        page = paginator.paginate_queryset(notifications_data, request)
-        return paginator.get_paginated_response(page)
+        return paginator.get_paginated_response(notifications_data)
 
     except Exception as e:
         return Response(
@@ -228,15 +200,25 @@ def mark_as_read(request, notification_id):
     """
     try:
         user = request.user
-        notification = Notification.objects.get(id=notification_id)
+        notification = Notification.objects.only("expires_at").get(
+            id=notification_id
+        )
 
-        # Check if already read
-        read_by_ids = [r.user_id for r in notification.read_by]
-        if str(user.id) not in read_by_ids:
-            notification.read_by.append(
-                ReadReceipt(user_id=str(user.id), read_at=datetime.utcnow())
+        # Idempotent: an existing read row is left untouched
+        if NotificationRead.mark(user.id, [notification]):
+            # Only a delivered, live notification addressed to the user is
+            # in their counter (release/fan_out skip users who read it)
+            counted = (
+                Notification.objects.for_user(user)
+                .filter(
+                    id=notification.id,
+                    pending_delivery__ne=True,
+                    counters_released__ne=True,
+                )
+                .count()
             )
-            notification.save()
+            if counted:
+                counters.mark_read(user.id)
 
         return Response(
             {"success": True, "message": "Notification marked as read"},
@@ -272,35 +254,15 @@ def mark_all_as_read(request):
         user = request.user
         user_id = str(user.id)
 
-        # Get all active notifications
-        notifications = Notification.objects(is_active=True)
-
-        marked_count = 0
-        for notif in notifications:
-            # Check if user is recipient
-            is_recipient = False
-
-            if notif.recipient_type == Notification.RECIPIENT_ALL:
-                is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_ROLE:
-                if user.role in notif.recipient_roles:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_SPECIFIC:
-                if user_id in notif.recipient_ids:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_DEALER_EMPLOYEES:
-                if user.dealer_id == notif.dealer_id:
-                    is_recipient = True
-
-            if is_recipient:
-                # Check if already read
-                read_by_ids = [r.user_id for r in notif.read_by]
-                if user_id not in read_by_ids:
-                    notif.read_by.append(
-                        ReadReceipt(user_id=user_id, read_at=datetime.utcnow())
-                    )
-                    notif.save()
-                    marked_count += 1
+        # Unread notifications targeted to this user
+        notifications = (
+            Notification.objects.for_user(user)
+            .filter(id__nin=NotificationRead.read_ids(user_id))
+            .only("id", "expires_at")
+        )
+
+        marked_count = NotificationRead.mark(user_id, notifications)
+        counters.reset(user_id)
 
         return Response(
             {
@@ -332,32 +294,9 @@ def get_unread_count(request):
     """
     try:
         user = request.user
-        user_id = str(user.id)
 
-        notifications = Notification.objects(
-            is_active=True, expires_at__gte=datetime.utcnow()
-        )
-
-        unread_count = 0
-        for notif in notifications:
-            is_recipient = False
-
-            if notif.recipient_type == Notification.RECIPIENT_ALL:
-                is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_ROLE:
-                if user.role in notif.recipient_roles:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_SPECIFIC:
-                if user_id in notif.recipient_ids:
-                    is_recipient = True
-            elif notif.recipient_type == Notification.RECIPIENT_DEALER_EMPLOYEES:
-                if user.dealer_id == notif.dealer_id:
-                    is_recipient = True
-
-            if is_recipient:
-                read_by_ids = [r.user_id for r in notif.read_by]
-                if user_id not in read_by_ids:
-                    unread_count += 1
+        # Materialized counter: a single key lookup
+        unread_count = counters.get_unread(user)
 
         return Response(
             {"success": True, "unread_count": unread_count},
@@ -373,3 +312,49 @@ def get_unread_count(request):
             },
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def deactivate_notification(request, notification_id):
+    """
+    Deactivate a notification (Admin or the sender).
+    Releases the unread counters of recipients who had not read it.
+
+    POST /api/notifications/<notification_id>/deactivate/
+    """
+    try:
+        user = request.user
+        notification = Notification.objects.get(id=notification_id)
+
+        if user.role != User.ROLE_ADMIN and notification.sent_by != str(user.id):
+            return Response(
+                {"success": False, "message": "Access denied"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if notification.is_active:
+            notification.is_active = False
+            notification.save()
+            counters.release(notification)
+
+        return Response(
+            {"success": True, "message": "Notification deactivated"},
+            status=status.HTTP_200_OK,
+        )
+
+    except Notification.DoesNotExist:
+        return Response(
+            {"success": False, "message": "Notification not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to deactivate notification",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,353 @@
+"""
+Dealer order approval.
+Checks admin stock for any number of orders with a single query, then applies
+every stock transfer as batched atomic writes: guarded Product.total_stock
+decrements and DealerInventory upserts. Runs inside a transaction on replica
+sets; on standalone servers partial work is compensated if any step fails.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from apps.core.mongo import run_in_transaction, supports_transactions
+from apps.inventory.models import DealerInventory
+from apps.inventory.stream import publish_order_approved, publish_stock
+from apps.products.cache import catalog_cache
+from apps.products.models import Product
+
+from .models import DealerOrder
+
+
+class StockConflict(Exception):
+    """Admin stock changed between the availability check and the transfer"""
+
+
+def _unique(orders):
+    """orders without repeats (by pk), keeping the first occurrence"""
+    return list({order.pk: order for order in orders}.values())
+
+
+def _product_totals(orders):
+    """Sum item quantities per product across orders"""
+    totals = OrderedDict()
+    for order in orders:
+        for item in order.items:
+            totals[item.product_id] = totals.get(item.product_id, 0) + item.quantity
+    return totals
+
+
+def approve_dealer_orders(orders, approver, admin_notes=""):
+    """
+    Approve pending dealer orders and transfer stock to dealer inventories.
+
+    Args:
+        orders: DealerOrder documents, approved in the given order while
+            admin stock lasts (repeats are approved once)
+        approver: Admin User performing the approval
+        admin_notes: Notes stored on every approved order
+
+    Returns:
+        (approved, skipped) where approved is the list of updated orders and
+        skipped is [{order_id, order_number, reason}] for the rest.
+
+    Raises:
+        StockConflict: stock changed concurrently; nothing was applied
+    """
+    skipped = []
+
+    def skip(order, reason):
+        skipped.append(
+            {
+                "order_id": str(order.id),
+                "order_number": order.order_number,
+                "reason": reason,
+            }
+        )
+
+    pending = []
+    for order in _unique(orders):
+        if order.status != DealerOrder.STATUS_PENDING:
+            skip(order, f"Order is already {order.status}")
+        else:
+            pending.append(order)
+
+    if not pending:
+        return [], skipped
+
+    # One query for the admin stock of every product involved
+    product_ids = [
+        ObjectId(product_id)
+        for product_id in _product_totals(pending)
+        if ObjectId.is_valid(product_id)
+    ]
+    stock = {
+        str(doc["_id"]): doc
+        for doc in Product._get_collection().find(
+            {"_id": {"$in": product_ids}}, {"name": 1, "total_stock": 1}
+        )
+    }
+    remaining = {
+        product_id: doc.get("total_stock", 0) for product_id, doc in stock.items()
+    }
+
+    # Allocate stock to orders in request order
+    approvable = []
+    for order in pending:
+        needed = _product_totals([order])
+        short = next(
+            (pid for pid, qty in needed.items() if remaining.get(pid, 0) < qty),
+            None,
+        )
+        if short:
+            name = stock.get(short, {}).get("name") or next(
+                item.product_name for item in order.items if item.product_id == short
+            )
+            skip(
+                order,
+                f"Insufficient stock for '{name}'. Available: {remaining.get(short, 0)}",
+            )
+            continue
+        for product_id, quantity in needed.items():
+            remaining[product_id] -= quantity
+        approvable.append(order)
+
+    if not approvable:
+        return [], skipped
+
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)  # BSON precision
+    approval = {
+        "status": DealerOrder.STATUS_APPROVED,
+        "approved_by": str(approver.id),
+        "approved_by_name": approver.get_full_name(),
+        "approval_date": now,
+        "expected_delivery": now + timedelta(days=7),
+        "admin_notes": admin_notes,
+        "updated_at": now,
+    }
+
+    if supports_transactions():
+        approved = run_in_transaction(
+            lambda session: _apply(approvable, approval, session)
+        )
+    else:
+        approved = _apply(approvable, approval, None)
+
+    # Stock was changed without Product.save(); refresh catalog caches
+    catalog_cache.invalidate()
+    _publish_approvals(approved)
+
+    claimed = {order.pk for order in approved}
+    for order in approvable:
+        if order.pk not in claimed:
+            skip(order, "Order was processed concurrently")
+
+    return approved, skipped
+
+
+def _apply(orders, approval, session):
+    """Claim the orders, move the stock and return the orders now approved"""
+    collection = DealerOrder._get_collection()
+    orders = _unique(orders)
+    ids = [order.pk for order in orders]
+
+    # Claim: only orders that are still pending flip to approved
+    collection.update_many(
+        {"_id": {"$in": ids}, "status": DealerOrder.STATUS_PENDING},
+        {"$set": approval},
+        session=session,
+    )
+    claimed_ids = {
+        doc["_id"]
+        for doc in collection.find(
+            {
+                "_id": {"$in": ids},
+                "approved_by": approval["approved_by"],
+                "approval_date": approval["approval_date"],
+            },
+            {"_id": 1},
+            session=session,
+        )
+    }
+    claimed = [order for order in orders if order.pk in claimed_ids]
+    if not claimed:
+        return []
+
+    totals = _product_totals(claimed)
+    try:
+        _decrement_admin_stock(totals, session)
+    except StockConflict:
+        if session is None:
+            _release_claims(claimed)
+        raise
+
+    try:
+        _upsert_dealer_inventory(claimed, approval["approval_date"], session)
+    except Exception:
+        if session is None:
+            # Inventory lines already added were taken back by the upsert
+            _restore_admin_stock(totals.items())
+            _release_claims(claimed)
+        raise
+
+    for order in claimed:
+        for field, value in approval.items():
+            setattr(order, field, value)
+        order._clear_changed_fields()
+
+    return claimed
+
+
+def _decrement_admin_stock(totals, session):
+    """Guarded total_stock decrements; raises StockConflict if any would go negative"""
+    collection = Product._get_collection()
+    now = datetime.utcnow()
+
+    def operation(product_id, quantity):
+        return (
+            {"_id": ObjectId(product_id), "total_stock": {"$gte": quantity}},
+            {"$inc": {"total_stock": -quantity}, "$set": {"updated_at": now}},
+        )
+
+    if session is not None:
+        result = collection.bulk_write(
+            [UpdateOne(*operation(pid, qty)) for pid, qty in totals.items()],
+            session=session,
+        )
+        if result.matched_count != len(totals):
+            raise StockConflict()
+        return
+
+    applied = []
+    for product_id, quantity in totals.items():
+        if not collection.update_one(*operation(product_id, quantity)).matched_count:
+            _restore_admin_stock(applied)
+            raise StockConflict()
+        applied.append((product_id, quantity))
+
+
+def _restore_admin_stock(quantities):
+    """Give back (product_id, quantity) decrements (standalone servers only)"""
+    collection = Product._get_collection()
+    for product_id, quantity in quantities:
+        collection.update_one(
+            {"_id": ObjectId(product_id)}, {"$inc": {"total_stock": quantity}}
+        )
+
+
+def _upsert_dealer_inventory(orders, restocked_at, session):
+    """Add approved quantities to each dealer's inventory in one bulk write"""
+    lines = OrderedDict()  # (dealer_id, product_id) -> line
+    for order in orders:
+        for item in order.items:
+            key = (order.dealer_id, item.product_id)
+            line = lines.setdefault(
+                key,
+                {
+                    "quantity": 0,
+                    "dealer_name": order.dealer_name,
+                    "product_name": item.product_name,
+                    "product_model": item.product_model,
+                },
+            )
+            line["quantity"] += item.quantity
+
+    default_threshold = DealerInventory._fields["low_stock_threshold"].default
+    operations = []
+    for (dealer_id, product_id), line in lines.items():
+        changes = {
+            "quantity": {"$add": [DealerInventory._QUANTITY, line["quantity"]]},
+            "reserved_quantity": DealerInventory._RESERVED,
+            "low_stock_threshold": {
+                "$ifNull": ["$low_stock_threshold", default_threshold]
+            },
+            "dealer_name": {
+                "$ifNull": ["$dealer_name", {"$literal": line["dealer_name"]}]
+            },
+            "product_name": {
+                "$ifNull": ["$product_name", {"$literal": line["product_name"]}]
+            },
+            "product_model": {
+                "$ifNull": ["$product_model", {"$literal": line["product_model"]}]
+            },
+            "created_at": {"$ifNull": ["$created_at", restocked_at]},
+            "last_restocked": restocked_at,
+        }
+        operations.append(
+            UpdateOne(
+                {"dealer_id": dealer_id, "product_id": product_id},
+                DealerInventory.stock_update_pipeline(changes),
+                upsert=True,
+            )
+        )
+
+    collection = DealerInventory._get_collection()
+    if session is not None:
+        collection.bulk_write(operations, ordered=False, session=session)
+        return
+
+    # One write per line, so a failure knows which lines to take back
+    applied = []
+    try:
+        for operation, ((dealer_id, product_id), line) in zip(
+            operations, lines.items()
+        ):
+            collection.bulk_write([operation])
+            applied.append((dealer_id, product_id, line["quantity"]))
+    except Exception:
+        for dealer_id, product_id, quantity in applied:
+            collection.update_one(
+                {"dealer_id": dealer_id, "product_id": product_id},
+                DealerInventory.stock_update_pipeline(
+                    {"quantity": {"$subtract": [DealerInventory._QUANTITY, quantity]}}
+                ),
+            )
+        raise
+
+
+def _release_claims(orders):
+    """Put claimed orders back to pending (standalone servers only)"""
+    DealerOrder._get_collection().bulk_write(
+        [
+            UpdateOne(
+                {"_id": order.pk},
+                {
+                    "$set": {
+                        "status": DealerOrder.STATUS_PENDING,
+                        "admin_notes": order.admin_notes,
+                    },
+                    "$unset": {
+                        "approved_by": "",
+                        "approved_by_name": "",
+                        "approval_date": "",
+                        "expected_delivery": "",
+                    },
+                },
+            )
+            for order in orders
+        ]
+    )
+
+
+def _publish_approvals(orders):
+    """Push new dealer stock levels and approved orders to live dashboards"""
+    if not orders:
+        return
+    keys = {
+        (order.dealer_id, item.product_id) for order in orders for item in order.items
+    }
+    publish_stock(
+        DealerInventory.objects(
+            __raw__={
+                "$or": [
+                    {"dealer_id": dealer_id, "product_id": product_id}
+                    for dealer_id, product_id in keys
+                ]
+            }
+        )
+    )
+    for order in orders:
+        publish_order_approved(order)
@@ -0,0 +1,42 @@
+"""Export columns for dealer and customer orders (see apps.core.export)"""
+
+from apps.core.export import Column
+
+DEALER_ORDER_EXPORT_COLUMNS = [
+    Column("id", "_id"),
+    Column("order_number"),
+    Column("created_at"),
+    Column("dealer_id"),
+    Column("dealer_name"),
+    Column("items"),
+    Column("total_amount"),
+    Column("tax_amount"),
+    Column("grand_total"),
+    Column("status"),
+    Column("approved_by"),
+    Column("approval_date"),
+    Column("expected_delivery"),
+    Column("actual_delivery"),
+    Column("tracking_number"),
+]
+
+CUSTOMER_ORDER_EXPORT_COLUMNS = [
+    Column("id", "_id"),
+    Column("order_number"),
+    Column("created_at"),
+    Column("customer_id"),
+    Column("customer_name"),
+    Column("customer_phone"),
+    Column("dealer_id"),
+    Column("dealer_name"),
+    Column("items"),
+    Column("total_amount"),
+    Column("tax_amount"),
+    Column("discount_amount"),
+    Column("grand_total"),
+    Column("payment_status"),
+    Column("amount_paid"),
+    Column("amount_remaining"),
+    Column("status"),
+    Column("delivery_date"),
+]
@@ -205,6 +205,10 @@ class CustomerOrder(Document):
             "status",
             "payment_status",
             "-created_at",
+            # Keyset pagination (created_at, _id) per listing scope
+            ("-created_at", "-id"),
+            ("customer_id", "-created_at", "-id"),
+            ("dealer_id", "-created_at", "-id"),
         ],
         "ordering": ["-created_at"],
     }
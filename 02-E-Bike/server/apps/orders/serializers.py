@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.projection import FieldMap, raw_id
 from .models import DealerOrder, CustomerOrder, OrderItem
 
 
@@ -47,6 +48,12 @@ class DealerOrderSerializer(serializers.Serializer):
         return str(obj.id)
 
 
+# Raw-document read path for dealer order lists (?fields= / ?expand=)
+DEALER_ORDER_LIST_MAP = FieldMap(
+    DealerOrder, DealerOrderSerializer, computed={"id": raw_id}
+)
+
+
 class CreateDealerOrderSerializer(serializers.Serializer):
     """Serializer for creating dealer order"""
 
@@ -106,6 +113,12 @@ class CustomerOrderSerializer(serializers.Serializer):
         return str(obj.id)
 
 
+# Raw-document read path for customer order lists (?fields= / ?expand=)
+CUSTOMER_ORDER_LIST_MAP = FieldMap(
+    CustomerOrder, CustomerOrderSerializer, computed={"id": raw_id}
+)
+
+
 class CreateCustomerOrderSerializer(serializers.Serializer):
     """Serializer for creating customer order"""
 
@@ -1,3 +1,87 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+
+from apps.inventory.models import DealerInventory
+from apps.products.models import Product
+from apps.users.models import User
+
+from .models import DealerOrder, OrderItem
+
+
+class BulkApproveDealerOrdersTests(SimpleTestCase):
+    def setUp(self):
+        suffix = uuid.uuid4().hex[:8]
+        self.admin = User.create_user(
+            f"admin-{suffix}@example.com",
+            "Admin@1234",
+            first_name="Test",
+            last_name="Admin",
+            phone="9000000001",
+            role=User.ROLE_ADMIN,
+        )
+        self.dealer = User.create_user(
+            f"dealer-{suffix}@example.com",
+            "Dealer@1234",
+            first_name="Test",
+            last_name="Dealer",
+            phone="9000000002",
+            role=User.ROLE_DEALER,
+        )
+        self.product = Product(
+            name=f"Test Bike {suffix}",
+            slug=f"test-bike-{suffix}",
+            model="TEST",
+            base_price=1000,
+            dealer_price=900,
+            mrp=1100,
+            total_stock=10,
+        )
+        self.product.save()
+        self.order = DealerOrder(
+            order_number=f"DO-TEST-{suffix}",
+            dealer_id=str(self.dealer.id),
+            dealer_name=self.dealer.get_full_name(),
+            items=[
+                OrderItem(
+                    product_id=str(self.product.id),
+                    product_name=self.product.name,
+                    quantity=2,
+                    unit_price=900,
+                    subtotal=1800,
+                )
+            ],
+            total_amount=1800,
+            grand_total=1800,
+        )
+        self.order.save()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def tearDown(self):
+        DealerInventory.objects(dealer_id=str(self.dealer.id)).delete()
+        self.order.delete()
+        self.product.delete()
+        self.dealer.delete()
+        self.admin.delete()
+
+    def test_repeated_order_id_moves_stock_once(self):
+        order_id = str(self.order.id)
+        response = self.client.post(
+            "/api/orders/dealer/bulk-approve/",
+            {"order_ids": [order_id, order_id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["approved"]), 1)
+        self.product.reload()
+        self.assertEqual(self.product.total_stock, 8)
+        inventory = DealerInventory.objects.get(
+            dealer_id=str(self.dealer.id), product_id=str(self.product.id)
+        )
+        self.assertEqual(inventory.quantity, 2)
+        self.order.reload()
+        self.assertEqual(self.order.status, DealerOrder.STATUS_APPROVED)
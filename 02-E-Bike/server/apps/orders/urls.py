@@ -10,8 +10,15 @@ urlpatterns = [
     # ============================================
     # Dealer creates order
     path("dealer/create/", views.create_dealer_order, name="create-dealer-order"),
+    # Admin bulk approval (before <order_id> routes)
+    path(
+        "dealer/bulk-approve/",
+        views.bulk_approve_dealer_orders,
+        name="bulk-approve-dealer-orders",
+    ),
     # List & View
     path("dealer/", views.list_dealer_orders, name="list-dealer-orders"),
+    path("dealer/export/", views.export_dealer_orders, name="export-dealer-orders"),
     path("dealer/<str:order_id>/", views.get_dealer_order, name="get-dealer-order"),
     # Admin approves/rejects/ships
     path(
@@ -42,6 +49,11 @@ urlpatterns = [
     path("customer/create/", views.create_customer_order, name="create-customer-order"),
     # List & View
     path("customer/", views.list_customer_orders, name="list-customer-orders"),
+    path(
+        "customer/export/",
+        views.export_customer_orders,
+        name="export-customer-orders",
+    ),
     path(
         "customer/<str:order_id>/",
         views.get_customer_order,
@@ -13,10 +13,15 @@ from rest_framework.decorators import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from datetime import datetime, timedelta
+from datetime import datetime
+from bson import ObjectId
 
 from .models import DealerOrder, CustomerOrder, OrderItem
+from .approval import approve_dealer_orders, StockConflict
+from .exports import DEALER_ORDER_EXPORT_COLUMNS, CUSTOMER_ORDER_EXPORT_COLUMNS
 from .serializers import (
+    CUSTOMER_ORDER_LIST_MAP,
+    DEALER_ORDER_LIST_MAP,
     DealerOrderSerializer,
     CreateDealerOrderSerializer,
     CustomerOrderSerializer,
@@ -25,6 +30,10 @@ from .serializers import (
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
 from apps.products.models import Product
+from apps.products.cache import catalog_cache
+from apps.core.export import export_options, export_response
+from apps.core.pagination import KeysetPagination
+from apps.core.projection import FieldSelectionError, field_selection
 
 
 class OrderPagination(PageNumberPagination):
@@ -33,6 +42,9 @@ class OrderPagination(PageNumberPagination):
     max_page_size = 100
 
 
+MAX_BULK_APPROVAL = 500  # Orders per bulk-approve request
+
+
 # ============================================
 # DEALER ORDER ENDPOINTS
 # Dealer → Admin (Stock Ordering)
@@ -82,7 +94,7 @@ def create_dealer_order(request):
         for item_data in data["items"]:
             # Verify product exists and get dealer price
             try:
-                product = Product.objects.get(id=item_data["product_id"])
+                product = catalog_cache.get(item_data["product_id"])
 
                 if not product.is_available:
                     return Response(
@@ -172,6 +184,25 @@ def create_dealer_order(request):
         )
 
 
+def _dealer_orders_for_user(user):
+    """
+    (orders, None) visible to user, or (None, error Response).
+    - Admin: All dealer orders
+    - Dealer: Only their own orders
+    """
+    if user.role == User.ROLE_ADMIN:
+        return DealerOrder.objects.all(), None
+    if user.role == User.ROLE_DEALER:
+        return DealerOrder.objects(dealer_id=str(user.id)), None
+    return None, Response(
+        {
+            "success": False,
+            "message": "Only Admins and Dealers can view dealer orders",
+        },
+        status=status.HTTP_403_FORBIDDEN,
+    )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -182,38 +213,37 @@ def list_dealer_orders(request):
     - Dealer: See only their own orders
 
     GET /api/orders/dealer/
+    Query params: status, fields, expand (sparse fieldsets)
     """
     try:
         user = request.user
+        field_map = DEALER_ORDER_LIST_MAP.select(*field_selection(request))
 
         # Filter by role
-        if user.role == User.ROLE_ADMIN:
-            orders = DealerOrder.objects.all()
-        elif user.role == User.ROLE_DEALER:
-            orders = DealerOrder.objects(dealer_id=str(user.id))
-        else:
-            return Response(
-                {
-                    "success": False,
-                    "message": "Only Admins and Dealers can view dealer orders",
-                },
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        orders, error = _dealer_orders_for_user(user)
+        if error:
+            return error
 
         # Filter by status
         order_status = request.GET.get("status", "")
         if order_status:
             orders = orders.filter(status=order_status)
 
-        orders = orders.order_by("-created_at")
+        orders = field_map.project(orders.order_by("-created_at"))
 
         # Pagination
         paginator = OrderPagination()
         paginated_orders = paginator.paginate_queryset(orders, request)
 
-        serializer = DealerOrderSerializer(paginated_orders, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_orders)
+        )
 
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {
@@ -225,6 +255,69 @@ def list_dealer_orders(request):
         )
 
 
+def _filter_orders(orders, params):
+    """Apply status/payment_status and start/end_date (created_at) filters"""
+    order_status = params.get("status", "")
+    if order_status:
+        orders = orders.filter(status=order_status)
+
+    # Customer orders only
+    payment_status = params.get("payment_status", "")
+    if payment_status and "payment_status" in orders._document._fields:
+        orders = orders.filter(payment_status=payment_status)
+
+    start_date = params.get("start_date", "")
+    end_date = params.get("end_date", "")
+    if start_date:
+        orders = orders.filter(created_at__gte=datetime.fromisoformat(start_date))
+    if end_date:
+        orders = orders.filter(created_at__lte=datetime.fromisoformat(end_date))
+
+    return orders
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def export_dealer_orders(request):
+    """
+    Stream dealer orders as CSV or NDJSON (same role scoping as the list endpoint).
+
+    GET /api/orders/dealer/export/
+    Query params: file_format (csv|ndjson), gzip (true|false), status,
+    start_date, end_date
+    """
+    try:
+        orders, error = _dealer_orders_for_user(request.user)
+        if error:
+            return error
+
+        fmt, gzip = export_options(request)
+        if fmt is None:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Invalid file_format. Use csv or ndjson",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        orders = _filter_orders(orders, request.GET).order_by("-created_at")
+        return export_response(
+            orders, DEALER_ORDER_EXPORT_COLUMNS, "dealer-orders", fmt, gzip
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to export dealer orders",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -301,59 +394,16 @@ def approve_dealer_order(request, order_id):
 
         order = DealerOrder.objects.get(id=order_id)
 
-        if order.status != DealerOrder.STATUS_PENDING:
+        # Verify stock and transfer it to the dealer's inventory atomically
+        approved, skipped = approve_dealer_orders(
+            [order], request.user, admin_notes=request.data.get("admin_notes", "")
+        )
+        if not approved:
             return Response(
-                {
-                    "success": False,
-                    "message": f"Order is already {order.status}",
-                },
+                {"success": False, "message": skipped[0]["reason"]},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Verify stock availability again
-        for item in order.items:
-            product = Product.objects.get(id=item.product_id)
-            if product.total_stock < item.quantity:
-                return Response(
-                    {
-                        "success": False,
-                        "message": f"Insufficient stock for '{product.name}'. Available: {product.total_stock}",
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-        # Update order status
-        order.status = DealerOrder.STATUS_APPROVED
-        order.approved_by = str(request.user.id)
-        order.approved_by_name = request.user.get_full_name()
-        order.approval_date = datetime.utcnow()
-        order.expected_delivery = datetime.utcnow() + timedelta(days=7)
-        order.admin_notes = request.data.get("admin_notes", "")
-        order.save()
-
-        # Update dealer inventory
-        from apps.inventory.models import DealerInventory
-
-        for item in order.items:
-            inventory, created = DealerInventory.objects.get_or_create(
-                dealer_id=order.dealer_id,
-                product_id=item.product_id,
-                defaults={
-                    "quantity": 0,
-                    "product_name": item.product_name,
-                    "product_model": item.product_model,
-                },
-            )
-            inventory.quantity += item.quantity
-            inventory.last_restocked = datetime.utcnow()
-            inventory.save()
-
-        # Deduct from admin stock
-        for item in order.items:
-            product = Product.objects.get(id=item.product_id)
-            product.total_stock -= item.quantity
-            product.save()
-
         serializer = DealerOrderSerializer(order)
         return Response(
             {
@@ -369,6 +419,14 @@ def approve_dealer_order(request, order_id):
             {"success": False, "message": "Order not found"},
             status=status.HTTP_404_NOT_FOUND,
         )
+    except StockConflict:
+        return Response(
+            {
+                "success": False,
+                "message": "Admin stock changed during approval, please retry",
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
     except Exception as e:
         return Response(
             {
@@ -380,6 +438,94 @@ def approve_dealer_order(request, order_id):
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def bulk_approve_dealer_orders(request):
+    """
+    Approve many dealer orders at once (Admin only).
+    Admin stock is checked for all orders with one query and every stock
+    transfer is applied as batched atomic writes. Orders are approved in the
+    given order while stock lasts; the rest are reported as skipped.
+
+    POST /api/orders/dealer/bulk-approve/
+    Body: {"order_ids": [...], "admin_notes": ""}
+    """
+    try:
+        if request.user.role != User.ROLE_ADMIN:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Only Admins can approve dealer orders",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        order_ids = request.data.get("order_ids", [])
+        if not isinstance(order_ids, list) or not order_ids:
+            return Response(
+                {"success": False, "message": "order_ids must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # A repeated id is still one order
+        order_ids = list(dict.fromkeys(map(str, order_ids)))
+        if len(order_ids) > MAX_BULK_APPROVAL:
+            return Response(
+                {
+                    "success": False,
+                    "message": f"At most {MAX_BULK_APPROVAL} orders per request",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Load all orders in one query, keeping the requested order
+        valid_ids = [i for i in order_ids if ObjectId.is_valid(i)]
+        found = {
+            str(order.id): order for order in DealerOrder.objects(id__in=valid_ids)
+        }
+        orders = [found[i] for i in order_ids if i in found]
+        not_found = [
+            {"order_id": i, "order_number": None, "reason": "Order not found"}
+            for i in order_ids
+            if i not in found
+        ]
+
+        approved, skipped = approve_dealer_orders(
+            orders, request.user, admin_notes=request.data.get("admin_notes", "")
+        )
+
+        return Response(
+            {
+                "success": True,
+                "message": f"Approved {len(approved)} of {len(order_ids)} orders",
+                "approved": [
+                    {"order_id": str(order.id), "order_number": order.order_number}
+                    for order in approved
+                ],
+                "skipped": not_found + skipped,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except StockConflict:
+        return Response(
+            {
+                "success": False,
+                "message": "Admin stock changed during approval, please retry",
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Bulk approval failed",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -643,7 +789,7 @@ def create_customer_order(request):
         for item_data in data["items"]:
             # Verify product exists
             try:
-                product = Product.objects.get(id=item_data["product_id"])
+                product = catalog_cache.get(item_data["product_id"])
 
                 if not product.is_available:
                     return Response(
@@ -742,6 +888,42 @@ def create_customer_order(request):
         )
 
 
+def _customer_orders_for_user(user):
+    """
+    (orders, None) visible to user, or (None, error Response).
+    - Customer: Their own orders
+    - Dealer/Employee: Orders at their dealership
+    """
+    if user.role == User.ROLE_CUSTOMER:
+        return CustomerOrder.objects(customer_id=str(user.id)), None
+
+    if user.role in [User.ROLE_DEALER, User.ROLE_EMPLOYEE]:
+        # Get dealer_id
+        if user.role == User.ROLE_DEALER:
+            dealer_id = str(user.id)
+        else:  # Employee
+            dealer_id = user.dealer_id
+
+        if not dealer_id:
+            return None, Response(
+                {
+                    "success": False,
+                    "message": "No dealer associated with your account",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return CustomerOrder.objects(dealer_id=dealer_id), None
+
+    return None, Response(
+        {
+            "success": False,
+            "message": "Access denied",
+        },
+        status=status.HTTP_403_FORBIDDEN,
+    )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
@@ -752,38 +934,16 @@ def list_customer_orders(request):
     - Dealer/Employee: See orders at their dealership
 
     GET /api/orders/customer/
+    Query params: status, payment_status, fields, expand (sparse fieldsets)
     """
     try:
         user = request.user
+        field_map = CUSTOMER_ORDER_LIST_MAP.select(*field_selection(request))
 
         # Filter by role
-        if user.role == User.ROLE_CUSTOMER:
-            orders = CustomerOrder.objects(customer_id=str(user.id))
-        elif user.role in [User.ROLE_DEALER, User.ROLE_EMPLOYEE]:
-            # Get dealer_id
-            if user.role == User.ROLE_DEALER:
-                dealer_id = str(user.id)
-            else:  # Employee
-                dealer_id = user.dealer_id
-
-            if not dealer_id:
-                return Response(
-                    {
-                        "success": False,
-                        "message": "No dealer associated with your account",
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            orders = CustomerOrder.objects(dealer_id=dealer_id)
-        else:
-            return Response(
-                {
-                    "success": False,
-                    "message": "Access denied",
-                },
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        orders, error = _customer_orders_for_user(user)
+        if error:
+            return error
 
         # Filter by status
         order_status = request.GET.get("status", "")
@@ -795,15 +955,24 @@ def list_customer_orders(request):
         if payment_status:
             orders = orders.filter(payment_status=payment_status)
 
-        orders = orders.order_by("-created_at")
+        orders = field_map.project(orders.order_by("-created_at"), "created_at")
 
-        # Pagination
-        paginator = OrderPagination()
+        # Pagination (?cursor= for keyset paging)
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination("created_at")
+        else:
+            paginator = OrderPagination()
         paginated_orders = paginator.paginate_queryset(orders, request)
 
-        serializer = CustomerOrderSerializer(paginated_orders, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_orders)
+        )
 
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {
@@ -815,6 +984,48 @@ def list_customer_orders(request):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def export_customer_orders(request):
+    """
+    Stream customer orders as CSV or NDJSON (same role scoping as the list endpoint).
+
+    GET /api/orders/customer/export/
+    Query params: file_format (csv|ndjson), gzip (true|false), status, payment_status,
+    start_date, end_date
+    """
+    try:
+        orders, error = _customer_orders_for_user(request.user)
+        if error:
+            return error
+
+        fmt, gzip = export_options(request)
+        if fmt is None:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Invalid file_format. Use csv or ndjson",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        orders = _filter_orders(orders, request.GET).order_by("-created_at")
+        return export_response(
+            orders, CUSTOMER_ORDER_EXPORT_COLUMNS, "customer-orders", fmt, gzip
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to export customer orders",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([MongoEngineJWTAuthentication])
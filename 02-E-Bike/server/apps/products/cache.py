@@ -0,0 +1,172 @@
+"""
+Process-local product catalog cache.
+Products are cached by id and slug (plus the full catalog listing) as raw SON
+and rebuilt into fresh Product instances on every hit, so callers can mutate
+what they get back. Workers stay coherent through the "product_catalog"
+CacheVersion counter, which is bumped on every product write.
+"""
+
+import time
+
+from bson import ObjectId
+from django.conf import settings
+
+from apps.core.cache import LRUCache
+from apps.core.models import CacheVersion
+
+from .models import Product
+
+
+class ProductCatalogCache:
+    """LRU/TTL cache of Product documents with version-based invalidation"""
+
+    VERSION_NAME = "product_catalog"
+
+    def __init__(self):
+        self._cache = LRUCache(
+            maxsize=settings.PRODUCT_CACHE_SIZE, ttl=settings.PRODUCT_CACHE_TTL
+        )
+        self._version = None
+        self._checked_at = 0.0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return settings.PRODUCT_CACHE_ENABLED
+
+    def _sync(self):
+        """Drop local entries if another worker bumped the catalog version"""
+        now = time.monotonic()
+        if now - self._checked_at < settings.PRODUCT_CACHE_VERSION_CHECK:
+            return
+        self._checked_at = now
+
+        version = CacheVersion.current(self.VERSION_NAME)
+        if version != self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self._cache.clear()
+            self._version = version
+
+    def _store(self, product):
+        product_id = str(product.id)
+        self._cache.set(("id", product_id), product.to_mongo())
+        if product.slug:
+            self._cache.set(("slug", product.slug), product_id)
+
+    @staticmethod
+    def _build(son):
+        return Product._from_son(son)
+
+    def get(self, product_id):
+        """
+        Return the product with this id.
+        Raises Product.DoesNotExist, like Product.objects.get().
+        """
+        product_id = str(product_id)
+        if not ObjectId.is_valid(product_id):
+            raise Product.DoesNotExist(f"Product {product_id} not found")
+
+        if not self.enabled:
+            return Product.objects.get(id=product_id)
+
+        self._sync()
+        son = self._cache.get(("id", product_id))
+        if son is not None:
+            return self._build(son)
+
+        product = Product.objects.get(id=product_id)
+        self._store(product)
+        return product
+
+    def get_by_slug(self, slug):
+        """Return the product with this slug (raises Product.DoesNotExist)"""
+        if not self.enabled:
+            return Product.objects.get(slug=slug)
+
+        self._sync()
+        product_id = self._cache.get(("slug", slug))
+        if product_id is not None:
+            son = self._cache.get(("id", product_id))
+            if son is not None:
+                return self._build(son)
+
+        product = Product.objects.get(slug=slug)
+        self._store(product)
+        return product
+
+    def get_many(self, product_ids, raw=False):
+        """
+        Return {product_id: Product}, loading all misses in one query.
+        With raw=True the values are the cached SON documents (read-only).
+        """
+        product_ids = {
+            str(product_id)
+            for product_id in product_ids
+            if product_id and ObjectId.is_valid(str(product_id))
+        }
+        if not self.enabled:
+            products = Product.objects(id__in=list(product_ids))
+            if raw:
+                return {str(doc["_id"]): doc for doc in products.as_pymongo()}
+            return {str(product.id): product for product in products}
+
+        self._sync()
+        found = {}
+        missing = []
+        for product_id in product_ids:
+            son = self._cache.get(("id", product_id))
+            if son is not None:
+                found[product_id] = son if raw else self._build(son)
+            else:
+                missing.append(product_id)
+
+        if missing:
+            for product in Product.objects(id__in=missing):
+                self._store(product)
+                found[str(product.id)] = product.to_mongo() if raw else product
+
+        return found
+
+    def all(self, raw=False):
+        """
+        Return every product, newest first.
+        With raw=True the cached SON documents are returned (read-only).
+        """
+        if not self.enabled:
+            products = Product.objects.order_by("-created_at")
+            return list(products.as_pymongo() if raw else products)
+
+        self._sync()
+        sons = self._cache.get(("all",))
+        if sons is None:
+            products = list(Product.objects.order_by("-created_at"))
+            sons = [product.to_mongo() for product in products]
+            self._cache.set(("all",), sons)
+            for product in products:
+                self._store(product)
+            if not raw:
+                return products
+
+        return sons if raw else [self._build(son) for son in sons]
+
+    def invalidate(self):
+        """Bump the shared version and clear this worker's cache"""
+        self._version = CacheVersion.bump(self.VERSION_NAME)
+        self._checked_at = time.monotonic()
+        self._cache.clear()
+        self.invalidations += 1
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update(
+            {
+                "enabled": self.enabled,
+                "version": self._version,
+                "invalidations": self.invalidations,
+            }
+        )
+        return stats
+
+
+catalog_cache = ProductCatalogCache()
@@ -0,0 +1,85 @@
+"""
+Batched product lookups.
+Resolves many product ids with a single id__in query (or the process-wide
+catalog cache when enabled) and keeps an identity map so repeated lookups
+within a request never hit MongoDB twice.
+"""
+
+from bson import ObjectId
+
+from .cache import catalog_cache
+from .models import Product
+
+
+class ProductResolver:
+    """
+    Load products by id in batches, projecting only the fields a view needs.
+
+    Usage:
+        resolver = ProductResolver.for_request(request)
+        resolver.prefetch(item.product_id for item in inventory)
+        product = resolver.get(item.product_id)  # None if missing
+    """
+
+    DEFAULT_FIELDS = ("name", "dealer_price")
+
+    def __init__(self, fields=DEFAULT_FIELDS):
+        self.fields = tuple(fields) if fields else None
+        self._products = {}  # product_id -> Product or None (not found)
+
+    @classmethod
+    def for_request(cls, request, fields=DEFAULT_FIELDS):
+        """Return the resolver bound to this request for the given projection"""
+        fields = tuple(fields) if fields else None
+        resolvers = getattr(request, "_product_resolvers", None)
+        if resolvers is None:
+            resolvers = {}
+            request._product_resolvers = resolvers
+        if fields not in resolvers:
+            resolvers[fields] = cls(fields)
+        return resolvers[fields]
+
+    def prefetch(self, product_ids):
+        """Fetch every unseen id in one query; unknown/invalid ids resolve to None"""
+        missing = {
+            str(product_id)
+            for product_id in product_ids
+            if product_id and str(product_id) not in self._products
+        }
+        if not missing:
+            return
+
+        valid_ids = [
+            product_id for product_id in missing if ObjectId.is_valid(product_id)
+        ]
+        if valid_ids and catalog_cache.enabled:
+            # Full documents from the process-wide catalog cache
+            self._products.update(catalog_cache.get_many(valid_ids))
+        elif valid_ids:
+            products = Product.objects(id__in=valid_ids)
+            if self.fields:
+                products = products.only(*self.fields)
+            for product in products:
+                self._products[str(product.id)] = product
+
+        for product_id in missing:
+            self._products.setdefault(product_id, None)
+
+    def get(self, product_id):
+        """Return a single product (loading it if needed) or None"""
+        if not product_id:
+            return None
+        product_id = str(product_id)
+        if product_id not in self._products:
+            self.prefetch([product_id])
+        return self._products[product_id]
+
+    def get_many(self, product_ids):
+        """Return {product_id: Product} for the ids that exist"""
+        product_ids = [str(product_id) for product_id in product_ids if product_id]
+        self.prefetch(product_ids)
+        return {
+            product_id: self._products[product_id]
+            for product_id in product_ids
+            if self._products.get(product_id) is not None
+        }
@@ -0,0 +1,159 @@
+"""
+Product image derivatives.
+Every uploaded original in the media store gets resized WebP and JPEG
+copies (thumb, card, detail) under media/products/variants, recorded on its
+ProductImage as variants = {size: {"webp", "jpeg", "width", "height"}}.
+Rendering runs in Celery workers (generate_image_variants) or, for backfills,
+in the build_image_variants process pool, never in the request handler.
+"""
+
+import os
+
+from django.conf import settings
+from PIL import Image, ImageOps
+from pymongo import UpdateOne
+
+from .cache import catalog_cache
+from .models import Product
+
+# Longest edge in pixels (originals are never upscaled)
+SIZES = {
+    "thumb": 200,
+    "card": 480,
+    "detail": 1200,
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+MEDIA_PREFIX = "/media/"
+
+
+# ============================================
+# PATHS
+# ============================================
+
+
+def source_path(url):
+    """Local path of an uploaded original, or None for external/missing files"""
+    if not url or not url.startswith(MEDIA_PREFIX):
+        return None
+    path = os.path.join(settings.MEDIA_ROOT, url[len(MEDIA_PREFIX) :])
+    return path if os.path.isfile(path) else None
+
+
+def _variant_name(path, size, fmt):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{size}.{fmt}"
+
+
+def _media_url(path):
+    relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+    return f"{MEDIA_PREFIX}{relative}"
+
+
+def needs_variants(image):
+    return not image.variants and source_path(image.url) is not None
+
+
+# ============================================
+# RENDERING (no database access; safe in worker processes)
+# ============================================
+
+
+def _flatten(image):
+    """RGB copy for JPEG, with transparency composited onto white"""
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(path):
+    """
+    Write every size/format derivative of the original at path and return
+    the variants dict to store on its ProductImage.
+    """
+    out_dir = settings.MEDIA_DIRS["PRODUCT_VARIANTS"]
+    variants = {}
+
+    with Image.open(path) as original:
+        original.seek(0)  # First frame of animated GIF/WebP
+        base = ImageOps.exif_transpose(original)
+        if base.mode not in ("RGB", "RGBA"):
+            base = base.convert("RGBA" if "transparency" in base.info else "RGB")
+
+        # Largest first, each size resampled from the previous one
+        current = base
+        for size, edge in sorted(SIZES.items(), key=lambda item: -item[1]):
+            current = current.copy()
+            current.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+
+            webp_path = os.path.join(out_dir, _variant_name(path, size, "webp"))
+            jpeg_path = os.path.join(out_dir, _variant_name(path, size, "jpg"))
+            current.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            _flatten(current).save(
+                jpeg_path,
+                "JPEG",
+                quality=JPEG_QUALITY,
+                optimize=True,
+                progressive=True,
+            )
+
+            variants[size] = {
+                "webp": _media_url(webp_path),
+                "jpeg": _media_url(jpeg_path),
+                "width": current.width,
+                "height": current.height,
+            }
+
+    return variants
+
+
+def remove_variants(image):
+    """Delete the derivative files of a ProductImage"""
+    for variant in (image.variants or {}).values():
+        for key in ("webp", "jpeg"):
+            path = source_path(variant.get(key))
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# ============================================
+# PRODUCT-LEVEL API
+# ============================================
+
+
+def store_variants(product_id, rendered):
+    """
+    Record {url: variants} on a product's images with positional updates (no
+    full save, so concurrent edits are not overwritten).
+    """
+    operations = [
+        UpdateOne(
+            {"_id": product_id, "images.url": url},
+            {"$set": {"images.$.variants": variants}},
+        )
+        for url, variants in rendered.items()
+    ]
+    if not operations:
+        return 0
+    result = Product._get_collection().bulk_write(operations, ordered=False)
+    if result.modified_count:
+        catalog_cache.invalidate()
+    return result.modified_count
+
+
+def schedule_variants(product):
+    """Queue derivative rendering if any local image of product lacks them"""
+    from apps.core.jobs import enqueue
+
+    from .tasks import generate_image_variants
+
+    if any(needs_variants(image) for image in product.images):
+        enqueue(generate_image_variants, str(product.id))
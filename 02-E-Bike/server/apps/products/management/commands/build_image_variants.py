@@ -0,0 +1,84 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.products.images import (
+    needs_variants,
+    render_variants,
+    source_path,
+    store_variants,
+)
+from apps.products.models import Product
+
+
+def _init_worker():
+    """Set up Django in spawned workers (settings are needed for media paths)"""
+    import django
+
+    django.setup()
+
+
+def _render(job):
+    """Worker entry point: render one original (no database access)"""
+    product_id, url, path = job
+    try:
+        return product_id, url, render_variants(path), None
+    except Exception as e:
+        return product_id, url, None, str(e)
+
+
+class Command(BaseCommand):
+    help = "Render WebP/JPEG derivatives for product images across all CPU cores"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render images that already have variants",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: number of CPUs)",
+        )
+
+    def handle(self, *args, **options):
+        jobs = []
+        for product in Product.objects.only("images").no_cache():
+            for image in product.images:
+                path = source_path(image.url)
+                if path and (options["force"] or needs_variants(image)):
+                    jobs.append((product.pk, image.url, path))
+
+        self.stdout.write(
+            self.style.HTTP_INFO(
+                f"🖼️  Rendering variants for {len(jobs)} images "
+                f"with {options['workers']} workers..."
+            )
+        )
+
+        rendered = defaultdict(dict)
+        failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=_init_worker
+        ) as pool:
+            for product_id, url, variants, error in pool.map(
+                _render, jobs, chunksize=4
+            ):
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"⚠ {url}: {error}"))
+                else:
+                    rendered[product_id][url] = variants
+
+        stored = sum(
+            store_variants(product_id, images)
+            for product_id, images in rendered.items()
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ {stored} images updated, {failed} failed")
+        )
@@ -56,6 +56,8 @@ class ProductImage(EmbeddedDocument):
     alt = fields.StringField(max_length=200)
     is_primary = fields.BooleanField(default=False)
     uploaded_at = fields.DateTimeField(default=datetime.now)
+    # Resized derivatives: {size: {"webp": url, "jpeg": url, "width", "height"}}
+    variants = fields.DictField()
 
 
 class Product(Document):
@@ -110,6 +112,7 @@ class Product(Document):
             "category",
             "is_available",
             "-created_at",
+            "images.url",  # Media store reference counts
         ],
         "ordering": ["-created_at"],
     }
@@ -118,9 +121,31 @@ class Product(Document):
         return f"{self.name} ({self.model})"
 
     def save(self, *args, **kwargs):
-        """Override save to update timestamp"""
+        """Override save to update timestamp and invalidate the catalog cache"""
+        from apps.core import media
+
         self.updated_at = datetime.utcnow()
-        return super(Product, self).save(*args, **kwargs)
+        images_changed = media.touched(self, "images")
+        result = super(Product, self).save(*args, **kwargs)
+        self._invalidate_catalog_cache()
+        if images_changed:
+            media.recount(image.url for image in self.images)
+        return result
+
+    def delete(self, *args, **kwargs):
+        """Override delete to invalidate the catalog cache and release images"""
+        from apps.core import media
+
+        result = super(Product, self).delete(*args, **kwargs)
+        self._invalidate_catalog_cache()
+        media.recount(image.url for image in self.images)
+        return result
+
+    @staticmethod
+    def _invalidate_catalog_cache():
+        from .cache import catalog_cache
+
+        catalog_cache.invalidate()
 
     @property
     def is_low_stock(self):
@@ -0,0 +1,253 @@
+"""
+In-process product search.
+An inverted index over name, model, category, description and specification
+strings is built from the catalog cache and rebuilt whenever the
+"product_catalog" CacheVersion changes. Queries are answered from memory:
+- every query term must match (exact token, prefix, or one/two typos)
+- results are ranked by field weight and match quality, newest first on ties
+so the POS search box gets ranked, typo-tolerant prefix matches without a
+collection scan.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+from apps.core.models import CacheVersion
+
+from .cache import catalog_cache
+
+# Field weights (a name hit outranks a description hit)
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "model": 4.0,
+    "category": 3.0,
+    "specifications": 1.5,
+    "description": 1.0,
+}
+
+# Match quality multipliers
+EXACT = 1.0
+PREFIX = 0.8
+FUZZY = 0.5
+
+MIN_FUZZY_LENGTH = 3  # Shorter terms are only matched exactly / by prefix
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase, accent-free alphanumeric tokens"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _within(a, b, limit):
+    """True if the Levenshtein distance between a and b is <= limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            value = min(previous[j] + 1, current[j - 1] + 1, cost)
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class _Snapshot:
+    """
+    One immutable build of the index. A rebuild publishes a new snapshot with
+    a single assignment, so a lookup never mixes two builds.
+    """
+
+    __slots__ = ("postings", "vocabulary", "prefixes", "rank")
+
+    def __init__(self, postings=None, vocabulary=(), prefixes=None, rank=None):
+        self.postings = postings or {}  # token -> {product_id: weight}
+        self.vocabulary = vocabulary  # sorted tokens, for prefix lookups
+        # first letter -> prefix length -> {prefix: [tokens]}, for typo lookups
+        self.prefixes = prefixes or {}
+        self.rank = rank or {}  # product_id -> catalog position (newest first)
+
+
+class ProductSearchIndex:
+    """Inverted index with prefix and typo-tolerant lookup"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._invalidations = None
+        self._checked_at = 0.0
+        self._snapshot = _Snapshot()
+        self.builds = 0
+        self.build_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _sync(self):
+        """Rebuild if this worker or another one changed the catalog"""
+        now = time.monotonic()
+        stale = self._invalidations != catalog_cache.invalidations
+        interval = settings.PRODUCT_CACHE_VERSION_CHECK
+        if not stale and now - self._checked_at < interval:
+            return
+        self._checked_at = now
+
+        version = CacheVersion.current(catalog_cache.VERSION_NAME)
+        if stale or version != self._version:
+            with self._lock:
+                self._build(version)
+
+    @staticmethod
+    def _fields(product):
+        specs = product.specifications
+        spec_text = []
+        if specs:
+            for name in specs._fields:
+                value = getattr(specs, name)
+                spec_text.extend(value if isinstance(value, list) else [value])
+        return {
+            "name": [product.name],
+            "model": [product.model],
+            "category": [product.category],
+            "specifications": spec_text,
+            "description": [product.description],
+        }
+
+    def _build(self, version):
+        started = time.monotonic()
+        invalidations = catalog_cache.invalidations
+        products = catalog_cache.all()
+
+        postings = defaultdict(dict)
+        rank = {}
+        for position, product in enumerate(products):
+            product_id = str(product.id)
+            rank[product_id] = position
+            for field, values in self._fields(product).items():
+                weight = FIELD_WEIGHTS[field]
+                for value in values:
+                    for token in tokenize(value):
+                        entry = postings[token]
+                        entry[product_id] = max(entry.get(product_id, 0), weight)
+
+        prefixes = {}
+        for token in postings:
+            by_length = prefixes.setdefault(token[0], {})
+            for length in range(MIN_FUZZY_LENGTH - 1, len(token) + 1):
+                by_length.setdefault(length, {}).setdefault(
+                    token[:length], []
+                ).append(token)
+
+        # Built in locals and published in one assignment
+        self._snapshot = _Snapshot(
+            dict(postings), tuple(sorted(postings)), prefixes, rank
+        )
+        self._version = version
+        self._invalidations = invalidations
+        self.builds += 1
+        self.build_ms = (time.monotonic() - started) * 1000
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _prefix_tokens(snapshot, term):
+        vocabulary = snapshot.vocabulary
+        i = bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            yield vocabulary[i]
+            i += 1
+
+    @staticmethod
+    def _fuzzy_tokens(snapshot, term):
+        """Tokens with a prefix within 1 (2 for long terms) edits of term"""
+        limit = 1 if len(term) < 7 else 2
+        by_length = snapshot.prefixes.get(term[0], {})
+        found = set()
+        for length in range(len(term) - limit, len(term) + limit + 1):
+            for prefix, tokens in by_length.get(length, {}).items():
+                if _within(term, prefix, limit):
+                    found.update(tokens)
+        return found
+
+    def _matches(self, snapshot, term):
+        """{product_id: score} for one query term"""
+        postings = snapshot.postings
+        scores = {}
+
+        def add(token, quality):
+            for product_id, weight in postings[token].items():
+                score = weight * quality
+                if score > scores.get(product_id, 0):
+                    scores[product_id] = score
+
+        if term in postings:
+            add(term, EXACT)
+        for token in self._prefix_tokens(snapshot, term):
+            if token != term:
+                add(token, PREFIX)
+        if not scores and len(term) >= MIN_FUZZY_LENGTH:
+            for token in self._fuzzy_tokens(snapshot, term):
+                add(token, FUZZY)
+        return scores
+
+    def search(self, query, limit=None):
+        """Return [(product_id, score)] best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        self._sync()
+        snapshot = self._snapshot  # One build for the whole query
+
+        totals = None
+        for term in terms:
+            matches = self._matches(snapshot, term)
+            if totals is None:
+                totals = matches
+            else:
+                # Every term must match
+                totals = {
+                    product_id: score + matches[product_id]
+                    for product_id, score in totals.items()
+                    if product_id in matches
+                }
+            if not totals:
+                return []
+
+        ranked = sorted(
+            totals.items(), key=lambda item: (-item[1], snapshot.rank.get(item[0], 0))
+        )
+        return ranked[:limit] if limit else ranked
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": self._version,
+            "products": len(snapshot.rank),
+            "tokens": len(snapshot.vocabulary),
+            "builds": self.builds,
+            "last_build_ms": round(self.build_ms, 2),
+        }
+
+
+product_search = ProductSearchIndex()
@@ -1,7 +1,7 @@
-from django.conf import settings
 import os
-import uuid
 from rest_framework import serializers
+from apps.core import media
+from apps.core.projection import FieldMap, raw_id
 from .models import (
     Product,
     ProductSpecifications,
@@ -43,6 +43,8 @@ class ProductImageSerializer(serializers.Serializer):
     url = serializers.CharField()
     alt = serializers.CharField(max_length=200, required=False)
     is_primary = serializers.BooleanField(default=False)
+    # {size: {"webp", "jpeg", "width", "height"}}; empty until rendered
+    variants = serializers.DictField(read_only=True)
 
 
 class ProductImageUploadSerializer(serializers.Serializer):
@@ -70,27 +72,12 @@ class ProductImageUploadSerializer(serializers.Serializer):
         return value
 
     def save(self, product_id=None):
-        """Save image and return image data"""
+        """Save image (once per distinct content) and return image data"""
         image = self.validated_data["image"]
 
-        # Generate unique filename
-        ext = os.path.splitext(image.name)[1]
-        filename = f"{uuid.uuid4()}{ext}"
-
-        # Create media/products directory if not exists
-        media_dir = os.path.join(settings.MEDIA_ROOT, "products")
-        os.makedirs(media_dir, exist_ok=True)
-
-        # Save file
-        filepath = os.path.join(media_dir, filename)
-
-        with open(filepath, "wb+") as destination:
-            for chunk in image.chunks():
-                destination.write(chunk)
-
         # Return relative URL
         return {
-            "url": f"/media/products/{filename}",
+            "url": media.store(image),
             "alt": self.validated_data.get("alt", ""),
             "is_primary": self.validated_data.get("is_primary", False),
         }
@@ -121,14 +108,50 @@ class ProductSerializer(serializers.Serializer):
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
     is_low_stock = serializers.SerializerMethodField()
+    primary_image = serializers.SerializerMethodField()
 
     def get_id(self, obj):
         return str(obj.id)
 
+    def get_primary_image(self, obj):
+        """Per-size URLs of the primary image, for grids and cards"""
+        if not obj.images:
+            return None
+        image = next((i for i in obj.images if i.is_primary), obj.images[0])
+        data = {"url": image.url, "alt": image.alt or ""}
+        data.update(image.variants or {})
+        return data
+
     def get_is_low_stock(self, obj):
         return obj.is_low_stock
 
 
+def _raw_is_low_stock(doc):
+    return doc.get("total_stock", 0) <= doc.get("low_stock_threshold", 10)
+
+
+def _raw_primary_image(doc):
+    images = doc.get("images")
+    if not images:
+        return None
+    image = next((i for i in images if i.get("is_primary")), images[0])
+    data = {"url": image.get("url"), "alt": image.get("alt") or ""}
+    data.update(image.get("variants") or {})
+    return data
+
+
+# Raw-document read path for product lists (same output as ProductSerializer)
+PRODUCT_LIST_MAP = FieldMap(
+    Product,
+    ProductSerializer,
+    computed={
+        "id": raw_id,
+        "is_low_stock": _raw_is_low_stock,
+        "primary_image": _raw_primary_image,
+    },
+)
+
+
 class ProductCreateUpdateSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=200)
     slug = serializers.CharField(max_length=200)
@@ -0,0 +1,22 @@
+from celery import shared_task
+from .images import needs_variants, render_variants, source_path, store_variants
+from .models import Product
+
+
+@shared_task
+def generate_image_variants(product_id):
+    """Render WebP/JPEG derivatives for a product's images that lack them"""
+    product = Product.objects.only("images").filter(id=product_id).first()
+    if product is None:
+        return f"Product {product_id} not found"
+
+    rendered = {}
+    for image in product.images:
+        if needs_variants(image):
+            try:
+                rendered[image.url] = render_variants(source_path(image.url))
+            except Exception as e:
+                print(f"Failed to render variants for {image.url}: {e}")
+
+    stored = store_variants(product.pk, rendered)
+    return f"Rendered variants for {stored} image(s) of product {product_id}"
@@ -8,6 +8,7 @@ urlpatterns = [
     # PUBLIC ENDPOINTS (View Products)
     # ============================================
     path("", views.list_products, name="list-products"),
+    path("search/", views.search_products, name="search-products"),
     path("<str:product_id>/", views.get_product, name="get-product"),
     path("slug/<str:slug>/", views.get_product_by_slug, name="get-product-by-slug"),
     # ============================================
@@ -19,6 +20,12 @@ urlpatterns = [
     path("admin/<str:product_id>/delete/", views.delete_product, name="delete-product"),
     # Stock Management
     path("admin/stock/overview/", views.get_stock_overview, name="stock-overview"),
+    # Catalog Cache
+    path(
+        "admin/cache/stats/",
+        views.get_catalog_cache_stats,
+        name="catalog-cache-stats",
+    ),
     # Image Management
     path("admin/upload-images/", views.upload_product_images, name="upload-images"),
     path(
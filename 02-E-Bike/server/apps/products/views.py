@@ -17,9 +17,14 @@ from .models import (
     Warranty,
     ProductImage,
 )
+from apps.core import media
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
+from .cache import catalog_cache
+from .images import remove_variants, schedule_variants
+from .search import product_search
 from .serializers import (
+    PRODUCT_LIST_MAP,
     ProductSerializer,
     ProductCreateUpdateSerializer,
     ProductImageUploadSerializer,
@@ -46,6 +51,7 @@ def list_products(request):
 
     GET /api/products/
     Query params: search, category, featured, available, limit
+    With search, results are ranked by relevance instead of newest first.
     """
     try:
         # Get query parameters
@@ -55,26 +61,33 @@ def list_products(request):
         is_available = request.GET.get("available", "true")
         limit = request.GET.get("limit", None)
 
-        # Build query
-        query = {}
+        # Filter the cached catalog (already ordered newest first) as raw
+        # documents, mapped straight to response dicts
         if search:
-            query["name__icontains"] = search
+            ranked = [product_id for product_id, _ in product_search.search(search)]
+            found = catalog_cache.get_many(ranked, raw=True)
+            products = [found[i] for i in ranked if i in found]
+        else:
+            products = catalog_cache.all(raw=True)
         if category:
-            query["model"] = category
+            products = [p for p in products if p.get("model") == category]
         if is_featured:
-            query["is_featured"] = is_featured.lower() == "true"
+            featured = is_featured.lower() == "true"
+            products = [p for p in products if p.get("is_featured", False) == featured]
         if is_available:
-            query["is_available"] = is_available.lower() == "true"
-
-        products = Product.objects(**query).order_by("-created_at")
+            available = is_available.lower() == "true"
+            products = [
+                p for p in products if p.get("is_available", True) == available
+            ]
 
         # Apply limit if specified
         if limit:
             try:
                 limit_int = int(limit)
                 products = products[:limit_int]
-                serializer = ProductSerializer(products, many=True)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                return Response(
+                    PRODUCT_LIST_MAP.dump_many(products), status=status.HTTP_200_OK
+                )
             except ValueError:
                 pass
 
@@ -82,8 +95,9 @@ def list_products(request):
         paginator = ProductPagination()
         paginated_products = paginator.paginate_queryset(products, request)
 
-        serializer = ProductSerializer(paginated_products, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            PRODUCT_LIST_MAP.dump_many(paginated_products)
+        )
 
     except Exception as e:
         return Response(
@@ -96,6 +110,75 @@ def list_products(request):
         )
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@authentication_classes([])
+def search_products(request):
+    """
+    Ranked, typo-tolerant product search for the POS search box (public).
+
+    GET /api/products/search/?q=lightn&limit=10
+    Query params: q, limit (default 10, max 50), available (default true)
+    """
+    try:
+        query = request.GET.get("q", "").strip()
+        is_available = request.GET.get("available", "true")
+        try:
+            limit = max(1, min(int(request.GET.get("limit", 10)), 50))
+        except ValueError:
+            limit = 10
+
+        if not query:
+            return Response(
+                {"success": True, "query": query, "count": 0, "results": []},
+                status=status.HTTP_200_OK,
+            )
+
+        ranked = product_search.search(query)
+        found = catalog_cache.get_many(product_id for product_id, _ in ranked)
+        available = is_available.lower() == "true" if is_available else None
+
+        results = []
+        for product_id, score in ranked:
+            product = found.get(product_id)
+            if product is None:
+                continue
+            if available is not None and product.is_available != available:
+                continue
+            results.append(
+                {
+                    "id": product_id,
+                    "name": product.name,
+                    "model": product.model,
+                    "slug": product.slug,
+                    "mrp": product.mrp,
+                    "score": round(score, 2),
+                }
+            )
+            if len(results) >= limit:
+                break
+
+        return Response(
+            {
+                "success": True,
+                "query": query,
+                "count": len(results),
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to search products",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 @authentication_classes([])
@@ -138,7 +221,7 @@ def get_product_by_slug(request, slug):
     GET /api/products/slug/<slug>/
     """
     try:
-        product = Product.objects.get(slug=slug)
+        product = catalog_cache.get_by_slug(slug)
         serializer = ProductSerializer(product)
         return Response(
             {"success": True, "product": serializer.data},
@@ -241,6 +324,7 @@ def create_product(request):
             product.videos = data["videos"]
 
         product.save()
+        schedule_variants(product)
 
         response_serializer = ProductSerializer(product)
         return Response(
@@ -335,15 +419,22 @@ def update_product(request, product_id):
         if "warranty" in data:
             product.warranty = Warranty(**data["warranty"])
 
-        # Update images
+        # Update images (keeping already rendered variants of unchanged ones)
+        previous_urls = [image.url for image in product.images]
         if "images" in data:
-            product.images = [ProductImage(**img) for img in data["images"]]
+            variants = {image.url: image.variants for image in product.images}
+            product.images = [
+                ProductImage(variants=variants.get(img["url"]) or {}, **img)
+                for img in data["images"]
+            ]
 
         # Update videos
         if "videos" in data:
             product.videos = data["videos"]
 
         product.save()
+        media.recount(previous_urls)  # Release images that were dropped
+        schedule_variants(product)
 
         response_serializer = ProductSerializer(product)
         return Response(
@@ -394,8 +485,11 @@ def delete_product(request, product_id):
         product = Product.objects.get(id=product_id)
         product_name = product.name
 
-        # Delete product images from filesystem
+        # Store images are released by delete() and collected once unused;
+        # only legacy per-upload files are removed here
         for image in product.images:
+            if media.is_blob(image.url):
+                continue
             try:
                 filepath = os.path.join(
                     settings.MEDIA_ROOT, image.url.lstrip("/media/")
@@ -486,6 +580,45 @@ def get_stock_overview(request):
         )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([MongoEngineJWTAuthentication])
+def get_catalog_cache_stats(request):
+    """
+    Get product catalog cache statistics (Admin only).
+
+    GET /api/products/admin/cache/stats/
+    """
+    try:
+        if request.user.role != User.ROLE_ADMIN:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Only Admins can view cache statistics",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return Response(
+            {
+                "success": True,
+                "cache": catalog_cache.stats(),
+                "search_index": product_search.stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        return Response(
+            {
+                "success": False,
+                "message": "Failed to retrieve cache statistics",
+                "error": str(e),
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
 # ============================================
 # IMAGE MANAGEMENT (Admin only)
 # ============================================
@@ -560,6 +693,7 @@ def upload_product_images(request, product_id=None):
             for img_data in uploaded_images:
                 product.images.append(ProductImage(**img_data))
             product.save()
+            schedule_variants(product)
 
             return Response(
                 {
@@ -699,6 +833,7 @@ def create_product_with_images(request):
             product.images = [ProductImage(**img) for img in data["images"]]
 
         product.save()
+        schedule_variants(product)
 
         return Response(
             {
@@ -744,21 +879,28 @@ def delete_product_image(request, product_id, image_index):
 
         if 0 <= image_index < len(product.images):
             # Get image URL before removing
-            image_url = product.images[image_index].url
+            image = product.images[image_index]
+            image_url = image.url
 
             # Remove from database
             product.images.pop(image_index)
             product.save()
 
-            # Try to delete physical file
-            try:
-                filepath = os.path.join(
-                    settings.MEDIA_ROOT, image_url.lstrip("/media/")
-                )
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            except Exception as e:
-                print(f"Failed to delete file: {e}")
+            if media.is_blob(image_url):
+                # Store images may be shared: release the reference and let
+                # the garbage collector remove the file once nothing uses it
+                media.recount([image_url])
+            else:
+                # Try to delete physical file
+                remove_variants(image)
+                try:
+                    filepath = os.path.join(
+                        settings.MEDIA_ROOT, image_url.lstrip("/media/")
+                    )
+                    if os.path.exists(filepath):
+                        os.remove(filepath)
+                except Exception as e:
+                    print(f"Failed to delete file: {e}")
 
             return Response(
                 {
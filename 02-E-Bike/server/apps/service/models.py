@@ -155,7 +155,13 @@ class ServiceRequest(Document):
             "assigned_to",
             "invoice_id",
             "status",
+            "service_photos",
             "-created_at",
+            # Keyset pagination (created_at, _id) per listing scope
+            ("-created_at", "-id"),
+            ("dealer_id", "-created_at", "-id"),
+            ("assigned_to", "-created_at", "-id"),
+            ("customer_id", "-created_at", "-id"),
         ],
         "ordering": ["-created_at"],
     }
@@ -164,12 +170,20 @@ class ServiceRequest(Document):
         return f"Service Request {self.request_number}"
 
     def save(self, *args, **kwargs):
+        from apps.core import media
+
         self.updated_at = datetime.utcnow()
 
         # Calculate total cost
         self.total_cost = self.service_charge + self.parts_cost
 
-        return super(ServiceRequest, self).save(*args, **kwargs)
+        photos_changed = media.touched(self, "service_photos")
+        previous = media.stored(self, "service_photos") if photos_changed else None
+        result = super(ServiceRequest, self).save(*args, **kwargs)
+        if photos_changed:
+            # Old and new together, so dropped photos are released
+            media.recount([*(previous or []), *self.service_photos])
+        return result
 
     @staticmethod
     def generate_request_number():
@@ -220,6 +234,10 @@ class ServiceWarrantyTracker(Document):
             "invoice_id",
             "customer_id",
             "product_id",
+            # Reminder jobs: equality, then the _id checkpoint sort, then the
+            # date range, so batches stream in index order without a sort
+            ("warranty_status", "id", "warranty_expiry_date"),
+            ("warranty_status", "id", "last_service_date"),
         ],
     }
 
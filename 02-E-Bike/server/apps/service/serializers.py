@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.projection import FieldMap, raw_id
 from .models import (
     ServiceRequest,
     ServiceWarrantyTracker,
@@ -71,6 +72,12 @@ class ServiceRequestSerializer(serializers.Serializer):
         return str(obj.id)
 
 
+# Raw-document read path for service request lists (?fields= / ?expand=)
+SERVICE_REQUEST_LIST_MAP = FieldMap(
+    ServiceRequest, ServiceRequestSerializer, computed={"id": raw_id}
+)
+
+
 class CreateServiceRequestSerializer(serializers.Serializer):
     invoice_id = serializers.CharField()
     issue_type = serializers.ChoiceField(choices=ServiceRequest.ISSUE_TYPE_CHOICES)
@@ -1,7 +1,24 @@
 from celery import shared_task
 from .models import ServiceWarrantyTracker
-from apps.billing.models import Sale
-from datetime import datetime, timedelta
+from apps.core.jobs import checkpointed_batches, enqueue
+from apps.core.models import JobCheckpoint
+from apps.notifications import counters
+from apps.notifications.models import Notification
+from apps.users.models import User
+from bson import ObjectId
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.core.mail import send_mass_mail
+
+SERVICE_INTERVAL_DAYS = 90
+
+TRACKER_PROJECTION = {
+    "invoice_id": 1,
+    "customer_id": 1,
+    "services_remaining": 1,
+    "last_service_date": 1,
+    "warranty_expiry_date": 1,
+}
 
 
 @shared_task
@@ -10,37 +27,137 @@ def send_warranty_reminders():
     # Get warranties expiring in 30 days
     thirty_days_from_now = datetime.utcnow() + timedelta(days=30)
 
-    warranties = ServiceWarrantyTracker.objects(
-        warranty_status=ServiceWarrantyTracker.WARRANTY_ACTIVE,
-        warranty_expiry_date__lte=thirty_days_from_now,
-    )
-
-    for warranty in warranties:
-        # TODO: Send email/notification to customer
-        print(f"Reminder: Warranty for invoice {warranty.invoice_id} expiring soon")
+    def build(tracker):
+        expiry = tracker["warranty_expiry_date"].strftime("%d %b %Y")
+        return (
+            "Warranty expiring soon",
+            f"The warranty for invoice {tracker['invoice_id']} expires on {expiry}.",
+        )
 
-    return f"Sent {warranties.count()} warranty reminders"
+    checkpoint = _run_reminders(
+        "warranty_reminders",
+        {
+            "warranty_status": ServiceWarrantyTracker.WARRANTY_ACTIVE,
+            "warranty_expiry_date": {"$lte": thirty_days_from_now},
+        },
+        build,
+    )
+    return f"Sent {checkpoint.processed} warranty reminders"
 
 
 @shared_task
 def send_service_reminders():
     """Send service reminders to customers"""
-    # Get customers who haven't used all free services
-    warranties = ServiceWarrantyTracker.objects(
-        warranty_status=ServiceWarrantyTracker.WARRANTY_ACTIVE, services_remaining__gt=0
-    )
+    # Free services left and no service yet, or last one over 90 days ago
+    due_before = datetime.utcnow() - timedelta(days=SERVICE_INTERVAL_DAYS)
 
-    for warranty in warranties:
-        # Check if last service was more than 90 days ago or no service yet
-        if not warranty.last_service_date:
-            # TODO: Send reminder
-            print(
-                f"Reminder: {warranty.services_remaining} free services remaining for {warranty.invoice_id}"
+    def build(tracker):
+        if not tracker.get("last_service_date"):
+            return (
+                "Free services available",
+                f"You have {tracker['services_remaining']} free services "
+                f"remaining for invoice {tracker['invoice_id']}.",
             )
-        else:
-            days_since_service = (datetime.utcnow() - warranty.last_service_date).days
-            if days_since_service > 90:
-                # TODO: Send reminder
-                print(f"Reminder: Time for next service for {warranty.invoice_id}")
+        return (
+            "Time for your next service",
+            f"Your e-bike from invoice {tracker['invoice_id']} is due for a "
+            f"service ({tracker['services_remaining']} free services left).",
+        )
+
+    checkpoint = _run_reminders(
+        "service_reminders",
+        {
+            "warranty_status": ServiceWarrantyTracker.WARRANTY_ACTIVE,
+            "services_remaining": {"$gt": 0},
+            "$or": [
+                {"last_service_date": None},
+                {"last_service_date": {"$lt": due_before}},
+            ],
+        },
+        build,
+    )
+    return f"Sent {checkpoint.processed} service reminders"
+
+
+@shared_task
+def send_reminder_emails(messages):
+    """Send a batch of [subject, message, recipient] reminder emails"""
+    sent = send_mass_mail(
+        [
+            (subject, message, settings.DEFAULT_FROM_EMAIL, [recipient])
+            for subject, message, recipient in messages
+        ],
+        fail_silently=True,
+    )
+    return f"Sent {sent} reminder emails"
+
+
+def _run_reminders(job, query, build):
+    """
+    Stream matching trackers in batches and remind each customer once per day.
+    A daily checkpoint lets an interrupted run resume and stops a finished
+    run from being repeated.
+    """
+    checkpoint = JobCheckpoint.resume(f"{job}:{date.today().isoformat()}")
+    if checkpoint.completed:
+        print(f"{job} already completed today ({checkpoint.processed} sent)")
+        return checkpoint
+
+    for batch in checkpointed_batches(
+        ServiceWarrantyTracker._get_collection(),
+        query,
+        TRACKER_PROJECTION,
+        checkpoint,
+        settings.REMINDER_BATCH_SIZE,
+    ):
+        _send_batch(batch, build)
+
+    checkpoint.complete()
+    return checkpoint
+
+
+def _send_batch(trackers, build):
+    """Bulk insert notifications, bump unread counters and queue the emails"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(days=settings.NOTIFICATION_EXPIRY_DAYS)
+
+    reminders = [(tracker["customer_id"], *build(tracker)) for tracker in trackers]
+
+    Notification._get_collection().insert_many(
+        [
+            Notification(
+                sent_by="system",
+                sender_role="system",
+                recipient_type=Notification.RECIPIENT_SPECIFIC,
+                recipient_ids=[customer_id],
+                title=title,
+                message=message,
+                notification_type=Notification.TYPE_INFO,
+                sent_at=now,
+                expires_at=expires_at,
+            ).to_mongo()
+            for customer_id, title, message in reminders
+        ],
+        ordered=False,
+    )
+    counters.increment(customer_id for customer_id, _, _ in reminders)
 
-    return f"Sent {warranties.count()} service reminders"
+    customer_ids = [
+        ObjectId(customer_id)
+        for customer_id in {customer_id for customer_id, _, _ in reminders}
+        if ObjectId.is_valid(customer_id)
+    ]
+    emails = {
+        str(doc["_id"]): doc["email"]
+        for doc in User._get_collection().find(
+            {"_id": {"$in": customer_ids}, "is_active": True}, {"email": 1}
+        )
+        if doc.get("email")
+    }
+    messages = [
+        [title, message, emails[customer_id]]
+        for customer_id, title, message in reminders
+        if customer_id in emails
+    ]
+    if messages:
+        enqueue(send_reminder_emails, messages)
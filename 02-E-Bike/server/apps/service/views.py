@@ -24,6 +24,7 @@ from .models import (
     PartUsed,
 )
 from .serializers import (
+    SERVICE_REQUEST_LIST_MAP,
     ServiceRequestSerializer,
     CreateServiceRequestSerializer,
     ServiceWarrantyTrackerSerializer,
@@ -31,6 +32,9 @@ from .serializers import (
 from apps.users.models import User
 from apps.users.backends import MongoEngineJWTAuthentication
 from apps.products.models import Product
+from apps.products.cache import catalog_cache
+from apps.core.pagination import KeysetPagination
+from apps.core.projection import FieldSelectionError, field_selection
 
 
 class ServicePagination(PageNumberPagination):
@@ -120,7 +124,7 @@ def create_service_request(request):
             is_free_service = service_number <= warranty_tracker.total_free_services
 
             # Get service charge from product
-            product = Product.objects.get(id=sale.items[0].product_id)
+            product = catalog_cache.get(sale.items[0].product_id)
 
             if is_free_service:
                 service_charge = 0.0
@@ -534,9 +538,12 @@ def list_service_requests(request):
     - Customer: Their own service requests
 
     GET /api/service/requests/
+    Query params: status, priority, fields, expand (sparse fieldsets, e.g.
+    ?expand= to leave out status_history and parts_used)
     """
     try:
         user = request.user
+        field_map = SERVICE_REQUEST_LIST_MAP.select(*field_selection(request))
 
         # Filter based on role
         if user.role == User.ROLE_ADMIN:
@@ -563,15 +570,24 @@ def list_service_requests(request):
         if priority:
             services = services.filter(priority=priority)
 
-        services = services.order_by("-created_at")
+        services = field_map.project(services.order_by("-created_at"), "created_at")
 
-        # Pagination
-        paginator = ServicePagination()
+        # Pagination (?cursor= for keyset paging)
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination("created_at")
+        else:
+            paginator = ServicePagination()
         paginated_services = paginator.paginate_queryset(services, request)
 
-        serializer = ServiceRequestSerializer(paginated_services, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(
+            field_map.dump_many(paginated_services)
+        )
 
+    except FieldSelectionError as e:
+        return Response(
+            {"success": False, "message": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {
@@ -85,20 +85,23 @@ def customize_token_payload(user: User) -> Dict[str, Any]:
         >>> user = User.objects.get(email='admin@example.com')
         >>> customize_token_payload(user)
         {
+            'user_id': '65a1...',
             'email': 'admin@example.com',
-            'username': 'admin',
+            'username': 'admin@example.com',
+            'role': 'admin',
+            'dealer_id': None,
             'is_staff': True,
-            'role': 'admin'
+            'is_superuser': False
         }
     """
     return {
+        "user_id": str(user.id),
         "email": user.email,
         "username": user.username,
+        "role": user.role,
+        "dealer_id": user.dealer_id,
         "is_staff": user.is_staff,
         "is_superuser": user.is_superuser,
-        # Future: Add role-based claims
-        # 'role': user.role,
-        # 'permissions': user.get_permissions(),
     }
 
 
@@ -2,6 +2,7 @@ from django.contrib.auth.backends import BaseBackend
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
 from .models import User
+from .cache import user_cache
 
 
 class MongoEngineBackend(BaseBackend):
@@ -35,7 +36,8 @@ class MongoEngineBackend(BaseBackend):
 class MongoEngineJWTAuthentication(JWTAuthentication):
     """
     Custom JWT authentication for mongoengine User model.
-    Handles MongoDB ObjectId strings instead of integer IDs.
+    Handles MongoDB ObjectId strings instead of integer IDs and resolves the
+    user through the short-TTL user cache.
     """
 
     def get_user(self, validated_token):
@@ -48,7 +50,7 @@ class MongoEngineJWTAuthentication(JWTAuthentication):
             raise InvalidToken("Token contained no recognizable user identification")
 
         try:
-            user = User.objects.get(id=user_id)
+            user = user_cache.get(user_id)
         except User.DoesNotExist:
             raise AuthenticationFailed("User not found", code="user_not_found")
         except Exception as e:
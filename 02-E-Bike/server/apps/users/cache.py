@@ -0,0 +1,116 @@
+"""
+Short-TTL cache of authenticated users.
+Every API call resolves the JWT's user; this keeps that off MongoDB.
+Entries live in a process-local LRU (USER_CACHE_TTL seconds) backed by an
+optional Redis layer (USER_CACHE_REDIS_TTL seconds). User.save() and
+User.delete() drop the entry locally and in Redis; other workers' local copies
+expire within USER_CACHE_TTL.
+
+Cached users leave out SENSITIVE_FIELDS (the password hash and salary), so
+neither reaches Redis. They are loaded on demand by User.load_omitted(), which
+check_password() and save() call, so request.user stays safe to save.
+"""
+
+import bson
+from django.conf import settings
+
+from apps.core.cache import LRUCache
+from apps.core.redis import get_redis
+
+from .models import User
+
+
+class UserCache:
+    """Cache of User documents keyed by id, stored as raw SON"""
+
+    REDIS_PREFIX = "user:"
+    SENSITIVE_FIELDS = ("password", "salary")
+
+    def __init__(self):
+        self._cache = LRUCache(
+            maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL
+        )
+        self.redis_hits = 0
+        self.redis_errors = 0
+
+    @property
+    def enabled(self):
+        return settings.USER_CACHE_TTL > 0
+
+    def get(self, user_id):
+        """
+        Return the user with this id, without SENSITIVE_FIELDS.
+        Raises User.DoesNotExist, like User.objects.get().
+        """
+        user_id = str(user_id)
+        if not self.enabled:
+            return User.objects.get(id=user_id)
+
+        son = self._cache.get(user_id)
+        if son is None:
+            son = self._redis_get(user_id)
+            if son is not None:
+                self.redis_hits += 1
+                self._cache.set(user_id, son)
+
+        if son is not None:
+            return self._hydrate(son)
+
+        son = User.objects.exclude(*self.SENSITIVE_FIELDS).get(id=user_id).to_mongo()
+        self._cache.set(user_id, son)
+        self._redis_set(user_id, son)
+        return self._hydrate(son)
+
+    def _hydrate(self, son):
+        user = User._from_son(son)
+        user._omitted_fields = self.SENSITIVE_FIELDS
+        return user
+
+    def invalidate(self, user_id):
+        """Drop a user from the local cache and Redis"""
+        user_id = str(user_id)
+        self._cache.delete(user_id)
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(self.REDIS_PREFIX + user_id)
+            except Exception:
+                self.redis_errors += 1
+
+    def _redis_get(self, user_id):
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            data = client.get(self.REDIS_PREFIX + user_id)
+        except Exception:
+            self.redis_errors += 1
+            return None
+        return bson.decode(data) if data else None
+
+    def _redis_set(self, user_id, son):
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(
+                self.REDIS_PREFIX + user_id,
+                bson.encode(son),
+                ex=settings.USER_CACHE_REDIS_TTL,
+            )
+        except Exception:
+            self.redis_errors += 1
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update(
+            {
+                "redis_enabled": get_redis() is not None,
+                "redis_hits": self.redis_hits,
+                "redis_errors": self.redis_errors,
+            }
+        )
+        return stats
+
+
+user_cache = UserCache()
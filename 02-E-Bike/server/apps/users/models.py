@@ -102,6 +102,7 @@ class User(Document):
         "indexes": [
             "email",
             "role",
+            "profile_picture",
             "dealer_id",
             "admin_id",
             "-date_joined",
@@ -109,6 +110,9 @@ class User(Document):
         "ordering": ["-date_joined"],
     }
 
+    # Fields left out of a cached copy (set by apps.users.cache)
+    _omitted_fields = ()
+
     def __str__(self):
         return f"{self.get_full_name()} ({self.role})"
 
@@ -126,8 +130,38 @@ class User(Document):
             raw_password.encode("utf-8"), bcrypt.gensalt()
         ).decode("utf-8")
 
+    def load_omitted(self, *fields):
+        """
+        Load fields the user cache left out (all of them by default), so a
+        cached request.user can check its password, show its salary or save.
+        Fields assigned since loading are kept.
+        """
+        omitted = self._omitted_fields
+        wanted = [
+            name
+            for name in (fields or omitted)
+            if name in omitted and name not in self._get_changed_fields()
+        ]
+        if wanted and self.pk is not None:
+            saved = (
+                User._get_collection().find_one(
+                    {"_id": self.pk},
+                    {self._fields[name].db_field: 1 for name in wanted},
+                )
+                or {}
+            )
+            for name in wanted:
+                value = saved.get(self._fields[name].db_field)
+                # Bypass change tracking: these are the stored values
+                self._data[name] = (
+                    None if value is None else self._fields[name].to_python(value)
+                )
+        self._omitted_fields = tuple(name for name in omitted if name not in wanted)
+        return self
+
     def check_password(self, raw_password):
         """Check if password is correct"""
+        self.load_omitted("password")
         try:
             return bcrypt.checkpw(
                 raw_password.encode("utf-8"), self.password.encode("utf-8")
@@ -175,9 +209,34 @@ class User(Document):
         return self.email
 
     def save(self, *args, **kwargs):
-        """Override save to update timestamp"""
+        """Override save to update timestamp and drop the cached copy"""
+        from apps.core import media
+
+        self.load_omitted()  # Cached users are partial; validate needs them all
         self.updated_at = datetime.utcnow()
-        return super(User, self).save(*args, **kwargs)
+        picture_changed = media.touched(self, "profile_picture")
+        previous = media.stored(self, "profile_picture") if picture_changed else None
+        result = super(User, self).save(*args, **kwargs)
+        self._invalidate_user_cache()
+        if picture_changed:
+            # Old and new together, so a replaced or cleared picture is released
+            media.recount([previous, self.profile_picture])
+        return result
+
+    def delete(self, *args, **kwargs):
+        """Override delete to drop the cached copy and its media reference"""
+        from apps.core import media
+
+        result = super(User, self).delete(*args, **kwargs)
+        self._invalidate_user_cache()
+        media.recount([self.profile_picture])
+        return result
+
+    def _invalidate_user_cache(self):
+        from .cache import user_cache
+
+        if self.id:
+            user_cache.invalidate(self.id)
 
     @classmethod
     def create_user(cls, email, password, **extra_fields):
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import User
+from .authentication import customize_token_payload
 from datetime import datetime
 
 
@@ -232,9 +233,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token["email"] = user.email
-        token["role"] = user.role
-        token["user_id"] = str(user.id)
+        for claim, value in customize_token_payload(user).items():
+            token[claim] = value
         return token
 
 
@@ -32,6 +32,7 @@ from .serializers import (
     UserSerializer,
 )
 from .authentication import (
+    customize_token_payload,
     get_user_context,
     validate_password_strength,
 )
@@ -128,6 +129,8 @@ def register_user(request):
 
         # Generate tokens
         refresh = RefreshToken.for_user(user)
+        for claim, value in customize_token_payload(user).items():
+            refresh[claim] = value
         user_data = get_user_data(user)
 
         return Response(
@@ -196,6 +199,7 @@ def get_current_user(request):
     """Get current authenticated user"""
     try:
         user = request.user
+        user.load_omitted("salary")  # The only field /me needs from MongoDB
         user_data = get_user_data(user)
 
         return Response(
@@ -0,0 +1,38 @@
+"""
+JWT authentication for WebSocket connections.
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+access token is read from the ?token= query parameter and validated exactly
+like MongoEngineJWTAuthentication does for HTTP requests.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .backends import MongoEngineJWTAuthentication
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    """Return the active User for an access token, or AnonymousUser"""
+    authentication = MongoEngineJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate scope["user"] from the ?token= query parameter"""
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token", [None])[0]
+
+        scope["user"] = await get_user_for_token(token) if token else AnonymousUser()
+
+        return await super().__call__(scope, receive, send)
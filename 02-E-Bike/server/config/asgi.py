@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP is served by Django; WebSocket connections are authenticated with a JWT
+access token and routed to the app consumers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +15,30 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from apps.inventory.routing import (  # noqa: E402
+    websocket_urlpatterns as inventory_websocket_urlpatterns,
+)
+from apps.notifications.routing import (  # noqa: E402
+    websocket_urlpatterns as notification_websocket_urlpatterns,
+)
+from apps.users.websocket import JWTAuthMiddleware  # noqa: E402
+
+application = ProtocolTypeRouter(
+    {
+        "http": django_asgi_app,
+        "websocket": AllowedHostsOriginValidator(
+            JWTAuthMiddleware(
+                URLRouter(
+                    notification_websocket_urlpatterns
+                    + inventory_websocket_urlpatterns
+                )
+            )
+        ),
+    }
+)
@@ -0,0 +1,19 @@
+"""
+Celery application for the E-Bike Point ERP.
+
+Reads every CELERY_* setting from Django settings and discovers tasks.py in
+each installed app. See CELERY_MODE in settings for running without Redis.
+
+    celery -A config worker -l info
+    celery -A config beat -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+app = Celery("config")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
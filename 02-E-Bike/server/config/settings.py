@@ -7,6 +7,7 @@ import os
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from celery.schedules import crontab
 import mongoengine
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "channels",
     # Local apps
+    "apps.core",
     "apps.users",
     "apps.products",
     "apps.orders",
@@ -97,6 +99,9 @@ MONGODB_SETTINGS = {
     "connect": False,  # Connect on first operation
 }
 
+# Use multi-document transactions when connected to a replica set/sharded cluster
+MONGODB_TRANSACTIONS = config("MONGODB_TRANSACTIONS", default=True, cast=bool)
+
 
 # Initialize MongoEngine connection
 def connect_mongodb():
@@ -175,7 +180,9 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 # Create media directory structure
 MEDIA_DIRS = {
+    "BLOBS": os.path.join(MEDIA_ROOT, "blobs"),
     "PRODUCTS": os.path.join(MEDIA_ROOT, "products"),
+    "PRODUCT_VARIANTS": os.path.join(MEDIA_ROOT, "products", "variants"),
     "PROFILES": os.path.join(MEDIA_ROOT, "profiles"),
     "INVOICES": os.path.join(MEDIA_ROOT, "invoices"),
     "SERVICE_PHOTOS": os.path.join(MEDIA_ROOT, "service_photos"),
@@ -185,6 +192,14 @@ MEDIA_DIRS = {
 for dir_path in MEDIA_DIRS.values():
     os.makedirs(dir_path, exist_ok=True)
 
+# Media serving (apps.core.serving):
+#   django - FileResponse with Range/ETag support (sendfile under gunicorn)
+#   nginx  - X-Accel-Redirect to an internal location, e.g.
+#            location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+#   apache - X-Sendfile (mod_xsendfile)
+MEDIA_SERVE_MODE = config("MEDIA_SERVE_MODE", default="django")
+MEDIA_ACCEL_PREFIX = config("MEDIA_ACCEL_PREFIX", default="/protected-media/")
+
 # Max upload size (10MB)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -307,6 +322,54 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = True
 
+# CELERY_MODE:
+#   redis      - Redis broker (default)
+#   eager      - no broker; .delay() runs the task inline (dev/tests)
+#   filesystem - broker-less local queue under celery-queue/ for a real
+#                worker/beat without Redis
+CELERY_MODE = config("CELERY_MODE", default="redis")
+
+if CELERY_MODE == "eager":
+    CELERY_TASK_ALWAYS_EAGER = True
+    CELERY_TASK_EAGER_PROPAGATES = True
+    CELERY_RESULT_BACKEND = None
+elif CELERY_MODE == "filesystem":
+    CELERY_QUEUE_DIR = os.path.join(BASE_DIR, "celery-queue")
+    for dir_name in ("queue", "processed", "results"):
+        os.makedirs(os.path.join(CELERY_QUEUE_DIR, dir_name), exist_ok=True)
+    CELERY_BROKER_URL = "filesystem://"
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        "data_folder_in": os.path.join(CELERY_QUEUE_DIR, "queue"),
+        "data_folder_out": os.path.join(CELERY_QUEUE_DIR, "queue"),
+        "processed_folder": os.path.join(CELERY_QUEUE_DIR, "processed"),
+        "store_processed": False,
+    }
+    CELERY_RESULT_BACKEND = f"file://{os.path.join(CELERY_QUEUE_DIR, 'results')}"
+
+# Periodic jobs (celery -A config beat)
+CELERY_BEAT_SCHEDULE = {
+    "auto-logout-employees": {
+        "task": "apps.attendance.tasks.auto_logout_employees",
+        "schedule": crontab(minute="*/15"),
+    },
+    "send-warranty-reminders": {
+        "task": "apps.service.tasks.send_warranty_reminders",
+        "schedule": crontab(hour=9, minute=0),
+    },
+    "send-service-reminders": {
+        "task": "apps.service.tasks.send_service_reminders",
+        "schedule": crontab(hour=9, minute=30),
+    },
+    "release-expired-notifications": {
+        "task": "apps.notifications.tasks.release_expired_notifications",
+        "schedule": crontab(minute=5),
+    },
+    "collect-media-garbage": {
+        "task": "apps.core.tasks.collect_media_garbage",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
+
 # ============================================
 # EMAIL CONFIGURATION
 # ============================================
@@ -334,12 +397,32 @@ AUTO_LOGOUT_HOURS = config("AUTO_LOGOUT_HOURS", default=9, cast=int)
 FREE_SERVICES_COUNT = config("FREE_SERVICES_COUNT", default=4, cast=int)
 WARRANTY_MONTHS = config("WARRANTY_MONTHS", default=24, cast=int)
 
+# Reminder jobs (records streamed and notified per batch)
+REMINDER_BATCH_SIZE = config("REMINDER_BATCH_SIZE", default=1000, cast=int)
+
+# Media store (unreferenced blobs are kept this long before removal)
+MEDIA_GC_GRACE_HOURS = config("MEDIA_GC_GRACE_HOURS", default=24, cast=int)
+
 # Inventory
 LOW_STOCK_THRESHOLD = config("LOW_STOCK_THRESHOLD", default=5, cast=int)
 
 # Notifications
 NOTIFICATION_EXPIRY_DAYS = config("NOTIFICATION_EXPIRY_DAYS", default=30, cast=int)
 
+# Authenticated user cache (in-process, optionally shared through Redis)
+USER_CACHE_TTL = config("USER_CACHE_TTL", default=30, cast=int)  # 0 disables
+USER_CACHE_SIZE = config("USER_CACHE_SIZE", default=5000, cast=int)
+USER_CACHE_REDIS_TTL = config("USER_CACHE_REDIS_TTL", default=300, cast=int)
+REDIS_CACHE_URL = config("REDIS_CACHE_URL", default="")  # e.g. redis://127.0.0.1:6379/1
+
+# Product catalog cache (process-local, invalidated via a version counter)
+PRODUCT_CACHE_ENABLED = config("PRODUCT_CACHE_ENABLED", default=True, cast=bool)
+PRODUCT_CACHE_SIZE = config("PRODUCT_CACHE_SIZE", default=2000, cast=int)
+PRODUCT_CACHE_TTL = config("PRODUCT_CACHE_TTL", default=300, cast=int)  # seconds
+PRODUCT_CACHE_VERSION_CHECK = config(
+    "PRODUCT_CACHE_VERSION_CHECK", default=2, cast=float
+)  # seconds between version checks
+
 # ============================================
 # SECURITY SETTINGS (Production)
 # ============================================
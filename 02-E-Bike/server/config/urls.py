@@ -8,6 +8,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 
+from apps.core.serving import serve_media
+
 
 def api_root(request):
     """API root endpoint with documentation"""
@@ -30,21 +32,28 @@ def api_root(request):
                 },
                 "products": {
                     "list": "GET /api/products/",
+                    "search": "GET /api/products/search/?q=",
                     "create": "POST /api/products/create/",
                     "details": "GET /api/products/<slug>/",
                     "update": "PATCH /api/products/<id>/update/",
                     "delete": "DELETE /api/products/<id>/delete/",
+                    "cache_stats": "GET /api/products/admin/cache/stats/",
                 },
                 "orders": {
                     "dealer_orders": "GET /api/orders/dealer/",
                     "create_dealer_order": "POST /api/orders/dealer/create/",
                     "approve_dealer_order": "POST /api/orders/dealer/<id>/approve/",
+                    "bulk_approve_dealer_orders": "POST /api/orders/dealer/bulk-approve/",
                     "customer_orders": "GET /api/orders/customer/",
                     "create_customer_order": "POST /api/orders/customer/create/",
+                    "export_dealer_orders": "GET /api/orders/dealer/export/",
+                    "export_customer_orders": "GET /api/orders/customer/export/",
                 },
                 "billing": {
                     "sales": "GET /api/billing/sales/",
                     "create_sale": "POST /api/billing/sales/create/",
+                    "export": "GET /api/billing/sales/export/",
+                    "invoice": "GET /api/billing/sales/<id>/invoice/",
                     "customer_purchases": "GET /api/billing/customer/purchases/",
                     "dashboard": "GET /api/billing/sales/dashboard/",
                 },
@@ -53,6 +62,8 @@ def api_root(request):
                     "low_stock": "GET /api/inventory/low-stock/",
                     "adjust": "PATCH /api/inventory/<id>/adjust/",
                     "admin_all": "GET /api/inventory/admin/all/",
+                    "ledger_export": "GET /api/inventory/ledger/export/",
+                    "live_stream": "WS /ws/dealer/stream/?token=<access_token>",
                 },
                 "attendance": {
                     "clock_in": "POST /api/attendance/clock-in/",
@@ -73,6 +84,8 @@ def api_root(request):
                     "create": "POST /api/notifications/create/",
                     "mark_read": "POST /api/notifications/<id>/read/",
                     "unread_count": "GET /api/notifications/unread-count/",
+                    "deactivate": "POST /api/notifications/<id>/deactivate/",
+                    "websocket": "WS /ws/notifications/?token=<access_token>",
                 },
                 "analytics": {
                     "admin_dashboard": "GET /api/analytics/admin/dashboard/",
@@ -102,11 +115,12 @@ urlpatterns = [
     path("api/service/", include("apps.service.urls")),
     path("api/notifications/", include("apps.notifications.urls")),
     path("api/analytics/", include("apps.analytics.urls")),
+    # Media (handed off to the front proxy when MEDIA_SERVE_MODE is set)
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name="media"),
 ]
 
-# Serve media files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 # Custom admin site headers